@@ -4,35 +4,58 @@ Tax Calculator API
 FastAPI backend for the 2025 tax calculator application.
 """
 
+import asyncio
+import codecs
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 import io
 import os
 import tempfile
 import zipfile
-from typing import Optional
+import zlib
+from typing import AsyncIterator, Optional, Union
 import json
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Request
-from fastapi.responses import Response, FileResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 import logging
 
-from parsers.w2 import parse_w2
-from parsers.form_1099_int import parse_1099_int
-from parsers.form_1099_div import parse_1099_div
-from parsers.form_1099_b import parse_1099_b
-from parsers.form_1099_nec import parse_1099_nec
-from parsers.form_1040 import parse_form_1040
-from tax_engine import calculate_taxes
+from parsers.dispatch import form_hint, parse_upload, summarize_uploads
+from parsers.parse_cache import ParseCache, content_hash
+from parsers.pool import ParsePool, ParsePoolFull, ParseTimeout
+from tax_engine import calculate_taxes, cached_calculate_taxes, result_cache_stats, DETAIL_BREAKDOWN, DETAIL_LEVELS, DETAIL_TOTALS
+from tax_engine.sweep import sweep, DEFAULT_SWEEP_OUTPUTS
+from tax_engine.solver import solve, DEFAULT_LOWER_BOUND, DEFAULT_UPPER_BOUND
+from tax_engine.compare import compare_states
+from tax_engine.federal import check_filing_status, check_tax_year
 from pdf_generator import generate_1040, generate_540
 
 
+# Worker processes that parse uploaded PDFs off the event loop
+parse_pool = ParsePool.from_env()
+
+# Parse results of previously uploaded PDFs, None when turned off
+parse_cache = ParseCache.from_env()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the parse workers before the first upload arrives
+    await run_in_threadpool(parse_pool.start)
+    yield
+    parse_pool.shutdown()
+
+
 app = FastAPI(
     title="Tax Calculator API",
     description="2025 Federal and California tax calculator with PDF parsing",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Enable CORS for frontend
@@ -90,6 +113,47 @@ class TaxCalculationRequest(BaseModel):
     filing_status: str = "single"
 
 
+# Rows validated and calculated together by /api/calculate/batch
+BATCH_CHUNK_SIZE = 256
+
+# Longest JSON array element /api/calculate/batch waits for the end of
+MAX_BATCH_ROW_CHARS = 1024 * 1024
+
+# Limits on /api/upload/batch: PDFs per request (ZIP members included)
+# and the uncompressed size of one ZIP member
+MAX_BATCH_DOCUMENTS = 100
+MAX_ZIP_MEMBER_SIZE = 50 * 1024 * 1024
+
+# Times a batch document is resubmitted when the parse queue is full
+BATCH_PARSE_RETRIES = 3
+
+# Uploads up to this size reach the parse workers as bytes; larger ones
+# are spooled to a temporary file for the worker to read
+UPLOAD_SPOOL_BYTES = int(os.environ.get('OPENTAX_UPLOAD_SPOOL_BYTES') or 8 * 1024 * 1024)
+
+# Opt-in path each upload is also written to, for debugging parsers
+DEBUG_UPLOAD_PATH = os.environ.get('OPENTAX_DEBUG_UPLOAD') or None
+
+
+class SweepRequest(BaseModel):
+    """Request body for a scenario grid sweep."""
+    base: TaxCalculationRequest = TaxCalculationRequest()
+    # TaxInput field -> values to sweep, e.g. {"w2_wages": [50000, 100000]}
+    axes: dict[str, list[Union[float, str]]]
+    outputs: list[str] = list(DEFAULT_SWEEP_OUTPUTS)
+
+
+class SolveRequest(BaseModel):
+    """Request body for an inverse solve."""
+    base: TaxCalculationRequest = TaxCalculationRequest()
+    variable: str  # numeric input field to solve for, e.g. "long_term_gains"
+    output: str = "amount_owed"  # dotted for nested values
+    target: float = 0.0
+    lower: float = DEFAULT_LOWER_BOUND
+    upper: float = DEFAULT_UPPER_BOUND
+    tolerance: float = 0.01
+
+
 class Pii(BaseModel):
     firstName: str = ""
     lastName: str = ""
@@ -112,6 +176,69 @@ class ParsedDocument(BaseModel):
     raw_text: Optional[str] = None
 
 
+async def _run_parse_job(fn, *args):
+    """Run a parse job on the parse pool, mapping pool errors to HTTP errors."""
+    try:
+        return await parse_pool.run(fn, *args)
+    except ParsePoolFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many documents are being parsed, please retry shortly",
+            headers={'Retry-After': str(e.retry_after)})
+    except ParseTimeout:
+        raise HTTPException(
+            status_code=504,
+            detail=f"Parsing the document took longer than {parse_pool.timeout:g} seconds")
+    except BrokenProcessPool:
+        # The worker died on this document; the pool starts new workers
+        raise HTTPException(
+            status_code=500,
+            detail="The parser stopped unexpectedly while reading this document")
+
+
+def _spool_upload(content: bytes) -> str:
+    """Write an upload too large to pass in memory to a temporary file."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
+        tmp.write(content)
+        return tmp.name
+
+
+def _write_debug_upload(content: bytes):
+    """Replace the file at DEBUG_UPLOAD_PATH with an upload, atomically."""
+    directory = os.path.dirname(os.path.abspath(DEBUG_UPLOAD_PATH))
+    with tempfile.NamedTemporaryFile(dir=directory, suffix='.pdf', delete=False) as tmp:
+        tmp.write(content)
+    os.replace(tmp.name, DEBUG_UPLOAD_PATH)
+
+
+async def _parse_content(content: bytes, filename: str, form_type: Optional[str]) -> dict:
+    """
+    Parse uploaded PDF bytes on the parse pool, reusing the stored result
+    when the same bytes were parsed before with the same hint.
+    """
+    if parse_cache is not None:
+        digest = content_hash(content)
+        hint = form_hint(filename, form_type)
+        cached = await run_in_threadpool(parse_cache.get, digest, hint)
+        if cached is not None:
+            return cached
+
+    if len(content) <= UPLOAD_SPOOL_BYTES:
+        result = await _run_parse_job(parse_upload, content, filename, form_type)
+    else:
+        tmp_path = await run_in_threadpool(_spool_upload, content)
+        try:
+            result = await _run_parse_job(parse_upload, tmp_path, filename, form_type)
+        finally:
+            # Clean up temp file
+            os.unlink(tmp_path)
+
+    # Results of parsers that raised are not stored, to be retried next time
+    if parse_cache is not None and 'error' not in result:
+        await run_in_threadpool(parse_cache.put, digest, hint, result)
+    return result
+
+
 @app.post("/api/upload", response_model=ParsedDocument)
 async def upload_document(
     file: UploadFile = File(...),
@@ -132,122 +259,148 @@ async def upload_document(
             status_code=400,
             detail="Only PDF files are supported")
 
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = tmp.name
+    content = await file.read()
+
+    if DEBUG_UPLOAD_PATH:
+        # Keep a copy of the latest upload for analysis
+        await run_in_threadpool(_write_debug_upload, content)
+
+    result = await _parse_content(content, file.filename, form_type)
+
+    # Extract raw_text for response (truncate if too long)
+    raw_text = result.pop('raw_text', '')
+    if len(raw_text) > 5000:
+        raw_text = raw_text[:5000] + '...[truncated]'
+
+    # Return merged result nested
+    return ParsedDocument(
+        form_type=result.get('form_type', 'unknown'),
+        parse_confidence=result.get('parse_confidence', 'failed'),
+        data=result,
+        raw_text=raw_text
+    )
+
 
-    # DEBUG: Save copy for analysis
-    with open("debug_last_upload.pdf", "wb") as f:
-        f.write(content)
+def _batch_documents(filename: str, content: bytes) -> list:
+    """
+    (filename, content or error) of each PDF in an uploaded file: the file
+    itself, or every PDF member of a ZIP archive.
+    """
+    if filename.lower().endswith('.pdf'):
+        return [(filename, content)]
+    if not filename.lower().endswith('.zip'):
+        return [(filename, "Only PDF and ZIP files are supported")]
 
     try:
-        # Determine which parser to use
-        filename_lower = file.filename.lower()
-        form_type_lower = (form_type or '').lower()
-
-        # Try to auto-detect form type from filename
-        if form_type_lower == 'w2' or 'w-2' in filename_lower or 'w2' in filename_lower:
-            result = parse_w2(tmp_path)
-        elif form_type_lower == '1099-int' or '1099-int' in filename_lower or '1099int' in filename_lower:
-            result = parse_1099_int(tmp_path)
-        elif form_type_lower == '1099-div' or '1099-div' in filename_lower or '1099div' in filename_lower:
-            result = parse_1099_div(tmp_path)
-        elif form_type_lower == '1099-b' or '1099-b' in filename_lower or '1099b' in filename_lower:
-            result = parse_1099_b(tmp_path)
-        elif form_type_lower == '1099-nec' or '1099-nec' in filename_lower or '1099nec' in filename_lower:
-            result = parse_1099_nec(tmp_path)
-        else:
-            # Run all parsers and aggregate results
-            parsers = [
-                parse_w2,
-                parse_1099_int,
-                parse_1099_div,
-                parse_1099_nec,
-                parse_1099_b,
-                parse_form_1040,
-            ]
-
-            aggregated_data = {}
-            found_types = []
-            highest_confidence = 'failed'
-            confidence_scores = {'high': 3, 'medium': 2, 'low': 1, 'failed': 0}
-
-            for parser in parsers:
-                try:
-                    parser_result = parser(tmp_path)
-
-                    # If parser found something relevant (confidence > failed)
-                    if parser_result.get(
-                            'parse_confidence', 'failed') != 'failed':
-                        # Update confidence
-                        conf = parser_result.get('parse_confidence', 'failed')
-                        if confidence_scores.get(
-                                conf, 0) > confidence_scores.get(
-                                highest_confidence, 0):
-                            highest_confidence = conf
-
-                        # Track found form types
-                        if parser_result.get('form_type'):
-                            found_types.append(parser_result['form_type'])
-
-                        # Merge numeric fields
-                        for key, value in parser_result.items():
-                            if isinstance(value, (int, float)) and value != 0:
-                                current_val = aggregated_data.get(key, 0.0)
-                                aggregated_data[key] = current_val + value
-                            elif key not in aggregated_data and value:
-                                agg_val = aggregated_data.get(key)
-                                if not agg_val:
-                                    aggregated_data[key] = value
-                except Exception:
-                    continue
-
-            if not aggregated_data:
-                # Fallback if nothing found
-                aggregated_data = parse_w2(tmp_path)
-                result = aggregated_data  # raw dict
-                result['form_type'] = 'W-2'  # Default
-                result['parse_confidence'] = 'failed'
-            else:
-                # Construct final result
-                aggregated_data['form_type'] = '+'.join(
-                    set(found_types)) if found_types else 'Unknown'
-                aggregated_data['parse_confidence'] = highest_confidence
-                result = aggregated_data
-
-        # Extract raw_text for response (truncate if too long)
-        raw_text = result.pop('raw_text', '')
-        if len(raw_text) > 5000:
-            raw_text = raw_text[:5000] + '...[truncated]'
-
-        # Return merged result nested
-        return ParsedDocument(
-            form_type=result.get('form_type', 'unknown'),
-            parse_confidence=result.get('parse_confidence', 'failed'),
-            data=result,
-            raw_text=raw_text
-        )
+        archive = zipfile.ZipFile(io.BytesIO(content))
+    except zipfile.BadZipFile:
+        return [(filename, "Not a valid ZIP file")]
+
+    documents = []
+    with archive:
+        for member in archive.infolist():
+            name = member.filename
+            basename = os.path.basename(name)
+            # Skip folders, macOS resource forks and anything but PDFs
+            if member.is_dir() or name.startswith('__MACOSX/') or \
+                    basename.startswith('.') or not basename.lower().endswith('.pdf'):
+                continue
+            if member.file_size > MAX_ZIP_MEMBER_SIZE:
+                documents.append((basename, "File is too large"))
+                continue
+            if member.flag_bits & 0x1:
+                documents.append((basename, "File is encrypted"))
+                continue
+            try:
+                documents.append((basename, archive.read(member)))
+            except (RuntimeError, NotImplementedError, EOFError, zipfile.BadZipFile, zlib.error):
+                # Corrupt data, a bad CRC or an unsupported compression method
+                documents.append((basename, "File could not be read from the ZIP archive"))
+    return documents
+
+
+async def _parse_batch_document(
+        filename: str,
+        content: Union[bytes, str],
+        limiter: asyncio.Semaphore) -> dict:
+    """Parse one document of a batch upload on the parse pool."""
+    if isinstance(content, str):
+        return {'filename': filename, 'error': content}
 
-    finally:
-        # Clean up temp file
-        os.unlink(tmp_path)
+    try:
+        async with limiter:
+            for attempt in range(BATCH_PARSE_RETRIES + 1):
+                try:
+                    result = await _parse_content(content, filename, None)
+                    break
+                except HTTPException as e:
+                    if e.status_code != 503 or attempt == BATCH_PARSE_RETRIES:
+                        return {'filename': filename, 'error': e.detail}
+                    await asyncio.sleep(int(e.headers['Retry-After']))
+    except Exception as e:
+        return {'filename': filename, 'error': str(e)}
+
+    result.pop('raw_text', None)
+    return {
+        'filename': filename,
+        'form_type': result.get('form_type', 'unknown'),
+        'parse_confidence': result.get('parse_confidence', 'failed'),
+        'data': result,
+    }
 
 
-@app.post("/api/calculate")
-async def calculate_tax(request: TaxCalculationRequest):
+@app.post("/api/upload/batch")
+async def upload_documents(files: list[UploadFile] = File(...)):
     """
-    Calculate federal and California taxes based on provided income data.
+    Upload many tax document PDFs, or ZIP archives of them, at once.
 
-    Returns complete tax breakdown including:
-    - Federal tax with bracket breakdown
-    - California state tax
-    - Self-employment tax (if applicable)
-    - Withholding comparison
-    - Amount owed or refund due
+    Documents are parsed in parallel and streamed back as NDJSON lines of
+    {"index", "filename", "form_type", "parse_confidence", "data"} or
+    {"index", "filename", "error"} in the order they finish. The last line
+    is {"summary"}: the amounts of every parsed document added up into
+    TaxCalculationRequest fields.
     """
-    tax_input = {
+    documents = []
+    for file in files:
+        documents.extend(_batch_documents(file.filename or '', await file.read()))
+    if not documents:
+        raise HTTPException(status_code=400, detail="No PDF files were uploaded")
+    if len(documents) > MAX_BATCH_DOCUMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_DOCUMENTS} documents can be uploaded at once")
+
+    # Leave room in the parse queue for other clients' uploads
+    limiter = asyncio.Semaphore(parse_pool.max_workers)
+
+    async def stream_results():
+        async def parse(index, filename, content):
+            return index, await _parse_batch_document(filename, content, limiter)
+
+        tasks = [
+            asyncio.ensure_future(parse(index, filename, content))
+            for index, (filename, content) in enumerate(documents)
+        ]
+        parsed = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, result = await next_done
+                if 'data' in result:
+                    parsed.append(result['data'])
+                yield json.dumps({'index': index, **result}) + '\n'
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        summary = TaxCalculationRequest(**summarize_uploads(parsed))
+        yield json.dumps({'summary': summary.dict()}) + '\n'
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+def _to_tax_input(request: TaxCalculationRequest) -> dict:
+    """Map a TaxCalculationRequest onto the tax engine's TaxInput."""
+    return {
         'w2_wages': request.w2_wages,
         'w2_federal_withheld': request.w2_federal_withheld,
         'w2_state_withheld': request.w2_state_withheld,
@@ -274,10 +427,321 @@ async def calculate_tax(request: TaxCalculationRequest):
         'state': request.state,
     }
 
-    result = calculate_taxes(tax_input)
+
+@app.post("/api/calculate")
+async def calculate_tax(
+        request: TaxCalculationRequest,
+        detail: str = DETAIL_BREAKDOWN):
+    """
+    Calculate federal and California taxes based on provided income data.
+
+    Returns complete tax breakdown including:
+    - Federal tax with bracket breakdown
+    - California state tax
+    - Self-employment tax (if applicable)
+    - Withholding comparison
+    - Amount owed or refund due
+
+    The detail query parameter selects 'totals' (no bracket breakdowns),
+    'breakdown' (default) or 'trace' (intermediate worksheet values).
+    """
+    if detail not in DETAIL_LEVELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"detail must be one of {', '.join(DETAIL_LEVELS)}")
+
+    tax_input = _to_tax_input(request)
+    result = cached_calculate_taxes(tax_input, detail)
     return result
 
 
+_batch_rows_adapter = TypeAdapter(list[TaxCalculationRequest])
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose content iterator reads the request body.
+
+    The stock response listens for client disconnects by consuming
+    receive(), which would swallow the body chunks the iterator is still
+    reading. A disconnect surfaces as ClientDisconnect from request.stream()
+    instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def _iter_json_rows(chunks: AsyncIterator[bytes]):
+    """
+    Decode rows from an NDJSON or JSON-array byte stream as it arrives.
+
+    Yields each decoded row, or a json.JSONDecodeError in place of a row
+    that is not valid JSON. Only the current partial row is buffered.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    is_array = None
+
+    async for chunk in chunks:
+        buffer += text.decode(chunk)
+        if is_array is None:
+            buffer = buffer.lstrip()
+            if not buffer:
+                continue
+            is_array = buffer.startswith('[')
+            if is_array:
+                buffer = buffer[1:]
+
+        if is_array:
+            rows, buffer = _drain_json_array(decoder, buffer)
+            for row in rows:
+                yield row
+            if buffer is None:
+                return
+        else:
+            *lines, buffer = buffer.split('\n')
+            for line in lines:
+                if line.strip():
+                    yield _decode_json_line(line)
+
+    buffer += text.decode(b'', final=True)
+    if is_array:
+        rows, buffer = _drain_json_array(decoder, buffer)
+        for row in rows:
+            yield row
+        if buffer is not None and buffer.strip() and not buffer.lstrip().startswith(']'):
+            yield json.JSONDecodeError("Unterminated JSON array", buffer, 0)
+    elif buffer.strip():
+        yield _decode_json_line(buffer)
+
+
+def _decode_json_line(line: str):
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return e
+
+
+def _element_end(buffer: str, pos: int) -> int:
+    """
+    Index of the ',' or ']' that ends the array element starting at pos,
+    or -1 while the element is still incomplete.
+    """
+    depth = 0
+    in_string = escaped = False
+    for index in range(pos, len(buffer)):
+        char = buffer[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '[{':
+            depth += 1
+        elif char in ']}':
+            if char == ']' and depth <= 0:
+                return index
+            depth -= 1
+        elif char == ',' and depth <= 0:
+            return index
+    return -1
+
+
+def _drain_json_array(decoder: json.JSONDecoder, buffer: str):
+    """
+    Decode every complete element at the front of a JSON array buffer.
+
+    A malformed element becomes a json.JSONDecodeError and decoding goes on
+    after it. Returns the rows and the unread rest of the buffer, or None
+    in place of the rest when an element grows past MAX_BATCH_ROW_CHARS
+    without ending, so that reading stops rather than buffer the body.
+    """
+    rows = []
+    pos = 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(buffer) or buffer[pos] == ']':
+            break
+        try:
+            row, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            end = _element_end(buffer, pos)
+            if end >= 0:
+                # Malformed: report it and skip to the next element
+                rows.append(e)
+                pos = end
+                continue
+            if len(buffer) - pos > MAX_BATCH_ROW_CHARS:
+                rows.append(json.JSONDecodeError("Array element is too long", buffer, pos))
+                return rows, None
+            # Element is incomplete, wait for more data
+            break
+        rows.append(row)
+    return rows, buffer[pos:]
+
+
+def _validate_batch_rows(rows: list) -> list:
+    """
+    Validate a chunk of decoded rows.
+
+    Returns a TaxCalculationRequest or an error description per row. The
+    whole chunk is validated in one call; rows are only validated one by
+    one when that fails, to report which rows are bad.
+    """
+    if not any(isinstance(row, json.JSONDecodeError) for row in rows):
+        try:
+            return _batch_rows_adapter.validate_python(rows)
+        except ValidationError:
+            pass
+
+    validated = []
+    for row in rows:
+        if isinstance(row, json.JSONDecodeError):
+            validated.append({'error': f"Invalid JSON: {row.msg}"})
+            continue
+        try:
+            validated.append(TaxCalculationRequest.model_validate(row))
+        except ValidationError as e:
+            validated.append({'error': json.loads(e.json(include_url=False))})
+    return validated
+
+
+def _calculate_batch_chunk(requests: list, detail: str) -> list:
+    """Calculate a validated chunk; runs in a worker thread."""
+    results = []
+    for request in requests:
+        if not isinstance(request, TaxCalculationRequest):
+            results.append(request)
+            continue
+        try:
+            check_tax_year(request.tax_year)
+            check_filing_status(request.filing_status)
+            results.append(
+                {'result': calculate_taxes(_to_tax_input(request), detail)})
+        except (KeyError, ValueError, TypeError) as e:
+            # One bad row must not end the stream of the others
+            message = f"Unsupported value {e.args[0]!r}" if isinstance(e, KeyError) else str(e)
+            results.append({'error': message})
+    return results
+
+
+@app.post("/api/calculate/batch")
+async def calculate_tax_batch(request: Request, detail: str = DETAIL_TOTALS):
+    """
+    Calculate many returns in one request.
+
+    Accepts NDJSON (one TaxCalculationRequest per line) or a JSON array and
+    streams back NDJSON lines of {"index", "result"} or {"index", "error"}
+    in input order, one chunk at a time as rows finish. detail defaults to
+    'totals'.
+    """
+    if detail not in DETAIL_LEVELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"detail must be one of {', '.join(DETAIL_LEVELS)}")
+
+    async def process(rows, start):
+        validated = _validate_batch_rows(rows)
+        results = await run_in_threadpool(_calculate_batch_chunk, validated, detail)
+        return ''.join(
+            json.dumps({'index': start + i, **result}) + '\n'
+            for i, result in enumerate(results))
+
+    async def stream_results():
+        rows = []
+        index = 0
+        async for row in _iter_json_rows(request.stream()):
+            rows.append(row)
+            if len(rows) == BATCH_CHUNK_SIZE:
+                yield await process(rows, index)
+                index += len(rows)
+                rows = []
+        if rows:
+            yield await process(rows, index)
+
+    return RequestStreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+def _run_sweep(request: SweepRequest) -> dict:
+    """Evaluate a sweep and convert its arrays to JSON lists."""
+    grid = sweep(request.base.dict(), request.axes, request.outputs)
+    return {
+        'axes': {field: values.tolist() for field, values in grid['axes'].items()},
+        'shape': list(grid['shape']),
+        'results': {output: values.tolist() for output, values in grid['results'].items()},
+    }
+
+
+@app.post("/api/sweep")
+async def sweep_endpoint(request: SweepRequest):
+    """
+    Evaluate a base return over the cartesian grid of the given axes.
+
+    Returns the axis values, the grid shape and, for each requested output,
+    a dense nested list indexed by the position of each axis value.
+    """
+    try:
+        return await run_in_threadpool(_run_sweep, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/solve")
+async def solve_endpoint(request: SolveRequest):
+    """
+    Find the value of one input at which an output reaches a target.
+
+    For example the withholding that brings amount_owed to 0, or the wages
+    at which federal.marginal_rate reaches 32.
+    """
+    try:
+        return await run_in_threadpool(
+            solve,
+            request.base.dict(),
+            request.variable,
+            request.output,
+            request.target,
+            request.lower,
+            request.upper,
+            request.tolerance,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/compare-states")
+async def compare_states_endpoint(request: TaxCalculationRequest):
+    """
+    Tax the same return in every state.
+
+    Federal tax is computed once; the response ranks all states from lowest
+    to highest state tax with their effective and marginal rates.
+    """
+    try:
+        return await run_in_threadpool(compare_states, request.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/metrics")
+async def metrics():
+    """Parse pool queue depth and utilization, parse and result cache counters."""
+    return {
+        'parse_pool': parse_pool.stats(),
+        'parse_cache': parse_cache.stats() if parse_cache is not None else None,
+        'result_cache': result_cache_stats(),
+    }
+
+
 # Add exception handler for validation errors
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(
@@ -303,7 +767,7 @@ async def generate_pdf_endpoint(request: PdfRequest, form_type: str = "all"):
     pii_dict = request.pii.dict()
 
     try:
-        result = calculate_taxes(tax_input)
+        result = cached_calculate_taxes(tax_input)
 
         if form_type == "1040":
             pdf_stream = generate_1040(result, pii_dict)
@@ -1,3 +1,5 @@
+from .document import ParsedDocument, PdfSource, open_document
+from .field_spec import FieldSpec, form_spec, scan_form
 from .w2 import parse_w2
 from .form_1099_int import parse_1099_int
 from .form_1099_div import parse_1099_div
@@ -5,6 +7,12 @@ from .form_1099_b import parse_1099_b
 from .form_1099_nec import parse_1099_nec
 
 __all__ = [
+    'ParsedDocument',
+    'PdfSource',
+    'open_document',
+    'FieldSpec',
+    'form_spec',
+    'scan_form',
     'parse_w2',
     'parse_1099_int',
     'parse_1099_div',
@@ -0,0 +1,129 @@
+"""
+AcroForm Fields
+
+Reads box values straight from the filled-in fields of fillable W-2 and
+1099 PDFs, so that such documents skip text and table extraction.
+
+Field names are mapped to result keys by the field maps in
+data/field_maps.json. The file holds one map per issuer; each is keyed
+by form type and gives the fields that mark the form ("required") and a
+regex per result key ("fields"), matched in full against the last part
+of each field's name, lowercased with runs of other characters turned
+into underscores ("topmostSubform[0].Box 1 Wages" -> "box_1_wages").
+An issuer with a "detect" regex is used for documents where that regex
+matches a fully qualified field name; the "generic" map covers the rest,
+and documents whose issuer map finds none of the required fields. Issuers
+that use the same field names on every form, like the IRS fillable forms
+("f1_09", "f2_09" for each copy), give a "text" regex per form type that
+the first page's text must match.
+"""
+
+import json
+import os
+import re
+from typing import Optional
+from .document import ParsedDocument
+from .utils import clean_name
+
+FIELD_MAPS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'field_maps.json')
+
+GENERIC_ISSUER = 'generic'
+
+
+def load_field_maps(path: str = FIELD_MAPS_FILE) -> dict:
+    """Issuer -> {'detect': regex or None, form type -> {'required', 'fields', 'text'}}, compiled."""
+    with open(path, encoding='utf-8') as f:
+        raw = json.load(f)
+    maps = {}
+    for issuer, forms in raw.items():
+        detect = forms.get('detect')
+        maps[issuer] = {'detect': re.compile(detect, re.IGNORECASE) if detect else None}
+        for form_type, spec in forms.items():
+            if form_type == 'detect':
+                continue
+            maps[issuer][form_type] = {
+                'required': tuple(spec.get('required', ())),
+                'text': re.compile(spec['text']) if spec.get('text') else None,
+                'fields': {
+                    key: re.compile(pattern)
+                    for key, pattern in spec['fields'].items()
+                },
+            }
+    return maps
+
+
+FIELD_MAPS = load_field_maps()
+
+
+def normalize_field_name(name: str) -> str:
+    """Last part of a qualified field name, lowercased, e.g. 'box_1_wages'."""
+    last = re.sub(r'\[\d+\]', '', name).rstrip('.').split('.')[-1]
+    return re.sub(r'[^a-z0-9]+', '_', last.lower()).strip('_')
+
+
+def issuer_of(field_names, maps: dict = FIELD_MAPS) -> str:
+    """The first issuer whose detect regex matches one of the field names."""
+    for issuer, forms in maps.items():
+        detect = forms['detect']
+        if detect and any(detect.search(name) for name in field_names):
+            return issuer
+    return GENERIC_ISSUER
+
+
+def _amount(value: str) -> Optional[float]:
+    text = value.replace(',', '').replace('$', '').strip()
+    negative = text.startswith('(') and text.endswith(')')
+    try:
+        amount = float(text.strip('()'))
+    except ValueError:
+        return None
+    return -amount if negative else amount
+
+
+def read_form_fields(document: ParsedDocument, form_type: str, maps: dict = FIELD_MAPS) -> dict:
+    """
+    Values of a form's boxes from the document's filled-in form fields.
+
+    Returns:
+        Result key -> amount (or cleaned name for '*_name' keys) of every
+        mapped field with a value; {} unless one of the form's required
+        fields has a value, so that the caller falls back to the text
+    """
+    fields = document.form_fields
+    if not any(fields.values()):
+        return {}
+
+    issuer = issuer_of(fields, maps)
+    specs = [maps[issuer].get(form_type)]
+    if issuer != GENERIC_ISSUER:
+        specs.append(maps[GENERIC_ISSUER].get(form_type))
+    for spec in specs:
+        if spec is None:
+            continue
+        if spec['text'] and not (
+                document.page_count and spec['text'].search(document.quick_text(0))):
+            continue
+        values = _read_fields(fields, spec)
+        if any(key in values for key in spec['required']):
+            return values
+    return {}
+
+
+def _read_fields(fields: dict, spec: dict) -> dict:
+    values = {}
+    for name, raw in fields.items():
+        if not raw or not raw.strip():
+            continue
+        normalized = normalize_field_name(name)
+        for key, pattern in spec['fields'].items():
+            if key in values or not pattern.fullmatch(normalized):
+                continue
+            if key.endswith('_name'):
+                # Name fields often hold the address on the lines below
+                value = clean_name(raw.strip().splitlines()[0])
+            else:
+                value = _amount(raw)
+            if value:
+                values[key] = value
+                break
+    return values
@@ -0,0 +1,169 @@
+"""
+Form Type Classifier
+
+Scores a document against the signature phrases of each supported form
+using only its first page of text and its AcroForm field names, so that
+an upload can be routed to the one parser (or, for a consolidated 1099,
+the few parsers) that apply instead of running every parser.
+"""
+
+import re
+from typing import Callable, NamedTuple, Union
+from .document import ParsedDocument, PdfSource, open_document
+from .w2 import parse_w2
+from .form_1099_int import parse_1099_int
+from .form_1099_div import parse_1099_div
+from .form_1099_b import parse_1099_b
+from .form_1099_nec import parse_1099_nec
+from .form_1040 import parse_form_1040
+
+# Minimum score for a form's parser to be run
+CLASSIFY_THRESHOLD = 0.5
+
+CONSOLIDATED_1099 = 'Consolidated 1099'
+
+# Weighted phrases of each form's first page, matched against lowercase
+# text. A form's title scores enough on its own to clear the threshold;
+# box labels add supporting evidence. Scores are capped at 1.0.
+TEXT_SIGNATURES = {
+    'W-2': [
+        (r'wage\s+and\s+tax\s+statement', 0.6),
+        (r'\bform\s+w-?2\b', 0.3),
+        (r'employer\s+identification\s+number', 0.2),
+        (r'social\s+security\s+wages', 0.2),
+        (r'medicare\s+wages\s+and\s+tips', 0.2),
+    ],
+    '1099-INT': [
+        (r'\b1099-?int\b', 0.6),
+        (r'early\s+withdrawal\s+penalty', 0.2),
+        (r'interest\s+on\s+u\.?s\.?\s+savings\s+bonds', 0.2),
+        (r'\binterest\s+income\b', 0.1),
+    ],
+    '1099-DIV': [
+        (r'\b1099-?div\b', 0.6),
+        (r'total\s+ordinary\s+dividends', 0.2),
+        (r'qualified\s+dividends', 0.2),
+        (r'total\s+capital\s+gain\s+distr', 0.2),
+    ],
+    '1099-B': [
+        (r'\b1099-?b\b', 0.6),
+        (r'proceeds\s+from\s+broker', 0.3),
+        (r'cost\s+or\s+other\s+basis', 0.2),
+        (r'wash\s+sale\s+loss', 0.2),
+        (r'date\s+acquired', 0.1),
+    ],
+    '1099-NEC': [
+        (r'\b1099-?nec\b', 0.6),
+        (r'nonemployee\s+compensation', 0.3),
+    ],
+    'Form 1040': [
+        (r'u\.?s\.?\s+individual\s+income\s+tax\s+return', 0.6),
+        (r'\bform\s+1040\b', 0.2),
+        (r'filing\s+status', 0.1),
+        (r'adjusted\s+gross\s+income', 0.1),
+    ],
+    CONSOLIDATED_1099: [
+        (r'consolidated\s+(?:form\s+)?1099', 0.6),
+        (r'composite\s+(?:form\s+)?1099', 0.6),
+        (r'tax\s+information\s+statement', 0.3),
+        (r'summary\s+of\s+(?:form\s+)?1099', 0.3),
+    ],
+}
+
+# Substrings of AcroForm field names, matched against the lowercase name
+FIELD_SIGNATURES = {
+    'W-2': [('employer', 0.2), ('wages', 0.2), ('w2', 0.4), ('w-2', 0.4)],
+    '1099-INT': [('interest', 0.3), ('1099int', 0.4), ('1099-int', 0.4)],
+    '1099-DIV': [('dividend', 0.3), ('1099div', 0.4), ('1099-div', 0.4)],
+    '1099-B': [('proceeds', 0.3), ('1099b', 0.4), ('1099-b', 0.4)],
+    '1099-NEC': [('nonemployee', 0.3), ('1099nec', 0.4), ('1099-nec', 0.4)],
+    'Form 1040': [('f1040', 0.4), ('form1040', 0.4)],
+}
+
+# Parsers run for each form type, in run order
+FORM_PARSERS: dict[str, tuple[Callable[[ParsedDocument], dict], ...]] = {
+    'W-2': (parse_w2,),
+    '1099-INT': (parse_1099_int,),
+    '1099-DIV': (parse_1099_div,),
+    '1099-B': (parse_1099_b,),
+    '1099-NEC': (parse_1099_nec,),
+    'Form 1040': (parse_form_1040,),
+    CONSOLIDATED_1099: (parse_1099_int, parse_1099_div, parse_1099_b),
+}
+
+_COMPILED_SIGNATURES = {
+    form_type: [(re.compile(pattern), weight) for pattern, weight in signature]
+    for form_type, signature in TEXT_SIGNATURES.items()
+}
+
+# 1099 titles whose joint appearance on one page marks a consolidated form
+_CONSOLIDATED_PARTS = ('1099-INT', '1099-DIV', '1099-B')
+
+
+class Classification(NamedTuple):
+    form_type: str
+    score: float  # 0.0 to 1.0
+
+
+def classify_text(text: str, field_names: tuple[str, ...] = ()) -> list[Classification]:
+    """
+    Score first-page text and form field names against every signature.
+
+    Returns:
+        Classification of every form with a non-zero score, highest first
+    """
+    lower = text.lower()
+    names = [name.lower() for name in field_names]
+    scores = {}
+
+    for form_type, signature in _COMPILED_SIGNATURES.items():
+        score = sum(weight for regex, weight in signature if regex.search(lower))
+        score += sum(
+            weight for token, weight in FIELD_SIGNATURES.get(form_type, ())
+            if any(token in name for name in names))
+        if score:
+            scores[form_type] = min(score, 1.0)
+
+    # Several 1099 titles on the first page: a consolidated statement
+    titled = sum(
+        1 for form_type in _CONSOLIDATED_PARTS
+        if _COMPILED_SIGNATURES[form_type][0][0].search(lower))
+    if titled >= 2:
+        scores[CONSOLIDATED_1099] = min(scores.get(CONSOLIDATED_1099, 0.0) + 0.6, 1.0)
+
+    # On a tie the consolidated statement wins over the forms it contains
+    return sorted(
+        (Classification(form_type, round(score, 2)) for form_type, score in scores.items()),
+        key=lambda c: (-c.score, c.form_type != CONSOLIDATED_1099))
+
+
+def field_names(document: ParsedDocument) -> tuple[str, ...]:
+    """Fully qualified names of the document's form fields."""
+    return tuple(document.form_fields)
+
+
+def classify(source: Union[PdfSource, ParsedDocument]) -> list[Classification]:
+    """
+    Classify a document by its first page and AcroForm field names.
+
+    Returns:
+        Classification of every form with a non-zero score, highest first
+    """
+    with open_document(source) as document:
+        if document.page_count == 0:
+            return []
+        return classify_text(document.quick_text(0), field_names(document))
+
+
+def select_parsers(
+        classifications: list[Classification],
+        threshold: float = CLASSIFY_THRESHOLD) -> list[Callable[[ParsedDocument], dict]]:
+    """Parsers of every form scoring at least threshold, without duplicates."""
+    selected = []
+    for form_type, score in classifications:
+        if score < threshold:
+            continue
+        for parser in FORM_PARSERS[form_type]:
+            if parser not in selected:
+                selected.append(parser)
+    return selected
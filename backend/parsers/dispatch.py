@@ -0,0 +1,223 @@
+"""
+Upload Dispatch
+
+Parses one uploaded tax document: routes it to the parser named by the
+form type hint or filename, otherwise to the parsers the classifier picks.
+Runs inside the parse pool's worker processes.
+
+Also maps parsed documents onto the fields of a tax calculation request.
+"""
+
+from typing import Optional
+from .document import ParsedDocument, PdfSource
+from .classifier import classify, select_parsers
+from .w2 import parse_w2
+from .form_1099_int import parse_1099_int
+from .form_1099_div import parse_1099_div
+from .form_1099_b import parse_1099_b
+from .form_1099_nec import parse_1099_nec
+from .form_1040 import parse_form_1040
+
+
+def form_hint(filename: str, form_type: Optional[str] = None) -> Optional[str]:
+    """
+    Form type an upload is declared as by its hint or its filename.
+
+    Returns:
+        'w2', '1099-int', '1099-div', '1099-b', '1099-nec', or None to
+        classify the document by its content
+    """
+    filename_lower = filename.lower()
+    form_type_lower = (form_type or '').lower()
+
+    if form_type_lower == 'w2' or 'w-2' in filename_lower or 'w2' in filename_lower:
+        return 'w2'
+    elif form_type_lower == '1099-int' or '1099-int' in filename_lower or '1099int' in filename_lower:
+        return '1099-int'
+    elif form_type_lower == '1099-div' or '1099-div' in filename_lower or '1099div' in filename_lower:
+        return '1099-div'
+    elif form_type_lower == '1099-b' or '1099-b' in filename_lower or '1099b' in filename_lower:
+        return '1099-b'
+    elif form_type_lower == '1099-nec' or '1099-nec' in filename_lower or '1099nec' in filename_lower:
+        return '1099-nec'
+    return None
+
+
+def parse_upload(pdf: PdfSource, filename: str, form_type: Optional[str] = None) -> dict:
+    """
+    Parse an uploaded PDF.
+
+    Args:
+        pdf: The PDF's bytes, or the path it was spooled to
+        filename: Name the client uploaded it as, used as a form type hint
+        form_type: Optional hint for the form type (w2, 1099-int, 1099-div, 1099-b, 1099-nec)
+
+    Returns:
+        The parser's result dict, or the merged results of several parsers,
+        including 'form_type', 'parse_confidence' and 'raw_text'
+    """
+    # Open and extract the PDF once; every parser below reads the same
+    # cached text, words and tables instead of reopening the file
+    try:
+        source = ParsedDocument.open(pdf)
+    except Exception:
+        source = pdf
+
+    try:
+        # Use the form type hint, or the form type named in the filename
+        hint = form_hint(filename, form_type)
+        if hint == 'w2':
+            result = parse_w2(source)
+        elif hint == '1099-int':
+            result = parse_1099_int(source)
+        elif hint == '1099-div':
+            result = parse_1099_div(source)
+        elif hint == '1099-b':
+            result = parse_1099_b(source)
+        elif hint == '1099-nec':
+            result = parse_1099_nec(source)
+        else:
+            # Run only the parsers of the forms the first page looks like;
+            # if none is recognised, run them all and aggregate results
+            try:
+                parsers = select_parsers(classify(source))
+            except Exception:
+                parsers = []
+            if not parsers:
+                parsers = [
+                    parse_w2,
+                    parse_1099_int,
+                    parse_1099_div,
+                    parse_1099_nec,
+                    parse_1099_b,
+                    parse_form_1040,
+                ]
+
+            aggregated_data = {}
+            found_types = []
+            forms = []
+            highest_confidence = 'failed'
+            confidence_scores = {'high': 3, 'medium': 2, 'low': 1, 'failed': 0}
+
+            for parser in parsers:
+                try:
+                    parser_result = parser(source)
+
+                    # If parser found something relevant (confidence > failed)
+                    if parser_result.get(
+                            'parse_confidence', 'failed') != 'failed':
+                        # Update confidence
+                        conf = parser_result.get('parse_confidence', 'failed')
+                        if confidence_scores.get(
+                                conf, 0) > confidence_scores.get(
+                                highest_confidence, 0):
+                            highest_confidence = conf
+
+                        # Track found form types
+                        if parser_result.get('form_type'):
+                            found_types.append(parser_result['form_type'])
+                        forms.append({
+                            key: value for key, value in parser_result.items()
+                            if key != 'raw_text'})
+
+                        # Merge numeric fields
+                        for key, value in parser_result.items():
+                            if isinstance(value, bool):
+                                aggregated_data.setdefault(key, value)
+                            elif isinstance(value, (int, float)) and value != 0:
+                                current_val = aggregated_data.get(key, 0.0)
+                                aggregated_data[key] = current_val + value
+                            elif key not in aggregated_data and value:
+                                agg_val = aggregated_data.get(key)
+                                if not agg_val:
+                                    aggregated_data[key] = value
+                except Exception:
+                    continue
+
+            if not aggregated_data:
+                # Fallback if nothing found
+                aggregated_data = parse_w2(source)
+                result = aggregated_data  # raw dict
+                result['form_type'] = 'W-2'  # Default
+                result['parse_confidence'] = 'failed'
+            else:
+                # Construct final result
+                aggregated_data['form_type'] = '+'.join(
+                    set(found_types)) if found_types else 'Unknown'
+                aggregated_data['parse_confidence'] = highest_confidence
+                # Each parser's own result, so that amounts such as federal
+                # withholding can still be attributed to the right form
+                aggregated_data['forms'] = forms
+                result = aggregated_data
+
+        return result
+
+    finally:
+        if isinstance(source, ParsedDocument):
+            source.close()
+
+
+# Parser result key -> TaxCalculationRequest field, per form type
+TAX_FIELDS = {
+    'W-2': {
+        'wages': 'w2_wages',
+        'federal_tax_withheld': 'w2_federal_withheld',
+        'state_tax_withheld': 'w2_state_withheld',
+        'social_security_wages': 'w2_social_security_wages',
+        'medicare_wages': 'w2_medicare_wages',
+        'medicare_tax_withheld': 'w2_medicare_tax',
+        'casdi': 'w2_casdi',
+    },
+    '1099-INT': {
+        'interest_income': 'interest_income',
+        'federal_tax_withheld': 'interest_federal_withheld',
+    },
+    '1099-DIV': {
+        'total_ordinary_dividends': 'ordinary_dividends',
+        'qualified_dividends': 'qualified_dividends',
+        'total_capital_gain_dist': 'capital_gain_distributions',
+        'federal_tax_withheld': 'dividend_federal_withheld',
+    },
+    '1099-B': {
+        'short_term_gains': 'short_term_gains',
+        'long_term_gains': 'long_term_gains',
+        'federal_tax_withheld': 'other_withholding',
+    },
+    '1099-NEC': {
+        'nonemployee_compensation': 'self_employment_income',
+        'federal_tax_withheld': 'self_employment_federal_withheld',
+    },
+    # Wages and withholding on a 1040 repeat the W-2s and 1099s; only
+    # the payments that appear nowhere else are taken from it
+    'Form 1040': {
+        'estimated_tax_payments': 'estimated_tax_payments',
+        'other_withholding': 'other_withholding',
+    },
+}
+
+
+def summarize_uploads(results: list[dict]) -> dict:
+    """
+    Add up parsed documents into tax calculation request fields.
+
+    Args:
+        results: parse_upload() results; failed parses are skipped
+
+    Returns:
+        Dict of the TaxCalculationRequest amount fields, each the sum over
+        every form that reports it
+    """
+    summary = {
+        field: 0.0 for fields in TAX_FIELDS.values() for field in fields.values()
+    }
+    for result in results:
+        if result.get('parse_confidence', 'failed') == 'failed':
+            continue
+        # A merged result of several parsers is summed per form
+        for form in result.get('forms') or [result]:
+            fields = TAX_FIELDS.get(form.get('form_type'), {})
+            for key, field in fields.items():
+                value = form.get(key)
+                if isinstance(value, (int, float)):
+                    summary[field] += value
+    return summary
@@ -0,0 +1,244 @@
+"""
+Parsed Document
+
+Opens a PDF once and lazily caches what the form parsers read from it
+(page text, lowercase text, words, tables, form annotations), so running
+several parsers over one upload costs a single extraction of each.
+
+Pages are extracted only when a parser reaches them, and pdfplumber's
+per-page layout objects are released as soon as a page's text, words or
+tables have been taken from them, so memory does not grow with the
+number of pages read.
+"""
+
+import codecs
+import io
+from contextlib import contextmanager
+from functools import cached_property
+from typing import BinaryIO, Iterator, Optional, Union
+import pdfplumber
+from pdfminer.pdftypes import resolve1
+from pdfminer.psparser import PSLiteral
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pragma: no cover - pypdf is optional for parsing
+    PdfReader = None
+
+# A PDF to open: its path, its bytes, or a seekable binary file object
+PdfSource = Union[str, bytes, BinaryIO]
+
+
+class ParsedDocument:
+    """A PDF opened with pdfplumber plus lazily extracted, cached content."""
+
+    def __init__(
+            self,
+            pdf: pdfplumber.PDF,
+            path: Optional[str] = None,
+            stream: Optional[BinaryIO] = None):
+        self.pdf = pdf
+        self.path = path
+        # File object the PDF is read from when it was not opened by path
+        self.stream = stream
+        self._page_text: dict[int, str] = {}
+        self._quick_text: dict[int, str] = {}
+        self._words: dict[int, list[dict]] = {}
+        self._tables: dict[int, list] = {}
+
+    @classmethod
+    def open(cls, source: PdfSource) -> 'ParsedDocument':
+        """
+        Open a PDF from a path, from its bytes, or from a file object.
+
+        A file object is read in place, without a copy, and is left open
+        for the caller to close.
+        """
+        if isinstance(source, str):
+            return cls(pdfplumber.open(source), path=source)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        return cls(pdfplumber.open(source), stream=source)
+
+    def close(self):
+        self.pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def pages(self) -> list:
+        return self.pdf.pages
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf.pages)
+
+    def _release(self, index: int):
+        # Drop the characters, layout and edges pdfplumber keeps per page
+        self.pdf.pages[index].flush_cache()
+
+    def page_text(self, index: int) -> str:
+        """extract_text() of one page, '' when the page has no text."""
+        if index not in self._page_text:
+            self._page_text[index] = self.pdf.pages[index].extract_text() or ''
+            self._release(index)
+        return self._page_text[index]
+
+    def iter_text(self, keep: bool = True) -> Iterator[str]:
+        """
+        Text of each page in turn, extracted as the iteration reaches it.
+
+        With keep=False pages not already cached are not cached either, so
+        that streaming through a long document holds one page at a time.
+        """
+        for index in range(self.page_count):
+            if keep or index in self._page_text:
+                yield self.page_text(index)
+            else:
+                text = self.pdf.pages[index].extract_text() or ''
+                self._release(index)
+                yield text
+
+    def quick_text(self, index: int) -> str:
+        """
+        Unordered text of one page for classification.
+
+        Read with pypdf, which skips pdfplumber's per-character layout
+        analysis and is several times faster; falls back to page_text()
+        when pypdf is unavailable or cannot read the page.
+        """
+        if index in self._page_text:
+            return self._page_text[index]
+        if index not in self._quick_text:
+            try:
+                self._quick_text[index] = self._pypdf_text(index)
+            except Exception:
+                self._quick_text[index] = self.page_text(index)
+        return self._quick_text[index]
+
+    def _pypdf_text(self, index: int) -> str:
+        if self.path is not None:
+            return PdfReader(self.path).pages[index].extract_text() or ''
+        # pdfplumber reads the same stream: put it back where it was
+        position = self.stream.tell()
+        try:
+            return PdfReader(self.stream).pages[index].extract_text() or ''
+        finally:
+            self.stream.seek(position)
+
+    def words(self, index: int) -> list[dict]:
+        """extract_words() of one page."""
+        if index not in self._words:
+            self._words[index] = self.pdf.pages[index].extract_words()
+            self._release(index)
+        return self._words[index]
+
+    def region_words(self, index: int, regions: dict) -> dict:
+        """
+        extract_words() of areas of one page, without extracting the rest.
+
+        Args:
+            regions: key -> (x0, top, x1, bottom), clipped to the page
+
+        Returns:
+            key -> words inside that area
+        """
+        page = self.pdf.pages[index]
+        words = {}
+        for key, (x0, top, x1, bottom) in regions.items():
+            bbox = (
+                max(x0, page.bbox[0]), max(top, page.bbox[1]),
+                min(x1, page.bbox[2]), min(bottom, page.bbox[3]))
+            if bbox[0] >= bbox[2] or bbox[1] >= bbox[3]:
+                words[key] = []
+                continue
+            words[key] = page.within_bbox(bbox).extract_words()
+        self._release(index)
+        return words
+
+    def tables(self, index: int) -> list:
+        """extract_tables() of one page."""
+        if index not in self._tables:
+            self._tables[index] = self.pdf.pages[index].extract_tables()
+            self._release(index)
+        return self._tables[index]
+
+    @cached_property
+    def text(self) -> str:
+        """Text of every page, each followed by a newline."""
+        return ''.join(
+            self.page_text(index) + '\n' for index in range(self.page_count))
+
+    @cached_property
+    def lower_text(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def annotations(self) -> list[dict]:
+        """Annotations (including AcroForm widgets) of every page."""
+        annotations = []
+        for page in self.pdf.pages:
+            annotations.extend(page.annots or [])
+        return annotations
+
+    @cached_property
+    def form_fields(self) -> dict[str, str]:
+        """
+        Fully qualified name -> value of every AcroForm field with a widget,
+        '' for fields left empty.
+
+        Names join the field's ancestors' names with dots, as in
+        "topmostSubform[0].CopyA[0].f2_1[0]"; values are inherited from
+        an ancestor when the widget has none.
+        """
+        fields = {}
+        for annot in self.annotations:
+            data = annot.get('data') or {}
+            names = []
+            value = None
+            node, depth = data, 0
+            # Walk up the field hierarchy, bounded against reference cycles
+            while isinstance(node, dict) and depth < 16:
+                if node.get('T') is not None:
+                    names.append(_pdf_string(node['T']))
+                if value is None and node.get('V') is not None:
+                    value = _pdf_string(node['V'])
+                node, depth = resolve1(node.get('Parent')), depth + 1
+            if names:
+                name = '.'.join(reversed(names))
+                if value or name not in fields:
+                    fields[name] = (value or '').strip()
+        return fields
+
+
+def _pdf_string(value) -> str:
+    """A PDF string, name or number as text."""
+    value = resolve1(value)
+    if isinstance(value, bytes):
+        if value.startswith(codecs.BOM_UTF16_BE):
+            return value[2:].decode('utf-16-be', errors='replace')
+        return value.decode('latin-1')
+    if isinstance(value, PSLiteral):
+        return str(value.name)
+    return str(value)
+
+
+@contextmanager
+def open_document(source: Union[PdfSource, ParsedDocument]) -> Iterator[ParsedDocument]:
+    """
+    Yield a ParsedDocument for a path, bytes, file object or an already
+    open document.
+
+    Documents opened here are closed on exit; a ParsedDocument passed in
+    is left open for its owner to close.
+    """
+    if isinstance(source, ParsedDocument):
+        yield source
+        return
+
+    with ParsedDocument.open(source) as document:
+        yield document
@@ -0,0 +1,224 @@
+"""
+Field Specs
+
+Declarative description of the boxes the text-based parsers read: each
+form lists its fields with their label patterns (in priority order), the
+pattern of the value that follows and the box number. Every registered
+form is compiled into one FieldScanner, which finds the candidate label
+positions of all forms in a single pass over each page and fills every
+field of every form from that pass.
+
+Scanning is incremental and shared per document: pages are read only
+until the requested form's fields are all found, and a second parser on
+the same document continues from the pages already scanned. Parsers that
+stream a document's pages without keeping them scan the same stream with
+scan_form_pages instead.
+"""
+
+import re
+import weakref
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+from .document import ParsedDocument
+
+# Amount without sign or currency symbol, e.g. "1,234.56"
+MONEY = r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
+
+# Amount with an optional minus sign and dollar sign, e.g. "$ -1,234.56"
+SIGNED_MONEY = r'[\$]?\s*(-?\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
+
+# Anything up to the first digit, the usual gap between a label and its value
+LABEL_GAP = r'[^\d]*'
+
+
+def money(text: str) -> float:
+    return float(text.replace(',', '').replace('$', ''))
+
+
+class FieldSpec(NamedTuple):
+    """One field of a form and how to find it in the form's text."""
+    field: str
+    labels: tuple[str, ...]  # regexes, highest priority first
+    box: Optional[str] = None
+    value: str = MONEY  # regex with one group capturing the value
+    gap: str = LABEL_GAP  # regex between the label and the value
+    ignore_case: bool = True
+    convert: Callable[[str], Any] = money
+
+
+# Registered forms: form type -> fields
+FORM_SPECS: dict[str, tuple[FieldSpec, ...]] = {}
+
+
+def form_spec(form_type: str, *fields: FieldSpec) -> tuple[FieldSpec, ...]:
+    """Register the fields of a form with the shared scanner."""
+    FORM_SPECS[form_type] = fields
+    global _scanner
+    _scanner = None
+    return fields
+
+
+class _Pattern(NamedTuple):
+    regex: re.Pattern
+    # (form type, field, rank of this label among the field's labels)
+    targets: tuple[tuple[str, str, int], ...]
+
+
+class _ScanState:
+    """Progress of a scanner through one document."""
+
+    def __init__(self):
+        self.pages_read = 0
+        self.previous = ''  # text of the last page read, for the next window
+        self.values: dict[tuple[str, str], Any] = {}
+
+
+class FieldScanner:
+    """All registered form specs compiled into one scanner."""
+
+    def __init__(self, specs: dict[str, tuple[FieldSpec, ...]]):
+        self.specs = specs
+        targets: dict[tuple[str, str], list] = {}
+        labels = []
+        for form_type, fields in specs.items():
+            for spec in fields:
+                for rank, label in enumerate(spec.labels):
+                    pattern = f'(?:{label}){spec.gap}{spec.value}'
+                    if spec.ignore_case:
+                        pattern = f'(?i:{pattern})'
+                        label = f'(?i:{label})'
+                    # Forms sharing a box label share its pattern
+                    targets.setdefault((pattern, label), []).append(
+                        (form_type, spec.field, rank))
+
+        self.patterns = []
+        for (pattern, label), pattern_targets in targets.items():
+            self.patterns.append(_Pattern(re.compile(pattern), tuple(pattern_targets)))
+            labels.append(label)
+
+        # Every position where any label starts, found in one pass
+        self.label_positions = re.compile(
+            '(?=' + '|'.join(f'(?:{label})' for label in labels) + ')')
+
+        self.converters = {
+            (form_type, spec.field): spec.convert
+            for form_type, fields in specs.items() for spec in fields
+        }
+        self._states = weakref.WeakKeyDictionary()
+
+    def scan_text(self, text: str, wanted: Optional[set] = None) -> dict[tuple[str, str], re.Match]:
+        """
+        First match of each pattern in text, per (form type, field) the
+        match of its highest priority label.
+
+        Args:
+            wanted: (form type, field) pairs to look for; None for all
+        """
+        pending = [
+            (index, pattern) for index, pattern in enumerate(self.patterns)
+            if wanted is None or any((form, field) in wanted for form, field, _ in pattern.targets)
+        ]
+        first = {}
+        for position in self.label_positions.finditer(text):
+            start = position.start()
+            remaining = []
+            for index, pattern in pending:
+                match = pattern.regex.match(text, start)
+                if match:
+                    first[index] = match
+                else:
+                    remaining.append((index, pattern))
+            pending = remaining
+            if not pending:
+                break
+
+        best = {}
+        for index, match in first.items():
+            for form_type, field, rank in self.patterns[index].targets:
+                key = (form_type, field)
+                if wanted is not None and key not in wanted:
+                    continue
+                if key not in best or rank < best[key][0]:
+                    best[key] = (rank, match)
+        return {key: match for key, (rank, match) in best.items()}
+
+    def scan(self, document: ParsedDocument, form_type: str) -> tuple[dict[str, Any], str]:
+        """
+        Values of one form's fields, reading pages until all are found.
+
+        Each page is scanned together with the page before it, so a value
+        may run across one page break. A field takes its value from the
+        first page on which any of its labels matches, preferring labels
+        listed first. Fields of the other forms found on the way are kept
+        for later scans of the same document.
+
+        Returns:
+            (field -> converted value of every field found, text of the
+            pages read, each followed by a newline)
+        """
+        state = self._states.get(document)
+        if state is None:
+            state = self._states[document] = _ScanState()
+
+        fields = {spec.field for spec in self.specs[form_type]}
+
+        def missing():
+            return {field for field in fields if (form_type, field) not in state.values}
+
+        while missing() and state.pages_read < document.page_count:
+            page = document.page_text(state.pages_read) + '\n'
+            state.pages_read += 1
+            wanted = {
+                key for key in self.converters if key not in state.values
+            }
+            for key, match in self.scan_text(state.previous + page, wanted).items():
+                state.values[key] = self.converters[key](match.group(1))
+            state.previous = page
+
+        values = {
+            field: state.values[(form_type, field)]
+            for field in (spec.field for spec in self.specs[form_type])
+            if (form_type, field) in state.values
+        }
+        text = ''.join(
+            document.page_text(index) + '\n' for index in range(state.pages_read))
+        return values, text
+
+    def scan_pages(self, pages: Iterable[str], form_type: str, values: dict) -> Iterator[str]:
+        """
+        Pass page texts through unchanged, adding one form's fields found
+        in them to values.
+
+        Fields are matched as in scan, each page together with the one
+        before it, until all are found; no page is kept beyond the next.
+        """
+        fields = [spec.field for spec in self.specs[form_type]]
+        previous = ''
+        for page_text in pages:
+            wanted = {(form_type, field) for field in fields if field not in values}
+            if wanted:
+                page = page_text + '\n'
+                for (_, field), match in self.scan_text(previous + page, wanted).items():
+                    values[field] = self.converters[(form_type, field)](match.group(1))
+                previous = page
+            yield page_text
+
+
+_scanner: Optional[FieldScanner] = None
+
+
+def get_scanner() -> FieldScanner:
+    """The scanner of every registered form, compiled on first use."""
+    global _scanner
+    if _scanner is None:
+        _scanner = FieldScanner(dict(FORM_SPECS))
+    return _scanner
+
+
+def scan_form(document: ParsedDocument, form_type: str) -> tuple[dict[str, Any], str]:
+    """Values of a registered form's fields in document; see FieldScanner.scan."""
+    return get_scanner().scan(document, form_type)
+
+
+def scan_form_pages(pages: Iterable[str], form_type: str, values: dict) -> Iterator[str]:
+    """Page texts passed through while filling values; see FieldScanner.scan_pages."""
+    return get_scanner().scan_pages(pages, form_type, values)
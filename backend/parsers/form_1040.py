@@ -11,11 +11,43 @@ Specifically targets:
 - Amount You Owe (Line 37)
 """
 
-import re
-import pdfplumber
-
-
-def parse_form_1040(pdf_path: str) -> dict:
+from typing import Union
+from .document import ParsedDocument, PdfSource, open_document
+from .field_spec import SIGNED_MONEY, FieldSpec, form_spec, scan_form
+
+# A line's amount may come anywhere later on the same line
+LINE_GAP = r'.*?'
+
+
+def _line(field: str, label: str, box: str, **options) -> FieldSpec:
+    return FieldSpec(field, (label,), box=box, value=SIGNED_MONEY, gap=LINE_GAP, **options)
+
+
+# 2024 Form 1040 lines
+FIELDS = form_spec(
+    'Form 1040',
+    # Line 1z: Wages, salaries, tips, etc.
+    # "1z Add lines 1a through 1h... 1z 886,551."
+    # OR "1z" ... amount
+    _line('wages', r'1z\s', '1z'),
+    # Line 24: Total Tax. "24 Add lines 22 and 23... 24 310,221."
+    _line('total_tax', r'24\s+Add\s+lines\s+22\s+and\s+23', '24'),
+    # Line 25d: Total Federal Withholding
+    # "25d Add lines 25a through 25c... 277,103."
+    _line('federal_withheld', r'25d\s+Add\s+lines\s+25a\s+through\s+25c', '25d'),
+    # Line 26: 2024 estimated tax payments and amount applied from 2023
+    # return
+    _line('estimated_tax_payments', r'26\s+2024\s+estimated\s+tax\s+payments', '26'),
+    # Line 25c: Other forms
+    # This is tricky because it's usually inside the block 25.
+    # "25c Other forms (see instructions)..."
+    _line('other_withholding', r'25c\s+Other\s+forms', '25c', ignore_case=False),
+    # Line 37: Amount you owe
+    _line('amount_owed', r'37\s+Amount\s+you\s+owe', '37'),
+)
+
+
+def parse_form_1040(source: Union[PdfSource, ParsedDocument]) -> dict:
     """
     Parse a Form 1040 PDF and extract key fields.
 
@@ -34,66 +66,11 @@ def parse_form_1040(pdf_path: str) -> dict:
     }
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            full_text = ''
-            for page in pdf.pages:
-                text = page.extract_text() or ''
-                full_text += text + '\n'
-
+        with open_document(source) as document:
+            # Reads pages only until every line has been found
+            values, full_text = scan_form(document, 'Form 1040')
             result['raw_text'] = full_text
-
-            # Helper to extract money
-            def extract_money(pattern, text):
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    val_str = match.group(1).replace(',', '').replace(
-                        '$', '').replace('(', '-').replace(')', '')
-                    try:
-                        return float(val_str)
-                    except ValueError:
-                        return 0.0
-                return 0.0
-
-            money_pattern = r'[\$]?\s*(-?\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
-
-            # 2024 Form 1040 Patterns
-
-            # Line 1z: Wages, salaries, tips, etc.
-            # "1z Add lines 1a through 1h... 1z 886,551."
-            # OR "1z" ... amount
-            result['wages'] = extract_money(
-                r'1z\s.*?' + money_pattern, full_text)
-
-            # Line 24: Total Tax. "24 Add lines 22 and 23... 24 310,221."
-            result['total_tax'] = extract_money(
-                r'24\s+Add\s+lines\s+22\s+and\s+23.*?' + money_pattern, full_text)
-
-            # Line 25d: Total Federal Withholding
-            # "25d Add lines 25a through 25c... 277,103."
-            result['federal_withheld'] = extract_money(
-                r'25d\s+Add\s+lines\s+25a\s+through\s+25c.*?' + money_pattern, full_text)
-
-            # Line 26: 2024 estimated tax payments and amount applied from 2023
-            # return
-            result['estimated_tax_payments'] = extract_money(
-                r'26\s+2024\s+estimated\s+tax\s+payments.*?' + money_pattern, full_text)
-
-            # Line 25c: Other forms
-            # This is tricky because it's usually inside the block 25.
-            # "25c Other forms (see instructions)..."
-            match_25c = re.search(
-                r'25c\s+Other\s+forms.*?' +
-                money_pattern,
-                full_text)
-            if match_25c:
-                result['other_withholding'] = float(
-                    match_25c.group(1).replace(
-                        ',', '').replace(
-                        '$', ''))
-
-            # Line 37: Amount you owe
-            result['amount_owed'] = extract_money(
-                r'37\s+Amount\s+you\s+owe.*?' + money_pattern, full_text)
+            result.update(values)
 
             # Confidence check
             # If we found Total Tax or Amount Owed, fairly confident it's a
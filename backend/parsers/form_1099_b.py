@@ -3,14 +3,277 @@
 
 Extracts capital gains/losses information from 1099-B forms.
 Note: 1099-B forms can be complex with multiple transactions.
-This parser extracts summary totals when available.
+Individual lots are streamed page by page and totaled as they are read;
+statements without recognizable lot lines fall back to summary totals.
 """
 
 import re
-import pdfplumber
+from datetime import date
+from typing import Iterable, Iterator, Optional, TypedDict, Union
+from .document import ParsedDocument, PdfSource, open_document
+from .field_spec import SIGNED_MONEY, FieldSpec, form_spec, scan_form_pages
 
+# Lots returned in the result's 'transactions'; all lots are totaled
+MAX_TRANSACTIONS = 1000
 
-def parse_1099_b(pdf_path: str) -> dict:
+# Federal tax withheld and broker name, read from the text
+FIELDS = form_spec(
+    '1099-B',
+    FieldSpec(
+        'federal_tax_withheld',
+        (r'Federal\s*(?:income\s*)?tax\s*withheld|Box\s*4',),
+        box='4',
+        value=SIGNED_MONEY),
+    FieldSpec(
+        'broker_name',
+        (r'PAYER.S?\s*name|Broker',),
+        value=r'([A-Z][A-Za-z0-9\s,\.]+)',
+        gap=r'[^\n]*\n',
+        convert=lambda name: name.strip()[:100]),
+)
+
+_DATE = r'\d{1,2}/\d{1,2}/\d{2,4}'
+_AMOUNT = r'\(?-?\$?\d{1,3}(?:,\d{3})*\.\d{2}\)?'
+
+# "100 sh APPLE INC 01/15/2023 06/20/2024 18,500.00 15,000.00 0.00 3,500.00":
+# description, date acquired (or VARIOUS), date sold, then proceeds, cost
+# basis, optional adjustments and gain/loss
+LOT_LINE = re.compile(
+    r'^(?P<description>\S.*?)\s+'
+    rf'(?P<acquired>{_DATE}|various)\s+'
+    rf'(?P<sold>{_DATE})\s+'
+    rf'(?P<amounts>{_AMOUNT}(?:\s+{_AMOUNT})+)\s*$',
+    re.IGNORECASE)
+_AMOUNTS = re.compile(_AMOUNT)
+
+# The column header row, e.g. "Proceeds Cost basis Accrued market discount
+# Wash sale loss disallowed Gain/loss"
+_COLUMN_HEADER = re.compile(r'\bproceeds\b.*\b(?:cost|basis)\b', re.IGNORECASE)
+_MARKET_DISCOUNT_COLUMN = re.compile(r'market\s*disc|mkt\.?\s*disc', re.IGNORECASE)
+
+_TERM_HEADER = re.compile(r'\b(short|long)[\s-]*term\b', re.IGNORECASE)
+_BOX_HEADER = re.compile(r'\bbox\s+([a-f])\b', re.IGNORECASE)
+
+# Form 8949 box of each term, by how the header describes basis reporting
+_BOXES = {
+    'short': {'reported': 'A', 'not reported': 'B', 'no 1099-b': 'C'},
+    'long': {'reported': 'D', 'not reported': 'E', 'no 1099-b': 'F'},
+}
+
+
+class Lot(TypedDict):
+    """One sale reported on a 1099-B."""
+    description: str
+    date_acquired: str  # as printed, or 'VARIOUS'
+    date_sold: str
+    proceeds: float
+    cost_basis: float
+    wash_sale_loss_disallowed: float
+    gain_loss: float
+    term: str  # 'short', 'long', or '' when unknown
+    box: str  # Form 8949 box 'A' to 'F', or '' when unknown
+
+
+def _amount(text: str) -> float:
+    negative = text.startswith('(') or '-' in text
+    value = float(text.strip('()').replace('-', '').replace('$', '').replace(',', ''))
+    return -value if negative else value
+
+
+def _date(text: str) -> Optional[date]:
+    try:
+        month, day, year = (int(part) for part in text.split('/'))
+        if year < 100:
+            year += 2000
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _held_over_a_year(acquired: Optional[date], sold: Optional[date]) -> Optional[bool]:
+    if acquired is None or sold is None:
+        return None
+    try:
+        anniversary = acquired.replace(year=acquired.year + 1)
+    except ValueError:  # acquired on February 29
+        anniversary = date(acquired.year + 1, 3, 1)
+    return sold > anniversary
+
+
+def _section(line: str, term: str, box: str) -> tuple[str, str]:
+    """Term and box in effect after a line that is not a lot."""
+    term_match = _TERM_HEADER.search(line)
+    if not term_match:
+        return term, box
+    term = term_match.group(1).lower()
+
+    box_match = _BOX_HEADER.search(line)
+    if box_match:
+        return term, box_match.group(1).upper()
+    lower = line.lower()
+    if 'not reported on form 1099-b' in lower or 'not reported on 1099-b' in lower:
+        return term, _BOXES[term]['no 1099-b']
+    if 'not reported' in lower or 'noncovered' in lower:
+        return term, _BOXES[term]['not reported']
+    if 'reported to the irs' in lower or 'covered' in lower:
+        return term, _BOXES[term]['reported']
+    return term, ''
+
+
+def parse_lot_line(
+    line: str,
+    term: str = '',
+    box: str = '',
+    market_discount: Optional[bool] = None,
+) -> Optional[Lot]:
+    """
+    A Lot from one statement line, or None when the line is not a lot.
+
+    Amounts after the dates are read as proceeds, cost basis, then either
+    gain/loss alone, one adjustment and gain/loss, or accrued market
+    discount, wash sale loss disallowed and gain/loss. The one adjustment
+    is the accrued market discount when the section's column header has
+    that column (market_discount=True) and the wash sale loss disallowed
+    otherwise, including when no header has been seen. Without a section
+    term, the holding period decides it.
+    """
+    match = LOT_LINE.match(line.strip())
+    if not match:
+        return None
+
+    amounts = [_amount(a) for a in _AMOUNTS.findall(match.group('amounts'))]
+    proceeds, cost_basis = amounts[0], amounts[1]
+    if len(amounts) >= 5:
+        wash_sale = amounts[3]
+    elif len(amounts) == 4 and not market_discount:
+        wash_sale = amounts[2]
+    else:
+        wash_sale = 0.0
+    if len(amounts) >= 3:
+        gain_loss = amounts[-1]
+    else:
+        gain_loss = round(proceeds - cost_basis + wash_sale, 2)
+
+    acquired = match.group('acquired')
+    sold = match.group('sold')
+    if not term:
+        long_held = _held_over_a_year(_date(acquired), _date(sold))
+        if long_held is not None:
+            term = 'long' if long_held else 'short'
+
+    return {
+        'description': match.group('description').strip(),
+        'date_acquired': acquired.upper() if acquired.lower() == 'various' else acquired,
+        'date_sold': sold,
+        'proceeds': proceeds,
+        'cost_basis': cost_basis,
+        'wash_sale_loss_disallowed': wash_sale,
+        'gain_loss': gain_loss,
+        'term': term,
+        'box': box,
+    }
+
+
+def _lots_of_pages(pages: Iterable[str]) -> Iterator[Lot]:
+    term = box = ''
+    market_discount = None
+    for page_text in pages:
+        for line in page_text.split('\n'):
+            lot = parse_lot_line(line, term, box, market_discount)
+            if lot is not None:
+                yield lot
+            elif _COLUMN_HEADER.search(line):
+                market_discount = bool(_MARKET_DISCOUNT_COLUMN.search(line))
+            else:
+                term, box = _section(line, term, box)
+
+
+def iter_1099_b_lots(source: Union[PdfSource, ParsedDocument]) -> Iterator[Lot]:
+    """
+    Yield every lot of a 1099-B statement, one page at a time.
+
+    Pages are read as the iteration reaches them and are not kept, so
+    memory stays constant however many lots the statement has. Section
+    headers ("Short-term transactions for which basis is reported to the
+    IRS", "Box E", ...) set the term and box of the lots that follow.
+    """
+    with open_document(source) as document:
+        yield from _lots_of_pages(document.iter_text(keep=False))
+
+
+class LotTotals:
+    """Proceeds, basis, wash sales and gain/loss added up lot by lot."""
+
+    FIELDS = ('proceeds', 'cost_basis', 'wash_sale_loss_disallowed', 'gain_loss')
+
+    def __init__(self):
+        self.count = 0
+        self.by_term = {}
+        self.by_box = {}
+
+    def add(self, lot: Lot):
+        self.count += 1
+        for totals, key in ((self.by_term, lot['term']), (self.by_box, lot['box'])):
+            row = totals.setdefault(key, {'count': 0, **dict.fromkeys(self.FIELDS, 0.0)})
+            row['count'] += 1
+            for field in self.FIELDS:
+                row[field] = round(row[field] + lot[field], 2)
+
+    def term_total(self, term: str, field: str) -> float:
+        return self.by_term.get(term, {}).get(field, 0.0)
+
+
+def _parse_summary_totals(full_text: str, result: dict, money_pattern: str):
+    """Short- and long-term gain/loss from a statement's summary lines."""
+    # Look for summary sections - these vary widely by broker
+    # Try to find short-term and long-term summary lines
+
+    # Try to find short-term totals (1099-B or Schedule D)
+    short_term_patterns = [
+        r'Short[\-\s]?term.*?total[s]?.*?' +
+        money_pattern,
+        r'Total\s+short[\-\s]?term.*?' +
+        money_pattern,
+        r'Net\s+short[\-\s]?term\s+capital\s+gain\s+or\s+\(loss\).*?' +
+        money_pattern,
+    ]
+
+    long_term_patterns = [
+        r'Long[\-\s]?term.*?total[s]?.*?' +
+        money_pattern,
+        r'Total\s+long[\-\s]?term.*?' +
+        money_pattern,
+        r'Net\s+long[\-\s]?term\s+capital\s+gain\s+or\s+\(loss\).*?' +
+        money_pattern,
+    ]
+
+    # Try to find gain/loss amounts
+    for pattern in short_term_patterns:
+        matches = re.findall(
+            pattern, full_text, re.IGNORECASE | re.DOTALL)
+        if matches:
+            # Take the last match as it's likely the gain/loss
+            value_str = matches[-1].replace(',', '').replace('$', '')
+            try:
+                result['short_term_gains'] = float(value_str)
+            except ValueError:
+                pass
+            break
+
+    for pattern in long_term_patterns:
+        matches = re.findall(
+            pattern, full_text, re.IGNORECASE | re.DOTALL)
+        if matches:
+            value_str = matches[-1].replace(',', '').replace(
+                '$', '').replace('(', '-').replace(')', '')
+            try:
+                result['long_term_gains'] = float(value_str)
+            except ValueError:
+                pass
+            break
+
+
+def parse_1099_b(source: Union[PdfSource, ParsedDocument]) -> dict:
     """
     Parse a 1099-B PDF and extract capital gains/losses information.
 
@@ -23,6 +286,12 @@ def parse_1099_b(pdf_path: str) -> dict:
     - long_term_gain_loss: Net long-term gain/loss
     - federal_tax_withheld: Federal income tax withheld
     - broker_name: Name of the broker
+    - transactions: The first MAX_TRANSACTIONS lots (see Lot)
+    - transaction_count: Number of lots, when lots were found
+    - box_totals: Count and sums of the lots per Form 8949 box
+    - unclassified_count, unclassified_proceeds, unclassified_cost_basis,
+      unclassified_gains: Lots whose term is unknown (no section header
+      and no acquisition date), left out of the short- and long-term totals
     """
     result = {
         'form_type': '1099-B',
@@ -40,83 +309,56 @@ def parse_1099_b(pdf_path: str) -> dict:
     }
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            full_text = ''
-            for page in pdf.pages:
-                text = page.extract_text() or ''
-                full_text += text + '\n'
-
-            result['raw_text'] = full_text
-
-            # Look for summary sections - these vary widely by broker
-            # Try to find short-term and long-term summary lines
-
-            # Pattern for summary amounts (proceeds, cost basis, gain/loss)
-            money_pattern = r'[\$]?\s*(-?\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
-
-            # Try to find short-term totals (1099-B or Schedule D)
-            short_term_patterns = [
-                r'Short[\-\s]?term.*?total[s]?.*?' +
-                money_pattern,
-                r'Total\s+short[\-\s]?term.*?' +
-                money_pattern,
-                r'Net\s+short[\-\s]?term\s+capital\s+gain\s+or\s+\(loss\).*?' +
-                money_pattern,
-            ]
-
-            long_term_patterns = [
-                r'Long[\-\s]?term.*?total[s]?.*?' +
-                money_pattern,
-                r'Total\s+long[\-\s]?term.*?' +
-                money_pattern,
-                r'Net\s+long[\-\s]?term\s+capital\s+gain\s+or\s+\(loss\).*?' +
-                money_pattern,
-            ]
-
-            # Try to find gain/loss amounts
-            for pattern in short_term_patterns:
-                matches = re.findall(
-                    pattern, full_text, re.IGNORECASE | re.DOTALL)
-                if matches:
-                    # Take the last match as it's likely the gain/loss
-                    value_str = matches[-1].replace(',', '').replace('$', '')
-                    try:
-                        result['short_term_gains'] = float(value_str)
-                    except ValueError:
-                        pass
-                    break
-
-            for pattern in long_term_patterns:
-                matches = re.findall(
-                    pattern, full_text, re.IGNORECASE | re.DOTALL)
-                if matches:
-                    value_str = matches[-1].replace(',', '').replace(
-                        '$', '').replace('(', '-').replace(')', '')
-                    try:
-                        result['long_term_gains'] = float(value_str)
-                    except ValueError:
-                        pass
-                    break
-
-            # Look for federal tax withheld
-            withheld_pattern = r'(?:Federal\s*(?:income\s*)?tax\s*withheld|Box\s*4)[^\d]*' + money_pattern
-            withheld_match = re.search(
-                withheld_pattern, full_text, re.IGNORECASE)
-            if withheld_match:
-                value_str = withheld_match.group(1).replace(',', '')
-                result['federal_tax_withheld'] = float(value_str)
-
-            # Try to extract broker name
-            broker_pattern = r'(?:PAYER.S?\s*name|Broker)[^\n]*\n([A-Z][A-Za-z0-9\s,\.]+)'
-            broker_match = re.search(broker_pattern, full_text, re.IGNORECASE)
-            if broker_match:
-                result['broker_name'] = broker_match.group(1).strip()[:100]
+        with open_document(source) as document:
+            # Text of the pages read before the first lot, for the summary
+            # totals of statements without lots
+            summary_pages = []
+
+            def pages():
+                # One pass over the pages, keeping only the first page's text
+                # and the pages of a statement with no lots so far
+                for index, page_text in enumerate(document.iter_text(keep=False)):
+                    if index == 0:
+                        result['raw_text'] = page_text + '\n'
+                    if totals.count:
+                        summary_pages.clear()
+                    else:
+                        summary_pages.append(page_text + '\n')
+                    yield page_text
+
+            # Federal tax withheld and broker name, read from the same pass
+            # as the lots
+            values = {}
+            totals = LotTotals()
+            for lot in _lots_of_pages(scan_form_pages(pages(), '1099-B', values)):
+                totals.add(lot)
+                if len(result['transactions']) < MAX_TRANSACTIONS:
+                    result['transactions'].append(lot)
+            result.update(values)
+
+            if totals.count:
+                for term in ('short', 'long'):
+                    result[f'{term}_term_proceeds'] = totals.term_total(term, 'proceeds')
+                    result[f'{term}_term_cost_basis'] = totals.term_total(term, 'cost_basis')
+                    result[f'{term}_term_gains'] = totals.term_total(term, 'gain_loss')
+                result['unclassified_count'] = totals.by_term.get('', {}).get('count', 0)
+                result['unclassified_proceeds'] = totals.term_total('', 'proceeds')
+                result['unclassified_cost_basis'] = totals.term_total('', 'cost_basis')
+                result['unclassified_gains'] = totals.term_total('', 'gain_loss')
+                result['transaction_count'] = totals.count
+                result['box_totals'] = totals.by_box
+            else:
+                result['raw_text'] = ''.join(summary_pages)
+                _parse_summary_totals(result['raw_text'], result, SIGNED_MONEY)
 
             # Set confidence - 1099-B is complex, so we're more conservative
             has_short = result['short_term_gains'] != 0
             has_long = result['long_term_gains'] != 0
 
-            if has_short or has_long:
+            if totals.count and not result['unclassified_count']:
+                result['parse_confidence'] = 'high'
+            elif totals.count or has_short or has_long:
+                # Lots of unknown term need the user to classify them
                 result['parse_confidence'] = 'medium'
             else:
                 result['parse_confidence'] = 'low'
@@ -4,12 +4,32 @@
 Extracts dividend income information from 1099-DIV forms.
 """
 
-import re
-import pdfplumber
+from typing import Union
+from .acroform import read_form_fields
+from .document import ParsedDocument, PdfSource, open_document
+from .field_spec import FieldSpec, form_spec, scan_form
 from .utils import extract_payer_from_fields, extract_payer_name_from_text
 
 
-def parse_1099_div(pdf_path: str) -> dict:
+FIELDS = form_spec(
+    '1099-DIV',
+    FieldSpec('total_ordinary_dividends', (
+        r'Box\s*1a|1a\s+Total\s*ordinary',
+        r'Total\s*ordinary\s*dividends',
+    ), box='1a'),
+    FieldSpec('qualified_dividends', (
+        r'Box\s*1b|1b\s+Qualified',
+        r'Qualified\s*dividends',
+    ), box='1b'),
+    FieldSpec('total_capital_gain_dist', (
+        r'Box\s*2a|2a\s+Total\s*capital',
+        r'Total\s*capital\s*gain\s*dist',
+    ), box='2a'),
+    FieldSpec('federal_tax_withheld', (r'Box\s*4|4\s+Federal\s*income\s*tax',), box='4'),
+)
+
+
+def parse_1099_div(source: Union[PdfSource, ParsedDocument]) -> dict:
     """
     Parse a 1099-DIV PDF and extract relevant tax information.
 
@@ -32,45 +52,24 @@ def parse_1099_div(pdf_path: str) -> dict:
     }
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
+        with open_document(source) as document:
+            # A fillable form with its boxes filled in needs no text
+            values = read_form_fields(document, '1099-DIV')
             full_text = ''
-            for page in pdf.pages:
-                text = page.extract_text() or ''
-                full_text += text + '\n'
-
+            if not values:
+                # Reads pages only until every box has been found
+                values, full_text = scan_form(document, '1099-DIV')
             result['raw_text'] = full_text
-
-            patterns = {
-                'total_ordinary_dividends': [
-                    r'(?:Box\s*1a|1a\s+Total\s*ordinary)[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                    r'Total\s*ordinary\s*dividends[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                ],
-                'qualified_dividends': [
-                    r'(?:Box\s*1b|1b\s+Qualified)[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                    r'Qualified\s*dividends[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                ],
-                'total_capital_gain_dist': [
-                    r'(?:Box\s*2a|2a\s+Total\s*capital)[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                    r'Total\s*capital\s*gain\s*dist[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                ],
-                'federal_tax_withheld': [
-                    r'(?:Box\s*4|4\s+Federal\s*income\s*tax)[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                ],
-            }
-
-            fields_found = 0
-            for field, pattern_list in patterns.items():
-                for pattern in pattern_list:
-                    match = re.search(pattern, full_text, re.IGNORECASE)
-                    if match:
-                        value_str = match.group(1).replace(',', '')
-                        result[field] = float(value_str)
-                        fields_found += 1
-                        break
+            result.update(values)
+            fields_found = sum(1 for value in values.values() if isinstance(value, float))
 
             # Try to extract payer name: first from form fields, then text
-            result['payer_name'] = extract_payer_from_fields(pdf)
             if not result['payer_name']:
+                result['payer_name'] = extract_payer_from_fields(document)
+            if not result['payer_name'] and not full_text and document.page_count:
+                # Fields with the amounts but not the payer: read its page
+                full_text = result['raw_text'] = document.page_text(0)
+            if not result['payer_name'] and full_text:
                 result['payer_name'] = extract_payer_name_from_text(full_text)
 
             if fields_found >= 3:
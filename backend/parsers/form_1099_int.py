@@ -4,12 +4,26 @@
 Extracts interest income information from 1099-INT forms.
 """
 
-import re
-import pdfplumber
+from typing import Union
+from .acroform import read_form_fields
+from .document import ParsedDocument, PdfSource, open_document
+from .field_spec import FieldSpec, form_spec, scan_form
 from .utils import extract_payer_from_fields, extract_payer_name_from_text
 
 
-def parse_1099_int(pdf_path: str) -> dict:
+FIELDS = form_spec(
+    '1099-INT',
+    FieldSpec('interest_income', (
+        r'Box\s*1|1\s+Interest\s*income',
+        r'Interest\s*income',
+    ), box='1'),
+    FieldSpec('early_withdrawal_penalty', (r'Box\s*2|2\s+Early\s*withdrawal',), box='2'),
+    FieldSpec('us_savings_bond_interest', (r'Box\s*3|3\s+Interest\s*on\s*U\.?S\.?',), box='3'),
+    FieldSpec('federal_tax_withheld', (r'Box\s*4|4\s+Federal\s*income\s*tax',), box='4'),
+)
+
+
+def parse_1099_int(source: Union[PdfSource, ParsedDocument]) -> dict:
     """
     Parse a 1099-INT PDF and extract relevant tax information.
 
@@ -32,43 +46,24 @@ def parse_1099_int(pdf_path: str) -> dict:
     }
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
+        with open_document(source) as document:
+            # A fillable form with its boxes filled in needs no text
+            values = read_form_fields(document, '1099-INT')
             full_text = ''
-            for page in pdf.pages:
-                text = page.extract_text() or ''
-                full_text += text + '\n'
-
+            if not values:
+                # Reads pages only until every box has been found
+                values, full_text = scan_form(document, '1099-INT')
             result['raw_text'] = full_text
-
-            patterns = {
-                'interest_income': [
-                    r'(?:Box\s*1|1\s+Interest\s*income)[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                    r'Interest\s*income[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                ],
-                'early_withdrawal_penalty': [
-                    r'(?:Box\s*2|2\s+Early\s*withdrawal)[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                ],
-                'us_savings_bond_interest': [
-                    r'(?:Box\s*3|3\s+Interest\s*on\s*U\.?S\.?)[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                ],
-                'federal_tax_withheld': [
-                    r'(?:Box\s*4|4\s+Federal\s*income\s*tax)[^\d]*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                ],
-            }
-
-            fields_found = 0
-            for field, pattern_list in patterns.items():
-                for pattern in pattern_list:
-                    match = re.search(pattern, full_text, re.IGNORECASE)
-                    if match:
-                        value_str = match.group(1).replace(',', '')
-                        result[field] = float(value_str)
-                        fields_found += 1
-                        break
+            result.update(values)
+            fields_found = sum(1 for value in values.values() if isinstance(value, float))
 
             # Try to extract payer name: first from form fields, then text
-            result['payer_name'] = extract_payer_from_fields(pdf)
             if not result['payer_name']:
+                result['payer_name'] = extract_payer_from_fields(document)
+            if not result['payer_name'] and not full_text and document.page_count:
+                # Fields with the amounts but not the payer: read its page
+                full_text = result['raw_text'] = document.page_text(0)
+            if not result['payer_name'] and full_text:
                 result['payer_name'] = extract_payer_name_from_text(full_text)
 
             if fields_found >= 2:
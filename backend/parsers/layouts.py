@@ -0,0 +1,200 @@
+"""
+Layout Templates
+
+Payroll providers and brokerages print each form from a fixed layout, so
+once a document has been parsed the position of every box is known for
+all later documents of the same layout. A layout is recognised by a
+fingerprint of the form type, page size, the PDF's producer and creator
+metadata and the positions of a few anchor labels, all read without any
+layout analysis, so that two issuers printing through the same software
+do not share a template. Its template holds the area of each box's cell;
+a parser given a template crops just those areas instead of extracting
+the whole page, and checks that each area still holds its box's label
+before trusting it.
+
+Templates are learned from successful generic parses and persisted in
+SQLite, shared by every worker process.
+
+Configured with environment variables:
+- OPENTAX_LAYOUT_TEMPLATES: database path, or 'off' to disable templates
+  (default: opentax_layouts.sqlite3 in the temp directory)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import NamedTuple, Optional
+from .document import ParsedDocument
+
+DEFAULT_TEMPLATES_PATH = os.path.join(tempfile.gettempdir(), 'opentax_layouts.sqlite3')
+
+# Points added around each learned box, for small shifts between documents
+REGION_PADDING = 2.0
+
+# Points the positions of anchor labels are rounded to in fingerprints
+ANCHOR_GRID = 4
+
+logger = logging.getLogger(__name__)
+
+
+def _anchor_position(page_obj, anchor: str) -> str:
+    # Rounded bbox of the first match of anchor in the page's characters,
+    # joined in content-stream order without spaces or layout analysis
+    text, owners = [], []
+    for char in page_obj.chars:
+        if char['text'].isspace():
+            continue
+        text.append(char['text'])
+        owners.extend([char] * len(char['text']))
+    match = re.search(anchor, ''.join(text), re.IGNORECASE)
+    if match is None:
+        return '-'
+    chars = owners[match.start():match.end()]
+    bbox = (
+        min(c['x0'] for c in chars), min(c['top'] for c in chars),
+        max(c['x1'] for c in chars), max(c['bottom'] for c in chars))
+    return ','.join(str(round(value / ANCHOR_GRID)) for value in bbox)
+
+
+def layout_fingerprint(
+        document: ParsedDocument,
+        form_type: str,
+        page: int = 0,
+        anchors: tuple[str, ...] = ()) -> str:
+    """
+    Hash of the form type, page size, producing software and the positions
+    of the anchor labels of a document.
+
+    Args:
+        anchors: regexes of labels every layout of the form prints, matched
+            case-insensitively against the page's characters without spaces
+    """
+    metadata = document.pdf.metadata or {}
+    page_obj = document.pages[page]
+    key = '|'.join([
+        form_type,
+        f'{round(float(page_obj.width))}x{round(float(page_obj.height))}',
+        str(metadata.get('Producer', '')),
+        str(metadata.get('Creator', '')),
+    ] + [_anchor_position(page_obj, anchor) for anchor in anchors])
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+class LayoutTemplate(NamedTuple):
+    """Where each box of one layout is."""
+    fingerprint: str
+    form_type: str
+    page: int
+    regions: dict[str, tuple[float, float, float, float]]  # field -> (x0, top, x1, bottom)
+
+    @classmethod
+    def from_boxes(cls, fingerprint: str, form_type: str, page: int, boxes: dict) -> 'LayoutTemplate':
+        """Template of boxes found by a parser, as {field: (x0, top, x1, bottom)}."""
+        regions = {
+            field: (
+                bbox[0] - REGION_PADDING, bbox[1] - REGION_PADDING,
+                bbox[2] + REGION_PADDING, bbox[3] + REGION_PADDING)
+            for field, bbox in boxes.items()
+        }
+        return cls(fingerprint, form_type, page, regions)
+
+
+class LayoutStore:
+    """SQLite store of layout templates keyed by fingerprint."""
+
+    def __init__(self, path: str = DEFAULT_TEMPLATES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS layout_templates ("
+                " fingerprint TEXT PRIMARY KEY,"
+                " form_type TEXT NOT NULL,"
+                " template TEXT NOT NULL,"
+                " uses INTEGER NOT NULL DEFAULT 0,"
+                " updated REAL NOT NULL)")
+
+    @classmethod
+    def from_env(cls) -> Optional['LayoutStore']:
+        """The configured store, or None when templates are turned off."""
+        path = os.environ.get('OPENTAX_LAYOUT_TEMPLATES') or DEFAULT_TEMPLATES_PATH
+        if path.lower() == 'off':
+            return None
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            # Parsing still works without templates
+            logger.warning("Layout templates at %s are unavailable: %s", path, e)
+            return None
+
+    def get(self, fingerprint: str) -> Optional[LayoutTemplate]:
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT template FROM layout_templates WHERE fingerprint = ?",
+                (fingerprint,)).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._connection.execute(
+                "UPDATE layout_templates SET uses = uses + 1 WHERE fingerprint = ?",
+                (fingerprint,))
+        data = json.loads(row[0])
+        return LayoutTemplate(
+            fingerprint, data['form_type'], data['page'],
+            {field: tuple(bbox) for field, bbox in data['regions'].items()})
+
+    def put(self, template: LayoutTemplate):
+        """Store a template, replacing any other of the same layout."""
+        value = json.dumps({
+            'form_type': template.form_type,
+            'page': template.page,
+            'regions': template.regions,
+        })
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO layout_templates "
+                "(fingerprint, form_type, template, uses, updated) VALUES (?, ?, ?, 0, ?)",
+                (template.fingerprint, template.form_type, value, time.time()))
+
+    def remove(self, fingerprint: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM layout_templates WHERE fingerprint = ?", (fingerprint,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def stats(self) -> dict:
+        """Template count per form type and hit and miss counters."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT form_type, COUNT(*) FROM layout_templates GROUP BY form_type").fetchall()
+            return {
+                'templates': dict(rows),
+                'hits': self._hits,
+                'misses': self._misses,
+            }
+
+
+_store: Optional[LayoutStore] = None
+_store_loaded = False
+
+
+def get_layout_store() -> Optional[LayoutStore]:
+    """This process's configured store, opened on first use."""
+    global _store, _store_loaded
+    if not _store_loaded:
+        _store = LayoutStore.from_env()
+        _store_loaded = True
+    return _store
@@ -0,0 +1,190 @@
+"""
+Parse Cache
+
+Persistent, content-addressed store of parse results in SQLite, so that
+re-uploading the same PDF skips pdfplumber entirely. Results are keyed by
+the SHA-256 of the uploaded bytes, the parser version and the form type
+hint. The parser version is a hash of the parser sources and data files:
+editing any parser drops every result parsed by the old code. The least
+recently used results are evicted once the stored results exceed the
+size limit.
+
+Privacy: the cache keeps parse results of tax documents on disk, so the
+amounts, payer and employer names of every upload outlive the request.
+The extracted page text (raw_text, which holds SSNs and addresses) is
+never stored; cached results come back without it. The database is
+created readable by its owner only. Turn the cache off where even the
+amounts must not be kept on disk.
+
+Configured with environment variables:
+- OPENTAX_PARSE_CACHE: database path, or 'off' to disable the cache
+  (default: opentax_parse_cache.sqlite3 in the temp directory)
+- OPENTAX_PARSE_CACHE_BYTES: size limit of the stored results (default 64 MiB)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Optional
+
+PARSERS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), 'opentax_parse_cache.sqlite3')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+def parser_version(directory: str = PARSERS_DIR) -> str:
+    """Hash of every source and data file of the parsers package."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith(('.pyc', '.pyo')):
+                continue
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, directory).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+PARSER_VERSION = parser_version()
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _create_private(path: str):
+    # Create the database file readable and writable by its owner only;
+    # SQLite gives its journal files the same permissions
+    os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+    os.chmod(path, 0o600)
+
+
+class ParseCache:
+    """SQLite store of parse results with LRU eviction by total size."""
+
+    def __init__(
+            self,
+            path: str = DEFAULT_CACHE_PATH,
+            max_bytes: int = DEFAULT_MAX_BYTES,
+            version: str = PARSER_VERSION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        _create_private(path)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS parse_results ("
+                " digest TEXT NOT NULL,"
+                " version TEXT NOT NULL,"
+                " hint TEXT NOT NULL,"
+                " result TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (digest, version, hint))")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS parse_results_last_used "
+                "ON parse_results (last_used)")
+            # Results of other parser versions can never be hit again
+            self._connection.execute(
+                "DELETE FROM parse_results WHERE version != ?", (version,))
+
+    @classmethod
+    def from_env(cls) -> Optional['ParseCache']:
+        """The configured cache, or None when it is turned off."""
+        path = os.environ.get('OPENTAX_PARSE_CACHE') or DEFAULT_CACHE_PATH
+        if path.lower() == 'off':
+            return None
+        max_bytes = int(os.environ.get('OPENTAX_PARSE_CACHE_BYTES') or DEFAULT_MAX_BYTES)
+        try:
+            return cls(path, max_bytes)
+        except (sqlite3.Error, OSError) as e:
+            # Parsing still works without the cache
+            logger.warning("Parse cache at %s is unavailable: %s", path, e)
+            return None
+
+    def get(self, digest: str, hint: Optional[str] = None) -> Optional[dict]:
+        """Stored result for these bytes and hint, or None."""
+        key = (digest, self.version, hint or '')
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT result FROM parse_results "
+                "WHERE digest = ? AND version = ? AND hint = ?", key).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._connection.execute(
+                "UPDATE parse_results SET last_used = ? "
+                "WHERE digest = ? AND version = ? AND hint = ?", (time.time(), *key))
+        return json.loads(row[0])
+
+    def put(self, digest: str, hint: Optional[str], result: dict):
+        """
+        Store a result without its raw_text, evicting the least recently
+        used ones over the limit.
+        """
+        value = json.dumps({key: item for key, item in result.items() if key != 'raw_text'})
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO parse_results VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, self.version, hint or '', value, size, time.time()))
+            self._evict()
+
+    def _evict(self):
+        # Called with the lock held, inside a transaction
+        total = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM parse_results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._connection.execute(
+            "SELECT rowid, size FROM parse_results ORDER BY last_used").fetchall()
+        evicted = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((rowid,))
+            total -= size
+        self._connection.executemany(
+            "DELETE FROM parse_results WHERE rowid = ?", evicted)
+        self._evictions += len(evicted)
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM parse_results")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def stats(self) -> dict:
+        """Entry count, stored bytes and hit, miss and eviction counters."""
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parse_results").fetchone()
+            return {
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'parser_version': self.version,
+            }
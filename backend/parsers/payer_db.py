@@ -1,43 +1,149 @@
 
-# List of popular payer names to cross-reference against
+# Popular payer names to cross-reference against.
 # This list helps prioritize known financial institutions over random text.
+#
+# The names live in data/payers.txt, one per line. They are compiled into an
+# Aho-Corasick automaton, so finding every known payer inside a candidate
+# line takes one pass over the line however many payers there are, and into
+# a trigram index for near misses such as OCR errors or dropped words.
 
-POPULAR_PAYERS = [
-    # Major Banks
-    "JPMORGAN CHASE BANK", "CHASE BANK", "J.P. MORGAN", "WELLS FARGO", "BANK OF AMERICA",
-    "CITIBANK", "U.S. BANK", "PNC BANK", "TRUIST BANK", "GOLDMAN SACHS", "CAPITAL ONE",
-    "TD BANK", "BANK OF THE WEST", "BMO HARRIS BANK", "FIFTH THIRD BANK", "KEYBANK",
-    "M&T BANK", "HUNTINGTON NATIONAL BANK", "REGIONS BANK", "CITIZENS BANK",
-    "ALLY BANK", "DISCOVER BANK", "SYNCHRONY BANK", "BARCLAYS BANK DELAWARE",
-    "AMERICAN EXPRESS NATIONAL BANK", "CHARLES SCHWAB BANK", "MORGAN STANLEY PRIVATE BANK",
-
-    # Brokerages & Investment Firms
-    "VANGUARD", "VANGUARD GROUP", "VANGUARD MARKETING CORPORATION",
-    "FIDELITY INVESTMENTS", "FIDELITY BROKERAGE SERVICES", "NATIONAL FINANCIAL SERVICES",
-    "CHARLES SCHWAB & CO", "TD AMERITRADE", "E*TRADE", "ETRADE", "MORGAN STANLEY",
-    "MERRILL LYNCH", "EDWARD JONES", "RAYMOND JAMES", "LPL FINANCIAL",
-    "INTERACTIVE BROKERS", "ROBINHOOD", "ROBINHOOD SECURITIES", "ROBINHOOD FINANCIAL",
-    "WEBULL", "COINBASE", "GEMINI TRUST COMPANY", "BLOCKFI", "KRAKEN",
-    "BETTERMENT", "WEALTHFRONT", "ACORNS", "STASH", "M1 FINANCE",
-    "T. ROWE PRICE", "BLACKROCK", "INVESCO", "FRANKLIN TEMPLETON",
-    "AMERICAN FUNDS", "PIMCO", "JANUS HENDERSON",
-
-    # Credit Unions (Generic top ones)
-    "NAVY FEDERAL CREDIT UNION", "STATE EMPLOYEES' CREDIT UNION", "PENTAGON FEDERAL CREDIT UNION",
-    "BECU", "SCHOOLSFIRST FEDERAL CREDIT UNION", "GOLDEN 1 CREDIT UNION",
-    "ALLIANT CREDIT UNION", "FIRST TECH FEDERAL CREDIT UNION",
-
-    # Fintech / Neobanks
-    "CHIME", "VARO BANK", "SOFI BANK", "REVOLUT", "CURRENT", "ASPIRATION",
-    "PAYPAL", "SQUARE", "BLOCK", "CASH APP", "STRIPE", "ADYEN",
-
-    # Government / Treasury
-    "DEPARTMENT OF THE TREASURY", "INTERNAL REVENUE SERVICE", "US TREASURY",
-
-    # Common Variations
-    "VANGUARD MARKETING CORP", "FIDELITY BROKERAGE SERVICES LLC",
-    "CHARLES SCHWAB & CO INC", "TD AMERITRADE CLEARING", "NATIONAL FINANCIAL SERVICES LLC",
-]
+import os
+from collections import Counter, deque
+from typing import Iterable, Iterator, Optional
+
+PAYERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'payers.txt')
+
+# Least trigram (Dice) similarity for a fuzzy match
+FUZZY_THRESHOLD = 0.75
+
+
+def load_payers(path: str = PAYERS_FILE) -> list[str]:
+    """Payer names in a data file, uppercased, skipping blank and # lines."""
+    payers = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            name = line.strip()
+            if name and not name.startswith('#'):
+                payers.append(name.upper())
+    return payers
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigrams of text, padded so that short names still have some."""
+    padded = f'  {" ".join(text.upper().split())} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PayerMatcher:
+    """Exact, substring and fuzzy lookup of known payer names."""
+
+    def __init__(self, payers: Iterable[str]):
+        self.payers = list(dict.fromkeys(payer.upper() for payer in payers))
+        self.exact = set(self.payers)
+
+        # Aho-Corasick automaton: per state its transitions, failure link,
+        # and the payer ending there (or via its failure links)
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[Optional[int]] = [None]
+        for index, payer in enumerate(self.payers):
+            state = 0
+            for char in payer:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(None)
+                state = next_state
+            self._output[state] = index
+
+        # Failure links in breadth-first order, so each state's link is set
+        # before the states below it need it
+        self._next_output: list[Optional[int]] = [None] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                link = self._fail[child]
+                # Nearest state down the failure links where a payer ends
+                self._next_output[child] = (
+                    link if self._output[link] is not None else self._next_output[link])
+
+        # Trigram -> payers containing it
+        self._trigram_sizes = []
+        self._index: dict[str, list[int]] = {}
+        for index, payer in enumerate(self.payers):
+            grams = trigrams(payer)
+            self._trigram_sizes.append(len(grams))
+            for gram in grams:
+                self._index.setdefault(gram, []).append(index)
+
+    def find_all(self, text: str) -> Iterator[str]:
+        """Every known payer occurring in text, in the order they end."""
+        state = 0
+        for char in text.upper():
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            match = state if self._output[state] is not None else self._next_output[state]
+            while match:
+                yield self.payers[self._output[match]]
+                match = self._next_output[match]
+
+    def find(self, text: str) -> Optional[str]:
+        """The first known payer occurring in text, or None."""
+        return next(self.find_all(text), None)
+
+    def closest(self, text: str) -> tuple[Optional[str], float]:
+        """
+        The known payer sharing the most trigrams with text.
+
+        Returns:
+            (payer, Dice similarity of their trigrams), or (None, 0.0)
+        """
+        grams = trigrams(text)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._index.get(gram, ()))
+        best, best_similarity = None, 0.0
+        for index, count in shared.items():
+            similarity = 2 * count / (len(grams) + self._trigram_sizes[index])
+            if similarity > best_similarity:
+                best, best_similarity = self.payers[index], similarity
+        return best, best_similarity
+
+    def score(self, text: str) -> int:
+        """
+        Return a score for the text based on its match with known payers.
+        High score = likely a real payer. 0 = no match.
+        """
+        upper = text.upper()
+
+        # Exact match
+        if upper in self.exact:
+            return 100
+
+        # Substring match (e.g. "Vanguard" in "The Vanguard Group")
+        if self.find(upper) is not None:
+            return 90
+
+        # Near miss (e.g. "Vanguard Marketing Corporatoin")
+        payer, similarity = self.closest(upper)
+        if similarity >= FUZZY_THRESHOLD:
+            return round(80 * similarity)
+        return 0
+
+
+POPULAR_PAYERS = load_payers()
+
+PAYERS = PayerMatcher(POPULAR_PAYERS)
 
 
 def get_payer_score(text: str) -> int:
@@ -45,18 +151,4 @@ def get_payer_score(text: str) -> int:
     Return a score for the text based on its match with popular payers.
     High score = likely a real payer. 0 = no match.
     """
-    upper = text.upper()
-
-    # Exact match
-    if upper in POPULAR_PAYERS:
-        return 100
-
-    # Substring match (e.g. "Vanguard" in "The Vanguard Group")
-    for payer in POPULAR_PAYERS:
-        if payer in upper:
-            # If the known payer is a significant part of the text
-            return 90
-
-    # Fuzzy match logic could go here, but substring is usually enough for
-    # "Top 1k" concept
-    return 0
+    return PAYERS.score(text)
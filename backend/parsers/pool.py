@@ -0,0 +1,270 @@
+"""
+Parse Pool
+
+Runs PDF parsing in a bounded pool of worker processes so that a slow
+document (a long 1099-B, say) never blocks the event loop or other
+requests. Workers import pdfplumber and the parsers when they start, jobs
+past the queue limit are rejected rather than queued without bound, and
+each job is given a time limit. A worker that dies (killed for memory, or
+crashed in a native PDF library) breaks its executor, which is then
+replaced so that later jobs run on fresh workers.
+
+Configured with environment variables:
+- OPENTAX_PARSE_WORKERS: worker processes (default: CPU count, at most 4)
+- OPENTAX_PARSE_QUEUE: jobs allowed to wait for a worker (default 16)
+- OPENTAX_PARSE_TIMEOUT: seconds a job may run (default 60)
+"""
+
+import asyncio
+import math
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Optional
+
+DEFAULT_MAX_WORKERS = min(os.cpu_count() or 1, 4)
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_TIMEOUT = 60.0
+
+# Extra seconds the caller waits past a job's time limit before giving up
+# on it, for jobs the worker cannot interrupt (no SIGALRM, or stuck in
+# native code that does not return to Python)
+TIMEOUT_GRACE = 5.0
+
+
+class ParsePoolFull(Exception):
+    """Every worker is busy and the queue is at its limit."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Parse queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ParseTimeout(Exception):
+    """A job ran past the pool's timeout."""
+
+
+def _warm_worker():
+    """Worker initializer: import the parsing stack once per process."""
+    import pdfplumber  # noqa: F401
+    from . import dispatch  # noqa: F401
+
+
+class _JobAlarm(BaseException):
+    # Raised in a worker when the job's time is up. Not an Exception, so
+    # the parsers' own "except Exception" handlers cannot swallow it.
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _JobAlarm()
+
+
+def _run_job(timeout: float, fn: Callable, args: tuple):
+    """
+    Run fn(*args) in a worker, raising ParseTimeout after timeout seconds.
+
+    The alarm interrupts the job inside the worker, freeing the process
+    for the next job instead of leaving it busy after the caller gave up.
+    """
+    if not hasattr(signal, 'setitimer'):
+        return fn(*args)
+
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    except _JobAlarm:
+        raise ParseTimeout(f"Parsing took longer than {timeout}s") from None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _env_number(name: str, default, convert):
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return convert(value)
+
+
+class ParsePool:
+    """A ProcessPoolExecutor with a bounded queue, timeouts and metrics."""
+
+    def __init__(
+            self,
+            max_workers: int = DEFAULT_MAX_WORKERS,
+            max_queue: int = DEFAULT_MAX_QUEUE,
+            timeout: float = DEFAULT_TIMEOUT):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._busy_since = time.monotonic()
+        self._busy_time = 0.0  # worker-seconds spent on jobs
+        self._started = time.monotonic()
+        self._counters = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'rejected': 0,
+            'broken': 0,  # jobs lost with a worker that died
+        }
+
+    @classmethod
+    def from_env(cls) -> 'ParsePool':
+        return cls(
+            max_workers=_env_number('OPENTAX_PARSE_WORKERS', DEFAULT_MAX_WORKERS, int),
+            max_queue=_env_number('OPENTAX_PARSE_QUEUE', DEFAULT_MAX_QUEUE, int),
+            timeout=_env_number('OPENTAX_PARSE_TIMEOUT', DEFAULT_TIMEOUT, float),
+        )
+
+    def start(self):
+        """Start every worker process now rather than on the first job."""
+        with self._lock:
+            executor = self._get_executor()
+        for future in [executor.submit(os.getpid) for _ in range(self.max_workers)]:
+            future.result()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Called with the lock held
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_warm_worker)
+        return self._executor
+
+    def _account_busy(self, now: float):
+        # Called with the lock held: add the busy worker-seconds since the
+        # last change in the number of running jobs
+        running = min(self._in_flight, self.max_workers)
+        self._busy_time += running * (now - self._busy_since)
+        self._busy_since = now
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> bool:
+        # Called with the lock held: drop a broken executor so that the
+        # next job starts a new one; True when it was the current one
+        if self._executor is not executor:
+            return False
+        self._executor = None
+        return True
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """
+        Queue fn(*args) on a worker.
+
+        Raises:
+            ParsePoolFull: max_workers jobs are running and max_queue more
+                are waiting
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._counters['rejected'] += 1
+                raise ParsePoolFull(self.retry_after())
+            self._account_busy(time.monotonic())
+            self._in_flight += 1
+            self._counters['submitted'] += 1
+            try:
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(_run_job, self.timeout, fn, args)
+                except BrokenProcessPool:
+                    # A worker died since the last job: start over once
+                    self._discard_executor(executor)
+                    executor.shutdown(wait=False)
+                    executor = self._get_executor()
+                    future = executor.submit(_run_job, self.timeout, fn, args)
+            except Exception:
+                self._in_flight -= 1
+                raise
+        future.add_done_callback(partial(self._job_done, executor))
+        return future
+
+    def _job_done(self, executor: ProcessPoolExecutor, future: Future):
+        discarded = False
+        with self._lock:
+            self._account_busy(time.monotonic())
+            self._in_flight -= 1
+            if future.cancelled():
+                self._counters['failed'] += 1
+            elif isinstance(future.exception(), ParseTimeout):
+                self._counters['timed_out'] += 1
+            elif isinstance(future.exception(), BrokenProcessPool):
+                self._counters['broken'] += 1
+                discarded = self._discard_executor(executor)
+            elif future.exception() is not None:
+                self._counters['failed'] += 1
+            else:
+                self._counters['completed'] += 1
+        if discarded:
+            executor.shutdown(wait=False)
+
+    def caller_timeout(self) -> float:
+        """
+        Seconds run() waits for a job, queue time included: the jobs ahead
+        of it in the queue, each bounded by the time limit, then its own.
+        """
+        rounds = 1 + math.ceil(self.max_queue / self.max_workers)
+        return rounds * self.timeout + TIMEOUT_GRACE
+
+    async def run(self, fn: Callable, *args):
+        """
+        Run fn(*args) on a worker without blocking the event loop.
+
+        The worker interrupts a job past the pool's timeout where it can
+        (SIGALRM); the caller also stops waiting after caller_timeout(),
+        for jobs that cannot be interrupted.
+
+        Raises:
+            ParsePoolFull: The queue is full
+            ParseTimeout: The job ran longer than the pool's timeout
+            BrokenProcessPool: The worker died running the job; the next
+                job runs on a new executor
+        """
+        future = asyncio.wrap_future(self.submit(fn, *args))
+        try:
+            return await asyncio.wait_for(future, self.caller_timeout())
+        except asyncio.TimeoutError:
+            raise ParseTimeout(f"Parsing took longer than {self.timeout}s") from None
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait before retrying."""
+        # Roughly the time for the running jobs to make room, bounded by
+        # the time limit of a job
+        return max(1, min(int(self.timeout), 5))
+
+    def stats(self) -> dict:
+        """Queue depth, worker utilization and job counters."""
+        with self._lock:
+            now = time.monotonic()
+            self._account_busy(now)
+            running = min(self._in_flight, self.max_workers)
+            elapsed = now - self._started
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'timeout': self.timeout,
+                'running': running,
+                'queue_depth': self._in_flight - running,
+                'utilization': running / self.max_workers,
+                # Share of worker time spent on jobs since the pool was made
+                'average_utilization': (
+                    self._busy_time / (elapsed * self.max_workers) if elapsed > 0 else 0.0),
+                **self._counters,
+            }
@@ -1,6 +1,7 @@
 
 from .payer_db import get_payer_score
 import re
+from functools import lru_cache
 
 # Known PDF field labels that should never be accepted as institution names
 # Validated against actual IRS forms (1099-INT, DIV, NEC, W-2)
@@ -37,114 +38,98 @@ STREET_SUFFIXES = [
 ]
 
 
+# Field labels compiled into one pattern. Short labels must match as whole
+# words to avoid false positives (e.g. 'tin' in 'Marketing'); longer ones
+# may match as substrings.
+FIELD_LABEL_PATTERN = re.compile('|'.join(
+    [r'\b(?:' + '|'.join(re.escape(label) for label in FIELD_LABELS if len(label) <= 4) + r')\b'] +
+    [re.escape(label) for label in FIELD_LABELS if len(label) > 4]))
+
+# The regular-expression address heuristics as one pattern
+ADDRESS_PATTERN = re.compile('|'.join([
+    # Starts with digits (street number) — e.g. "123 Main St"
+    r'\A\d+\s',
+    # Contains P.O. Box, Suite, Floor, Apt
+    r'(?i:\b(?:P\.?O\.?\s*Box|Suite|Ste\.?|Floor|Fl\.?|Apt\.?|Unit)\b)',
+    # City, STATE ZIP pattern — e.g. "San Francisco, CA 94102"
+    r',\s*[A-Z]{2}\s+\d{5}',
+    # Ends with a zip code
+    r'\b\d{5}(?:-\d{4})?\s*$',
+    # Phone numbers
+    r'(?i:(?:phone|tel|fax|cell).*[\d\-]{7,})',
+    # Emails or URLs
+    r'(?i:@[\w\.-]+|\.com\b|\.org\b|\.net\b)',
+]))
+
+_STREET_SUFFIX_SET = frozenset(STREET_SUFFIXES)
+
+# Lines like "City:", "State:" that are labels, not names
+_LABEL_PREFIX_PATTERN = re.compile(
+    r'^(?:City|State|Zip|Address|Street)\s*:', re.IGNORECASE)
+
+# "Name Line 1: Vanguard" -> "Vanguard"
+_NAME_PREFIX_PATTERN = re.compile(
+    r'^(?:Name\s*Line\s*\d+|Payer(?:\'?s)?(?:\s*Name)?|Employer(?:\'?s)?(?:\s*Name)?|Recipient(?:\'?s)?(?:\s*Name)?)\s*[:.]?\s*(.+)',
+    re.IGNORECASE)
+
+# Line verdicts memoized: the same headers, labels and addresses recur on
+# every form and every page
+VERDICT_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=VERDICT_CACHE_SIZE)
 def looks_like_address(text: str) -> bool:
     """Return True if text looks like a street address or city/state/zip line."""
     stripped = text.strip()
-    lower = stripped.lower()
     if not stripped:
         return True
 
-    # Starts with digits (street number) — e.g. "123 Main St"
-    if re.match(r'^\d+\s', stripped):
-        return True
-
-    # Contains P.O. Box, Suite, Floor, Apt
-    if re.search(
-        r'\b(?:P\.?O\.?\s*Box|Suite|Ste\.?|Floor|Fl\.?|Apt\.?|Unit)\b',
-        stripped,
-            re.IGNORECASE):
+    if ADDRESS_PATTERN.search(stripped):
         return True
 
     # Contains street suffix (e.g. "Washington Blvd")
     # Check if any word is a street suffix
-    words = re.split(r'[ ,.]+', lower)
-    if any(w in STREET_SUFFIXES for w in words):
+    words = re.split(r'[ ,.]+', stripped.lower())
+    if not _STREET_SUFFIX_SET.isdisjoint(words):
         # To be safe, require at least one digit in the string OR it matches
         # specific pattern
         if any(c.isdigit() for c in stripped):
             return True
         # Or if it ends with a suffix and has multiple words
-        if len(words) > 2 and words[-1] in STREET_SUFFIXES:
+        if len(words) > 2 and words[-1] in _STREET_SUFFIX_SET:
             return True
 
-    # City, STATE ZIP pattern — e.g. "San Francisco, CA 94102"
-    if re.search(r',\s*[A-Z]{2}\s+\d{5}', stripped):
-        return True
-
-    # Ends with a zip code
-    if re.search(r'\b\d{5}(?:-\d{4})?\s*$', stripped):
-        return True
-
     # Contains just a state abbreviation with comma — e.g. "Boston, MA"
-    words = stripped.replace(',', ' ').split()
-    if any(w.upper() in STATE_ABBREVS for w in words if len(w) == 2):
-        # Only flag if it also has a comma (city, state pattern)
-        if ',' in stripped:
+    # Only flag if it also has a comma (city, state pattern)
+    if ',' in stripped:
+        words = stripped.replace(',', ' ').split()
+        if any(w.upper() in STATE_ABBREVS for w in words if len(w) == 2):
             return True
 
-    # Phone numbers
-    if re.search(
-        r'(?:phone|tel|fax|cell).*[\d\-]{7,}',
-        stripped,
-            re.IGNORECASE):
-        return True
-
-    # Emails or URLs
-    if re.search(
-        r'@[\w\.-]+|\.com\b|\.org\b|\.net\b',
-        stripped,
-            re.IGNORECASE):
-        return True
-
     return False
 
 
+@lru_cache(maxsize=VERDICT_CACHE_SIZE)
 def clean_name(name: str) -> str:
     """Return the name if it looks like a real institution, or empty string."""
     stripped = name.strip()
     if not stripped or len(stripped) < 2:
         return ''
-    lower = stripped.lower()
 
     # Reject if it starts with "City:", "State:", "Zip:", etc.
-    if re.match(
-        r'^(?:City|State|Zip|Address|Street)\s*:',
-        stripped,
-            re.IGNORECASE):
+    if _LABEL_PREFIX_PATTERN.match(stripped):
         return ''
 
     # Try to strip common Name/Payer prefixes if they exist with a value
-    # e.g. "Name Line 1: Vanguard" -> "Vanguard"
-    match = re.match(
-        r'^(?:Name\s*Line\s*\d+|Payer(?:\'?s)?(?:\s*Name)?|Employer(?:\'?s)?(?:\s*Name)?|Recipient(?:\'?s)?(?:\s*Name)?)\s*[:.]?\s*(.+)',
-        stripped,
-        re.IGNORECASE)
+    match = _NAME_PREFIX_PATTERN.match(stripped)
     if match:
         potential_value = match.group(1).strip()
         if potential_value:
             stripped = potential_value
-            lower = stripped.lower()
 
     # Reject if it matches a known field label
-    # Use word boundary check for short labels to avoid false positives (e.g.
-    # 'tin' in 'Marketing')
-    for label in FIELD_LABELS:
-        if len(label) <= 4:
-            # Short labels must match as whole words
-            if re.search(r'\b' + re.escape(label) + r'\b', lower):
-                return ''
-        else:
-            # Longer labels can match as substrings
-            if label in lower:
-                # Exception: "Financial Services" contains "Financial", but we want to keep it?
-                # "Financial Institution" is banned. "Financial" is in entity suffixes? Yes.
-                # If label is 'financial institution', it won't match 'Vanguard
-                # Financial Services'.
-                if label in ['financial institution', 'tax form', 'statement']:
-                    if label in lower:
-                        return ''
-                elif label in lower:
-                    return ''
+    if FIELD_LABEL_PATTERN.search(stripped.lower()):
+        return ''
 
     # Reject if it's mostly digits (TIN, zip, etc.)
     digit_ratio = sum(c.isdigit() for c in stripped) / len(stripped)
@@ -158,33 +143,29 @@ def clean_name(name: str) -> str:
     return stripped[:100]
 
 
-def extract_payer_from_fields(pdf) -> str:
-    """Try to extract payer name from PDF form fields (AcroForm)."""
+def extract_payer_from_fields(document) -> str:
+    """Try to extract payer name from the form fields (AcroForm) of a ParsedDocument."""
     try:
-        for page in pdf.pages:
-            # Try page-level annotations
-            for annot in (page.annots or []):
-                data = annot.get('data', {})
-                field_name = str(data.get('T', '')).lower()
-                field_val = str(data.get('V', '') or '').strip()
-                if field_val and (
-                        'payer' in field_name or 'employer' in field_name or 'name' in field_name):
-                    # explicit exclude common address fields
-                    if any(
-                        x in field_name for x in [
-                            'address',
-                            'addr',
-                            'city',
-                            'state',
-                            'zip',
-                            'street']):
-                        continue
-
-                    # Be strict about "name" fields, ensure they aren't
-                    # addresses
-                    cleaned = clean_name(field_val)
-                    if cleaned:
-                        return cleaned
+        for name, field_val in document.form_fields.items():
+            field_name = name.lower()
+            if field_val and (
+                    'payer' in field_name or 'employer' in field_name or 'name' in field_name):
+                # explicit exclude common address fields
+                if any(
+                    x in field_name for x in [
+                        'address',
+                        'addr',
+                        'city',
+                        'state',
+                        'zip',
+                        'street']):
+                    continue
+
+                # Be strict about "name" fields, ensure they aren't
+                # addresses
+                cleaned = clean_name(field_val)
+                if cleaned:
+                    return cleaned
     except Exception:
         pass
     return ''
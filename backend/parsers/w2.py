@@ -5,8 +5,12 @@ Extracts key wage and tax information from W-2 forms.
 Optimized for standard W-2 PDF formats including Google's format.
 """
 
+import hashlib
 import re
-import pdfplumber
+from typing import NamedTuple, Optional, Union
+from .acroform import read_form_fields
+from .document import ParsedDocument, PdfSource, open_document
+from .layouts import LayoutTemplate, get_layout_store, layout_fingerprint
 from .utils import extract_payer_from_fields, extract_payer_name_from_text, looks_like_address, clean_name
 
 
@@ -39,15 +43,397 @@ def extract_value_from_cell(cell_text: str) -> float:
     return 0.0
 
 
-def parse_w2_tables(pdf) -> dict:
+# Every field parse_w2_tables can find
+W2_TABLE_FIELDS = (
+    'wages',
+    'federal_tax_withheld',
+    'social_security_wages',
+    'social_security_tax_withheld',
+    'medicare_wages',
+    'medicare_tax_withheld',
+    'state_wages',
+    'state_tax_withheld',
+    'casdi',
+    'employer_name',
+)
+
+W2_AMOUNT_FIELDS = W2_TABLE_FIELDS[:-1]
+
+# Labels the employer's name follows in the page text
+EMPLOYER_LABEL = r'(?:Employer.s?\s*name|Employer.s?\s*address|Employer\s*name)'
+
+
+# W-2 box labels, one named group per result field, so that a single
+# search of a label's text tells which box it is
+W2_BOX_LABELS = re.compile('|'.join(f'(?P<{field}>{pattern})' for field, pattern in [
+    ('state_wages', r'state\s*wages'),
+    ('wages', r'wages,?\s*tips,?\s*other|\b1\s*wages'),
+    ('federal_tax_withheld', r'federal\s*income\s*tax\s*withheld'),
+    ('social_security_wages', r'social\s*security\s*wages'),
+    ('social_security_tax_withheld', r'social\s*security\s*tax\s*withheld'),
+    ('medicare_wages', r'medicare\s*wages'),
+    ('medicare_tax_withheld', r'medicare\s*tax\s*withheld'),
+    ('state_tax_withheld', r'state\s*income\s*tax'),
+    ('casdi', r'\bca\s*sdi\b|casdi|\bsdi\b|state\s*disability'),
+    ('employer_name', r"employer.?s\s*name"),
+]), re.IGNORECASE)
+
+# A word that is a dollar amount: with cents or with thousands separators,
+# so that box numbers, years and ZIP codes are not taken for amounts
+W2_AMOUNT_WORD = re.compile(r'\$?(\d{1,3}(?:,\d{3})+(?:\.\d{2})?|\d+\.\d{2})')
+
+# Labels whose positions tell W-2 layouts apart, matched in the page's
+# characters without spaces (see layout_fingerprint)
+W2_LAYOUT_ANCHORS = (r'wages,?\s*tips', r'federal\s*income\s*tax')
+
+# Points between the tops of words on one line
+LINE_TOLERANCE = 3
+# Points between words that separate the boxes side by side on one line
+SEGMENT_GAP = 12
+# Points below its label that a box's value may be
+MAX_BOX_HEIGHT = 60
+
+
+class _Segment(NamedTuple):
+    """Run of words on one line, without a box-separating gap."""
+    x0: float
+    x1: float
+    top: float
+    bottom: float
+    words: list
+
+    @property
+    def text(self) -> str:
+        return ' '.join(word['text'] for word in self.words)
+
+
+class W2Box(NamedTuple):
+    """A box's value and the area (x0, top, x1, bottom) of its label and value."""
+    value: Union[float, str]
+    bbox: tuple[float, float, float, float]
+
+
+def _segments(words: list[dict]) -> list[_Segment]:
+    """Words grouped into lines, and each line split at wide gaps."""
+    lines = []
+    for word in sorted(words, key=lambda w: (w['top'], w['x0'])):
+        if lines and abs(word['top'] - lines[-1][0]['top']) <= LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+
+    segments = []
+    for line in lines:
+        line.sort(key=lambda w: w['x0'])
+        current = [line[0]]
+        for word in line[1:]:
+            if word['x0'] - current[-1]['x1'] > SEGMENT_GAP:
+                segments.append(current)
+                current = []
+            current.append(word)
+        segments.append(current)
+    return [
+        _Segment(
+            seg[0]['x0'], seg[-1]['x1'],
+            min(w['top'] for w in seg), max(w['bottom'] for w in seg), seg)
+        for seg in segments
+    ]
+
+
+def _box_labels(segments: list[_Segment]) -> list[tuple[str, _Segment]]:
+    """(field, segment) of every segment holding a box label."""
+    labels = []
+    for segment in segments:
+        match = W2_BOX_LABELS.search(segment.text)
+        if match:
+            labels.append((match.lastgroup, segment))
+    return labels
+
+
+def _union(label: _Segment, item) -> tuple[float, float, float, float]:
+    return (
+        min(label.x0, item['x0']), min(label.top, item['top']),
+        max(label.x1, item['x1']), max(label.bottom, item['bottom']))
+
+
+def locate_w2_boxes(words: list[dict]) -> dict[str, W2Box]:
+    """
+    Find the W-2 boxes among one page's words.
+
+    Each box label opens a region that runs right to the next label on its
+    line and down MAX_BOX_HEIGHT points; an amount belongs to the nearest
+    label above it whose region contains it. The employer name is the
+    first name-like line under its label. The first box of each field on
+    the page is kept.
+    """
+    segments = _segments(words)
+    labels = _box_labels(segments)
+
+    def right_edge(label: _Segment) -> float:
+        # Up to the next label on the same line
+        return min(
+            (other.x0 for _, other in labels
+             if other.x0 > label.x0 and abs(other.top - label.top) <= LINE_TOLERANCE),
+            default=float('inf'))
+
+    regions = [(field, label, right_edge(label)) for field, label in labels]
+
+    def owner(segment: _Segment, x: float):
+        # The nearest label above (or level with) the point
+        best = None
+        for field, label, x1 in regions:
+            if not (label.x0 - LINE_TOLERANCE <= x < x1):
+                continue
+            if not (label.top - LINE_TOLERANCE <= segment.top <= label.top + MAX_BOX_HEIGHT):
+                continue
+            if best is None or label.top > best[1].top:
+                best = (field, label)
+        return best
+
+    boxes = {}
+    for segment in segments:
+        for word in segment.words:
+            amount = W2_AMOUNT_WORD.fullmatch(word['text'])
+            if not amount:
+                continue
+            found = owner(segment, (word['x0'] + word['x1']) / 2)
+            if found is None or found[0] == 'employer_name':
+                continue
+            value = float(amount.group(1).replace(',', ''))
+            if value > 0 and found[0] not in boxes:
+                boxes[found[0]] = W2Box(value, _union(found[1], word))
+
+    for field, label, x1 in regions:
+        if field != 'employer_name' or 'employer_name' in boxes:
+            continue
+        for segment in segments:
+            if segment.top <= label.top + LINE_TOLERANCE:
+                continue
+            found = owner(segment, segment.x0)
+            if found is not None and found[1] is label:
+                cleaned = clean_name(segment.text)
+                if cleaned:
+                    boxes['employer_name'] = W2Box(cleaned, _union(label, {
+                        'x0': segment.x0, 'top': segment.top,
+                        'x1': segment.x1, 'bottom': segment.bottom}))
+                    break
+
+    return boxes
+
+
+def locate_w2_cells(
+        words: list[dict],
+        bounds: Optional[tuple[float, float, float, float]] = None) -> dict[str, tuple]:
+    """
+    Area (x0, top, x1, bottom) of each labelled W-2 box among one copy's
+    words, whether or not the box holds a value.
+
+    A box's cell runs from its label right to the next label on its line
+    and down to the next label below it (at most MAX_BOX_HEIGHT points),
+    within bounds, by default the extent of the words. The first box of
+    each field is kept.
+    """
+    if not words:
+        return {}
+    if bounds is None:
+        bounds = (
+            min(w['x0'] for w in words), min(w['top'] for w in words),
+            max(w['x1'] for w in words), max(w['bottom'] for w in words))
+
+    labels = _box_labels(_segments(words))
+    cells = {}
+    for field, label in labels:
+        if field in cells:
+            continue
+        right = min(
+            (other.x0 - LINE_TOLERANCE for _, other in labels
+             if other.x0 > label.x0 and abs(other.top - label.top) <= LINE_TOLERANCE),
+            default=bounds[2])
+        below = min(
+            (other.top - LINE_TOLERANCE for _, other in labels
+             if other.top > label.top + LINE_TOLERANCE and other.x0 < right and other.x1 > label.x0),
+            default=bounds[3])
+        cells[field] = (
+            label.x0 - LINE_TOLERANCE, label.top - LINE_TOLERANCE,
+            right, min(below, label.top + MAX_BOX_HEIGHT))
+    return cells
+
+
+def _split_copies(words: list[dict], width: float, height: float) -> list[tuple[tuple, list[dict]]]:
+    # (area of the page, words) of each copy; see split_w2_copies
+    page = (0.0, 0.0, width, height)
+    anchors = [
+        segment for segment in _segments(words)
+        if (match := W2_BOX_LABELS.search(segment.text)) and match.lastgroup == 'wages'
+    ]
+    if len(anchors) < 2:
+        return [(page, words)]
+
+    middle_x, middle_y = width / 2, height / 2
+    split_x = any(a.x0 < middle_x for a in anchors) and any(a.x0 >= middle_x for a in anchors)
+    split_y = any(a.top < middle_y for a in anchors) and any(a.top >= middle_y for a in anchors)
+    if not (split_x or split_y):
+        return [(page, words)]
+
+    def quadrant_of(item) -> tuple[bool, bool]:
+        return (
+            split_y and (item['top'] + item['bottom']) / 2 >= middle_y,
+            split_x and (item['x0'] + item['x1']) / 2 >= middle_x)
+
+    # Only quadrants with a Box 1 label are copies; the others hold
+    # instructions such as the Notice to Employee
+    copies: dict[tuple[bool, bool], list[dict]] = {
+        quadrant_of({'top': a.top, 'bottom': a.bottom, 'x0': a.x0, 'x1': a.x1}): []
+        for a in anchors
+    }
+    for word in words:
+        quadrant = quadrant_of(word)
+        if quadrant in copies:
+            copies[quadrant].append(word)
+
+    def area(quadrant):
+        below, right = quadrant
+        return (
+            middle_x if right else 0.0, middle_y if below else 0.0,
+            width if right or not split_x else middle_x,
+            height if below or not split_y else middle_y)
+
+    return [(area(quadrant), copies[quadrant]) for quadrant in sorted(copies)]
+
+
+def split_w2_copies(words: list[dict], width: float, height: float) -> list[list[dict]]:
+    """
+    Split a page's words into the W-2 copies printed on it.
+
+    Employers print Copy B, Copy C and Copy 2 in the quadrants (or halves)
+    of one page. The page is split at its middle along each axis on which
+    Box 1 labels lie on both sides; quadrants without a Box 1 label, such
+    as a Notice to Employee, are not copies and are left out.
+
+    Returns:
+        The words of each copy, in reading order; one list for a page
+        with a single copy
+    """
+    return [copy for _, copy in _split_copies(words, width, height)]
+
+
+def copy_digest(words: list[dict]) -> str:
+    """Hash of the amounts in one copy, to compare copies without parsing them."""
+    amounts = sorted(word['text'] for word in words if W2_AMOUNT_WORD.fullmatch(word['text']))
+    return hashlib.sha256('\n'.join(amounts).encode()).hexdigest()
+
+
+def _first_copy_boxes(document: ParsedDocument, index: int) -> tuple[dict[str, W2Box], list[bool]]:
+    # Boxes of the page's first copy, and whether each other copy matches it
+    page = document.pages[index]
+    copies = split_w2_copies(document.words(index), float(page.width), float(page.height))
+    digest = copy_digest(copies[0])
+    return locate_w2_boxes(copies[0]), [copy_digest(other) == digest for other in copies[1:]]
+
+
+def parse_w2_words(document: ParsedDocument) -> dict:
+    """
+    Extract W-2 data from word positions (see locate_w2_boxes), page by
+    page until every field is found. The first value of each field is kept.
+
+    Only the first copy on each page is parsed; the other copies are
+    compared to it by the hash of their amounts. The result also holds
+    'copy_count', the copies seen, and 'copies_consistent', whether every
+    copy matched the first copy of its page.
+    """
+    result = {}
+    copy_count = 0
+    consistent = True
+
+    for index in range(document.page_count):
+        if all(field in result for field in W2_TABLE_FIELDS):
+            break
+        boxes, matches = _first_copy_boxes(document, index)
+        if not boxes:
+            continue
+        for field, box in boxes.items():
+            result.setdefault(field, box.value)
+        copy_count += 1 + len(matches)
+        consistent = consistent and all(matches)
+
+    if copy_count:
+        result['copy_count'] = copy_count
+        result['copies_consistent'] = consistent
+    return result
+
+
+# Amount boxes the first page must show for its layout to be learned
+MIN_TEMPLATE_BOXES = 5
+
+
+def _w2_layout_fingerprint(document: ParsedDocument) -> str:
+    return layout_fingerprint(document, 'W-2', anchors=W2_LAYOUT_ANCHORS)
+
+
+def read_w2_template(document: ParsedDocument) -> Optional[dict]:
+    """
+    Read a W-2 from the learned template of its layout, cropping only the
+    areas of its boxes.
+
+    Returns:
+        The boxes' values, or None without a template, when the page
+        mentions a box the template has no area for, or when an area no
+        longer holds its box's label; such a template is dropped so that
+        the layout is learned again
+    """
+    store = get_layout_store()
+    if store is None or document.page_count == 0:
+        return None
+    fingerprint = _w2_layout_fingerprint(document)
+    template = store.get(fingerprint)
+    if template is None or template.page >= document.page_count:
+        return None
+
+    # Boxes the document the layout was learned from did not label
+    unlearned = set(W2_TABLE_FIELDS) - set(template.regions)
+    if unlearned and any(
+            match.lastgroup in unlearned
+            for match in W2_BOX_LABELS.finditer(document.page_text(template.page))):
+        return None
+
+    values = {}
+    for field, words in document.region_words(template.page, template.regions).items():
+        if field not in {label for label, _ in _box_labels(_segments(words))}:
+            store.remove(fingerprint)
+            return None
+        box = locate_w2_boxes(words).get(field)
+        # A box may be left empty
+        if box is not None:
+            values[field] = box.value
+    return values
+
+
+def learn_w2_template(document: ParsedDocument):
+    """Store the box cells of a W-2's first page as its layout's template."""
+    store = get_layout_store()
+    if store is None or document.page_count == 0:
+        return
+    page = document.pages[0]
+    bounds, words = _split_copies(document.words(0), float(page.width), float(page.height))[0]
+    boxes = locate_w2_boxes(words)
+    if sum(field in boxes for field in W2_AMOUNT_FIELDS) < MIN_TEMPLATE_BOXES:
+        return
+    store.put(LayoutTemplate.from_boxes(
+        _w2_layout_fingerprint(document), 'W-2', 0, locate_w2_cells(words, bounds)))
+
+
+def parse_w2_tables(document: ParsedDocument) -> dict:
     """
     Extract W-2 data from table cells.
     Standard W-2 table cells contain "BoxLabel\\nValue" format.
     """
     result = {}
 
-    for page in pdf.pages:
-        tables = page.extract_tables()
+    for index in range(document.page_count):
+        # Later pages usually hold further copies of the same boxes
+        if all(field in result for field in W2_TABLE_FIELDS):
+            break
+        tables = document.tables(index)
 
         for table in tables:
             if not table:
@@ -63,7 +449,6 @@ def parse_w2_tables(pdf) -> dict:
 
                     cell_lower = cell.lower()
                     value = extract_value_from_cell(cell)
-                    print(f"DEBUG: Cell: {repr(cell_lower)} / Val: {value}")
 
                     # Box 1: Wages, tips, other compensation
                     if ('1wages' in cell_lower or 'wages, tips' in cell_lower or
@@ -90,9 +475,6 @@ def parse_w2_tables(pdf) -> dict:
                             result['social_security_tax_withheld'] = value
 
                     if 'medicare' in cell_lower and value > 0:
-                        print(
-                            f"DEBUG: Medicare keyword found with value {value}. Checking type...")
-
                         # Determine if this is Wages (Box 5) or Tax (Box 6)
                         # STRICT MATCHING: A cell cannot be both.
                         # Prioritize TAX because "tax" is a strong signal.
@@ -120,14 +502,10 @@ def parse_w2_tables(pdf) -> dict:
                                 is_tax = False
 
                         if is_tax:
-                            print(
-                                f"DEBUG: MATCHED Medicare Tax (Final): {value}")
                             if 'medicare_tax_withheld' not in result:
                                 result['medicare_tax_withheld'] = value
 
                         elif is_wages:  # ELF - only if not tax
-                            print(
-                                f"DEBUG: MATCHED Medicare Wages (Final): {value}")
                             if 'medicare_wages' not in result:
                                 result['medicare_wages'] = value
 
@@ -169,7 +547,7 @@ def parse_w2_tables(pdf) -> dict:
     return result
 
 
-def parse_w2(pdf_path: str) -> dict:
+def parse_w2(source: Union[PdfSource, ParsedDocument]) -> dict:
     """
     Parse a W-2 PDF and extract relevant tax information.
     """
@@ -185,52 +563,66 @@ def parse_w2(pdf_path: str) -> dict:
         'state_tax_withheld': 0.0,
         'casdi': 0.0,  # California State Disability Insurance (Box 14/19)
         'employer_name': '',
+        # Copies on each page and whether they all match; None when the
+        # copies were not compared (form fields, templates, tables)
+        'copy_count': None,
+        'copies_consistent': None,
         'raw_text': '',
         'parse_confidence': 'low',
     }
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            # Get full text for reference
-            full_text = ''
-            for page in pdf.pages:
-                text = page.extract_text() or ''
-                full_text += text + '\n'
-
-            result['raw_text'] = full_text
-
-            # Verify this is a W-2
-            if 'w-2' not in full_text.lower() and 'w2' not in full_text.lower():
-                result['parse_confidence'] = 'low'
-                return result
-
-            # Parse using table extraction (most reliable for standard W-2s)
-            table_data = parse_w2_tables(pdf)
-
-            # Apply parsed values
-            for field in [
-                'wages',
-                'federal_tax_withheld',
-                'social_security_wages',
-                'social_security_tax_withheld',
-                'medicare_wages',
-                'medicare_tax_withheld',
-                'state_wages',
-                'state_tax_withheld',
-                'casdi',
-                    'employer_name']:
-                if field in table_data:
-                    result[field] = table_data[field]
-
-            # Fallback for employer name if not found in tables
-            if not result['employer_name']:
-                result['employer_name'] = extract_payer_from_fields(pdf)
-
-            if not result['employer_name']:
-                # Look for 'Employer...' or 'Employer's name...'
-                result['employer_name'] = extract_payer_name_from_text(
-                    full_text,
-                    label_pattern=r'(?:Employer.s?\s*name|Employer.s?\s*address|Employer\s*name)')
+        with open_document(source) as document:
+            # A fillable W-2 with its boxes filled in: read the field values
+            # and skip table and text extraction entirely
+            form_values = read_form_fields(document, 'W-2')
+            if not form_values:
+                # A layout seen before: read only the areas of its boxes
+                form_values = read_w2_template(document) or {}
+            if form_values:
+                result.update(form_values)
+                if not result['employer_name']:
+                    result['employer_name'] = extract_payer_from_fields(document)
+                if not result['employer_name'] and document.page_count:
+                    # Fields with the amounts but not the employer: read its page
+                    result['raw_text'] = document.page_text(0)
+                    result['employer_name'] = extract_payer_name_from_text(
+                        result['raw_text'], label_pattern=EMPLOYER_LABEL)
+            else:
+                # Verify this is a W-2, reading pages only until it says so
+                full_text = ''
+                for page_text in document.iter_text():
+                    full_text += page_text + '\n'
+                    if 'w-2' in page_text.lower() or 'w2' in page_text.lower():
+                        break
+
+                result['raw_text'] = full_text
+
+                if 'w-2' not in full_text.lower() and 'w2' not in full_text.lower():
+                    result['parse_confidence'] = 'low'
+                    return result
+
+                # Read the boxes from word positions; table extraction is the
+                # much slower fallback for layouts the words do not resolve
+                table_data = parse_w2_words(document)
+                if not any(field in table_data for field in W2_AMOUNT_FIELDS):
+                    table_data = {**parse_w2_tables(document), **table_data}
+                else:
+                    learn_w2_template(document)
+
+                # Apply parsed values
+                for field in W2_TABLE_FIELDS + ('copy_count', 'copies_consistent'):
+                    if field in table_data:
+                        result[field] = table_data[field]
+
+                # Fallback for employer name if not found in tables
+                if not result['employer_name']:
+                    result['employer_name'] = extract_payer_from_fields(document)
+
+                if not result['employer_name']:
+                    # Look for 'Employer...' or 'Employer's name...'
+                    result['employer_name'] = extract_payer_name_from_text(
+                        full_text, label_pattern=EMPLOYER_LABEL)
 
             # Calculate confidence based on fields found
             fields_found = sum(
@@ -1,9 +1,25 @@
 from .calculator import calculate_taxes
+from .batch import calculate_taxes_batch
+from .cache import cached_calculate_taxes, result_cache_stats
+from .incremental import IncrementalCalculator
+from .solver import solve
+from .compare import compare_states
 from .federal import calculate_federal_tax
 from .states.california import calculate_california_tax
+from .utils import DETAIL_TOTALS, DETAIL_BREAKDOWN, DETAIL_TRACE, DETAIL_LEVELS
 
 __all__ = [
     'calculate_taxes',
+    'calculate_taxes_batch',
+    'cached_calculate_taxes',
+    'result_cache_stats',
+    'IncrementalCalculator',
+    'solve',
+    'compare_states',
     'calculate_federal_tax',
     'calculate_california_tax',
+    'DETAIL_TOTALS',
+    'DETAIL_BREAKDOWN',
+    'DETAIL_TRACE',
+    'DETAIL_LEVELS',
 ]
@@ -0,0 +1,190 @@
+"""
+Batch Tax Calculator
+
+Columnar counterpart of calculate_taxes. Takes one NumPy array per TaxInput
+field and computes federal and state results for every row with vectorized
+kernels, returning arrays that match the scalar engine row for row.
+"""
+
+from typing import Mapping, Any
+import numpy as np
+from .calculator import TAX_INPUT_DEFAULTS
+from .federal import calculate_federal_tax_batch
+from .registry import StateTaxRegistry
+
+
+# Numeric TaxInput fields (plus the W-2 extras accepted by calculate_taxes)
+NUMERIC_FIELDS = tuple(
+    field for field, default in TAX_INPUT_DEFAULTS.items()
+    if isinstance(default, float))
+
+DEFAULT_TAX_YEAR = TAX_INPUT_DEFAULTS['tax_year']
+DEFAULT_STATE = TAX_INPUT_DEFAULTS['state']
+DEFAULT_FILING_STATUS = TAX_INPUT_DEFAULTS['filing_status']
+
+
+def _column_length(columns: Mapping[str, Any]) -> int:
+    lengths = {len(np.atleast_1d(values)) for values in columns.values()}
+    if not lengths:
+        raise ValueError("calculate_taxes_batch requires at least one column")
+    if len(lengths) > 1:
+        raise ValueError(
+            f"All columns must have the same length, got {sorted(lengths)}")
+    return lengths.pop()
+
+
+def _group_rows(*keys: np.ndarray) -> list[tuple[tuple, np.ndarray]]:
+    """Return ((key values...), row indices) for each distinct key combination."""
+    codes = np.zeros(len(keys[0]), dtype=np.int64)
+    for key in keys:
+        unique, inverse = np.unique(key, return_inverse=True)
+        codes = codes * len(unique) + inverse
+
+    groups = []
+    for code in np.unique(codes):
+        rows = np.flatnonzero(codes == code)
+        first = rows[0]
+        groups.append((tuple(key[first] for key in keys), rows))
+    return groups
+
+
+def _scatter(target: dict, rows: np.ndarray, values: dict, length: int):
+    for key, column in values.items():
+        if key not in target:
+            target[key] = np.zeros(length)
+        target[key][rows] = column
+
+
+def calculate_taxes_batch(columns: Mapping[str, Any]) -> dict:
+    """
+    Calculate federal and state tax liability for many returns at once.
+
+    Args:
+        columns: Mapping of TaxInput field name to an array-like column.
+            Missing numeric columns default to 0.0, tax_year to 2024,
+            state to 'CA' and filing_status to 'single'.
+
+    Returns:
+        Columnar TaxSummary: the same keys as calculate_taxes, each holding
+        an array with one entry per row. 'federal' and 'california' are
+        dicts of arrays; per-row bracket breakdowns are not produced.
+    """
+    length = _column_length(columns)
+
+    def numeric(name):
+        if name not in columns:
+            return np.zeros(length)
+        return np.asarray(columns[name], dtype=float).reshape(length)
+
+    def labels(name, default):
+        if name not in columns:
+            return np.full(length, default)
+        return np.asarray(columns[name]).astype(str).reshape(length)
+
+    values = {name: numeric(name) for name in NUMERIC_FIELDS}
+    tax_year = (
+        np.asarray(columns['tax_year'], dtype=np.int64).reshape(length)
+        if 'tax_year' in columns else np.full(length, DEFAULT_TAX_YEAR))
+    filing_status = labels('filing_status', DEFAULT_FILING_STATUS)
+    state = np.char.upper(labels('state', DEFAULT_STATE))
+
+    # Calculate totals
+    total_wages = values['w2_wages']
+    total_interest = values['interest_income']
+    total_dividends = values['ordinary_dividends']
+    net_capital_gains = values['short_term_gains'] + \
+        values['long_term_gains'] + values['capital_gain_distributions']
+    total_capital_gains = np.maximum(net_capital_gains, -3000.0)
+    total_self_employment = values['self_employment_income']
+
+    gross_income = (
+        total_wages +
+        total_interest +
+        total_dividends +
+        total_capital_gains +
+        total_self_employment
+    )
+
+    non_qualified_dividends = values['ordinary_dividends'] - \
+        values['qualified_dividends']
+    long_term_gains = values['long_term_gains'] + \
+        values['capital_gain_distributions']
+
+    # Federal, one vectorized pass per (tax_year, filing_status)
+    federal = {}
+    for (year, status), rows in _group_rows(tax_year, filing_status):
+        group = calculate_federal_tax_batch(
+            wages=values['w2_wages'][rows],
+            interest_income=values['interest_income'][rows],
+            ordinary_dividends=non_qualified_dividends[rows],
+            qualified_dividends=values['qualified_dividends'][rows],
+            short_term_gains=values['short_term_gains'][rows],
+            long_term_gains=long_term_gains[rows],
+            self_employment_income=values['self_employment_income'][rows],
+            foreign_income=values['foreign_income'][rows],
+            itemized_deductions=values['itemized_deductions'][rows],
+            w2_social_security_wages=values['w2_social_security_wages'][rows],
+            w2_medicare_wages=values['w2_medicare_wages'][rows],
+            w2_medicare_tax=values['w2_medicare_tax'][rows],
+            tax_year=int(year),
+            filing_status=str(status),
+        )
+        _scatter(federal, rows, group, length)
+
+    # State, one vectorized pass per (state, tax_year, filing_status)
+    state_result = {}
+    for (code, year, status), rows in _group_rows(state, tax_year, filing_status):
+        state_calc = StateTaxRegistry.get_calculator(str(code))
+        group = state_calc.calculate_batch(
+            {
+                'wages': values['w2_wages'][rows],
+                'interest_income': values['interest_income'][rows],
+                'dividend_income': values['ordinary_dividends'][rows],
+                'capital_gains': total_capital_gains[rows],
+                'self_employment_income': values['self_employment_income'][rows],
+                'federal_agi': federal['adjusted_gross_income'][rows],
+                'federal_taxable_income': federal['taxable_income'][rows],
+            },
+            int(year),
+            str(status),
+        )
+        _scatter(state_result, rows, group, length)
+
+    # Calculate withholding totals
+    total_federal_withheld = (
+        values['w2_federal_withheld'] +
+        values['interest_federal_withheld'] +
+        values['dividend_federal_withheld'] +
+        values['self_employment_federal_withheld'] +
+        values['estimated_tax_payments'] +
+        values['other_withholding'] +
+        federal['additional_medicare_withholding']
+    )
+    total_state_withheld = values['w2_state_withheld']
+
+    # Calculate bottom line
+    total_tax_liability = federal['total_federal_tax'] + \
+        state_result['total_california_tax']
+    total_withheld = total_federal_withheld + total_state_withheld
+    amount_owed = total_tax_liability - total_withheld
+
+    return {
+        'total_wages': total_wages,
+        'total_interest': total_interest,
+        'total_tax_exempt_interest': values['tax_exempt_interest'],
+        'total_dividends': total_dividends,
+        'total_capital_gains': total_capital_gains,
+        'total_self_employment': total_self_employment,
+        'gross_income': gross_income,
+        'federal': federal,
+        'california': state_result,
+        'total_federal_withheld': total_federal_withheld,
+        'total_state_withheld': total_state_withheld,
+        'estimated_tax_payments': values['estimated_tax_payments'],
+        'other_withholding': values['other_withholding'],
+        'total_tax_liability': total_tax_liability,
+        'total_withheld': total_withheld,
+        'amount_owed': amount_owed,
+        'refund_or_owed': np.where(amount_owed < 0, 'refund', 'owed'),
+        'tax_year': tax_year,
+    }
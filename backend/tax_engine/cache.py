@@ -0,0 +1,147 @@
+"""
+Result Cache
+
+Bounded LRU memoization of calculate_taxes keyed by a canonical form of the
+input, so repeated calculations of the same return are served from memory.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from .calculator import calculate_taxes, TaxInput, TaxSummary, TAX_INPUT_DEFAULTS
+from .utils import DETAIL_BREAKDOWN, tax_tables_version
+
+# Maximum number of memoized calculate_taxes results
+RESULT_CACHE_SIZE = 4096
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU mapping with hit/miss/eviction counters.
+
+    If a version callable is given, the cache empties itself whenever the
+    value it returns changes.
+    """
+
+    def __init__(
+            self,
+            maxsize: int,
+            version: Optional[Callable[[], Hashable]] = None):
+        self.maxsize = maxsize
+        self._version = version
+        self._seen_version = version() if version else None
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _check_version(self):
+        if self._version is None:
+            return
+        current = self._version()
+        if current != self._seen_version:
+            self._entries.clear()
+            self._seen_version = current
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            self._check_version()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._check_version()
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        compute runs outside the lock, so two threads missing on the same
+        key at once may both compute it; the last one stored wins.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+
+def canonicalize_input(tax_input: TaxInput) -> dict:
+    """
+    Return the input calculate_taxes effectively sees.
+
+    Defaults are filled in, None becomes 0.0, numbers become floats (tax
+    year an int), unknown fields are dropped and keys are sorted.
+    """
+    canonical = {}
+    for field in sorted(TAX_INPUT_DEFAULTS):
+        default = TAX_INPUT_DEFAULTS[field]
+        value = tax_input.get(field, default)
+        if isinstance(default, float):
+            value = 0.0 if value is None else float(value)
+        elif field == 'tax_year':
+            value = default if value is None else int(value)
+        elif value is None:
+            value = default
+        canonical[field] = value
+    return canonical
+
+
+def input_key(canonical_input: dict) -> tuple:
+    """Hashable key for a canonicalized input."""
+    return tuple(canonical_input.items())
+
+
+_result_cache = LRUCache(RESULT_CACHE_SIZE, version=tax_tables_version)
+
+
+def cached_calculate_taxes(
+        tax_input: TaxInput,
+        detail: str = DETAIL_BREAKDOWN) -> TaxSummary:
+    """
+    Memoized calculate_taxes.
+
+    The input is canonicalized first, so inputs that differ only in omitted
+    defaults, None values or int/float types share one entry. The returned
+    summary is shared between callers and must not be modified.
+    """
+    canonical = canonicalize_input(tax_input)
+    return _result_cache.get_or_compute(
+        (input_key(canonical), detail),
+        lambda: calculate_taxes(canonical, detail))
+
+
+def result_cache_stats() -> dict:
+    """Hit, miss and eviction counters of the calculate_taxes cache."""
+    return _result_cache.stats()
+
+
+def clear_result_cache():
+    _result_cache.clear()
@@ -7,6 +7,7 @@ Combines federal and California tax calculations into a single API.
 from typing import TypedDict
 from .federal import calculate_federal_tax, FederalTaxResult
 from .states.california import calculate_california_tax, CaliforniaTaxResult
+from .utils import DETAIL_BREAKDOWN, DETAIL_LEVELS, DETAIL_TRACE
 
 
 class TaxInput(TypedDict, total=False):
@@ -50,6 +51,37 @@ class TaxInput(TypedDict, total=False):
     filing_status: str  # 'single' or 'joint'
 
 
+# Value calculate_taxes assumes for each input field it reads when the
+# field is missing (includes the W-2 extras not declared on TaxInput)
+TAX_INPUT_DEFAULTS = {
+    'w2_wages': 0.0,
+    'w2_federal_withheld': 0.0,
+    'w2_state_withheld': 0.0,
+    'w2_social_security_wages': 0.0,
+    'w2_casdi': 0.0,
+    'w2_medicare_wages': 0.0,
+    'w2_medicare_tax': 0.0,
+    'interest_income': 0.0,
+    'tax_exempt_interest': 0.0,
+    'interest_federal_withheld': 0.0,
+    'ordinary_dividends': 0.0,
+    'qualified_dividends': 0.0,
+    'capital_gain_distributions': 0.0,
+    'dividend_federal_withheld': 0.0,
+    'short_term_gains': 0.0,
+    'long_term_gains': 0.0,
+    'self_employment_income': 0.0,
+    'self_employment_federal_withheld': 0.0,
+    'estimated_tax_payments': 0.0,
+    'other_withholding': 0.0,
+    'itemized_deductions': 0.0,
+    'foreign_income': 0.0,
+    'tax_year': 2024,
+    'state': 'CA',
+    'filing_status': 'single',
+}
+
+
 class TaxSummary(TypedDict):
     """Complete tax calculation summary."""
     # Income totals
@@ -85,57 +117,24 @@ class TaxSummary(TypedDict):
     refund_or_owed: str  # "refund" or "owed"
 
 
-def calculate_taxes(tax_input: TaxInput) -> TaxSummary:
-    """
-    Calculate complete federal and California tax liability.
+def read_tax_input(tax_input: TaxInput) -> dict:
+    """Every field calculate_taxes reads, with defaults for missing ones."""
+    return {
+        field: tax_input.get(field, default)
+        for field, default in TAX_INPUT_DEFAULTS.items()
+    }
 
-    Args:
-        tax_input: Dictionary with all income and withholding amounts
 
-    Returns:
-        TaxSummary with complete breakdown
-    """
-    # Extract values with defaults
-    w2_wages = tax_input.get('w2_wages', 0.0)
-    w2_federal_withheld = tax_input.get('w2_federal_withheld', 0.0)
-    w2_state_withheld = tax_input.get('w2_state_withheld', 0.0)
-    w2_social_security_wages = tax_input.get('w2_social_security_wages', 0.0)
-    w2_casdi = tax_input.get('w2_casdi', 0.0)  # CA State Disability Insurance
-
-    tax_year = tax_input.get('tax_year', 2024)
-    estimated_tax_payments = tax_input.get('estimated_tax_payments', 0.0)
-    other_withholding = tax_input.get('other_withholding', 0.0)
-    filing_status = tax_input.get('filing_status', 'single')
-
-    print(f"DEBUG: w2_medicare_wages={tax_input.get('w2_medicare_wages')}")
-    print(f"DEBUG: w2_medicare_tax={tax_input.get('w2_medicare_tax')}")
-
-    interest_income = tax_input.get('interest_income', 0.0)
-    tax_exempt_interest = tax_input.get('tax_exempt_interest', 0.0)
-    interest_federal_withheld = tax_input.get('interest_federal_withheld', 0.0)
-
-    ordinary_dividends = tax_input.get('ordinary_dividends', 0.0)
-    qualified_dividends = tax_input.get('qualified_dividends', 0.0)
-    capital_gain_distributions = tax_input.get(
-        'capital_gain_distributions', 0.0)
-    dividend_federal_withheld = tax_input.get('dividend_federal_withheld', 0.0)
-
-    short_term_gains = tax_input.get('short_term_gains', 0.0)
-    long_term_gains = tax_input.get('long_term_gains', 0.0)
-
-    self_employment_income = tax_input.get('self_employment_income', 0.0)
-    self_employment_federal_withheld = tax_input.get(
-        'self_employment_federal_withheld', 0.0)
-
-    # Calculate totals
-    total_wages = w2_wages
-    total_interest = interest_income
-    total_dividends = ordinary_dividends  # qualified is subset of ordinary
-    net_capital_gains = short_term_gains + \
-        long_term_gains + capital_gain_distributions
+def summarize_income(values: dict) -> dict:
+    """Income totals shown on the summary, from read_tax_input values."""
+    total_wages = values['w2_wages']
+    total_interest = values['interest_income']
+    total_dividends = values['ordinary_dividends']  # qualified is subset of ordinary
+    net_capital_gains = values['short_term_gains'] + \
+        values['long_term_gains'] + values['capital_gain_distributions']
     # Limit capital loss deduction to $3,000
     total_capital_gains = max(net_capital_gains, -3000.0)
-    total_self_employment = self_employment_income
+    total_self_employment = values['self_employment_income']
 
     gross_income = (
         total_wages +
@@ -145,91 +144,189 @@ def calculate_taxes(tax_input: TaxInput) -> TaxSummary:
         total_self_employment
     )
 
-    # Calculate federal tax
+    return {
+        'total_wages': total_wages,
+        'total_interest': total_interest,
+        'total_dividends': total_dividends,
+        'net_capital_gains': net_capital_gains,
+        'total_capital_gains': total_capital_gains,
+        'total_self_employment': total_self_employment,
+        'gross_income': gross_income,
+    }
+
+
+def federal_arguments(values: dict) -> dict:
+    """Keyword arguments for calculate_federal_tax."""
     # Note: ordinary_dividends includes qualified, so we subtract to get
     # non-qualified
-    non_qualified_dividends = ordinary_dividends - qualified_dividends
-
-    foreign_income = tax_input.get('foreign_income', 0.0)
-    itemized_deductions = tax_input.get('itemized_deductions', 0.0)
-
-    federal_result = calculate_federal_tax(
-        wages=w2_wages,
-        interest_income=interest_income,
-        ordinary_dividends=non_qualified_dividends,
-        qualified_dividends=qualified_dividends,
-        short_term_gains=short_term_gains,
-        long_term_gains=long_term_gains + capital_gain_distributions,
-        self_employment_income=self_employment_income,
-        foreign_income=foreign_income,
-        itemized_deductions=itemized_deductions,
-        w2_social_security_wages=w2_social_security_wages,
-        w2_medicare_wages=tax_input.get('w2_medicare_wages', 0.0),
-        w2_medicare_tax=tax_input.get('w2_medicare_tax', 0.0),
-        tax_year=tax_year,
-        filing_status=filing_status,
-    )
+    non_qualified_dividends = values['ordinary_dividends'] - \
+        values['qualified_dividends']
 
-    # Calculate State Tax via Registry
-    from .registry import StateTaxRegistry
-    selected_state = tax_input.get('state', 'CA')
+    return {
+        'wages': values['w2_wages'],
+        'interest_income': values['interest_income'],
+        'ordinary_dividends': non_qualified_dividends,
+        'qualified_dividends': values['qualified_dividends'],
+        'short_term_gains': values['short_term_gains'],
+        'long_term_gains': values['long_term_gains'] + values['capital_gain_distributions'],
+        'self_employment_income': values['self_employment_income'],
+        'foreign_income': values['foreign_income'],
+        'itemized_deductions': values['itemized_deductions'],
+        'w2_social_security_wages': values['w2_social_security_wages'],
+        'w2_medicare_wages': values['w2_medicare_wages'],
+        'w2_medicare_tax': values['w2_medicare_tax'],
+        'tax_year': values['tax_year'],
+        'filing_status': values['filing_status'],
+    }
 
-    state_calc = StateTaxRegistry.get_calculator(selected_state)
 
-    state_input = {
-        'wages': w2_wages,
-        'interest_income': interest_income,
-        'dividend_income': ordinary_dividends,
+def state_input(
+        values: dict,
+        total_capital_gains: float,
+        federal_agi: float,
+        federal_taxable_income: float) -> dict:
+    """Input for StateTaxCalculator.calculate."""
+    return {
+        'wages': values['w2_wages'],
+        'interest_income': values['interest_income'],
+        'dividend_income': values['ordinary_dividends'],
         'capital_gains': total_capital_gains,
-        'self_employment_income': self_employment_income,
-        'tax_year': tax_year,
-        'federal_agi': federal_result['adjusted_gross_income'],
-        'federal_taxable_income': federal_result['taxable_income'],
-        'filing_status': filing_status
+        'self_employment_income': values['self_employment_income'],
+        'tax_year': values['tax_year'],
+        'federal_agi': federal_agi,
+        'federal_taxable_income': federal_taxable_income,
+        'filing_status': values['filing_status']
     }
 
+
+def calculate_state_tax(state_code: str, state_input: dict, detail: str = DETAIL_BREAKDOWN):
+    """Run the registered calculator for state_code."""
+    from .registry import StateTaxRegistry
+
+    state_calc = StateTaxRegistry.get_calculator(state_code)
     # Returns standardized StateTaxResult (compatible with CaliforniaTaxResult)
-    california_result = state_calc.calculate(state_input)
-
-    # Calculate withholding totals
-    total_federal_withheld = (
-        w2_federal_withheld +
-        interest_federal_withheld +
-        dividend_federal_withheld +
-        self_employment_federal_withheld +
-        estimated_tax_payments +
-        other_withholding +
-        federal_result.get('additional_medicare_withholding', 0.0)
+    return state_calc.calculate(state_input, detail)
+
+
+def total_federal_withholding(
+        values: dict,
+        additional_medicare_withholding: float) -> float:
+    """Federal withholding and payments credited against federal tax."""
+    return (
+        values['w2_federal_withheld'] +
+        values['interest_federal_withheld'] +
+        values['dividend_federal_withheld'] +
+        values['self_employment_federal_withheld'] +
+        values['estimated_tax_payments'] +
+        values['other_withholding'] +
+        additional_medicare_withholding
     )
-    # Include CASDI in state withholding? NO. CASDI is a separate tax (Disability Insurance).
-    # It is NOT a prepayment of Income Tax.
-    # So we should NOT include it in total_state_withheld for comparison
-    # against Income Tax Liability.
-    total_state_withheld = w2_state_withheld
-
-    # Calculate bottom line
-    total_tax_liability = federal_result['total_federal_tax'] + \
-        california_result['total_california_tax']
+
+
+def bottom_line(
+        total_federal_tax: float,
+        total_state_tax: float,
+        total_federal_withheld: float,
+        total_state_withheld: float) -> dict:
+    """Total liability, total withheld and the resulting amount owed."""
+    total_tax_liability = total_federal_tax + total_state_tax
     total_withheld = total_federal_withheld + total_state_withheld
     amount_owed = total_tax_liability - total_withheld
 
     return {
-        'total_wages': total_wages,
-        'total_interest': total_interest,
-        'total_tax_exempt_interest': tax_exempt_interest,
-        'total_dividends': total_dividends,
-        'total_capital_gains': total_capital_gains,
-        'total_self_employment': total_self_employment,
-        'gross_income': gross_income,
-        'federal': federal_result,
-        'california': california_result,
-        'total_federal_withheld': total_federal_withheld,
-        'total_state_withheld': total_state_withheld,
-        'estimated_tax_payments': estimated_tax_payments,
-        'other_withholding': other_withholding,
         'total_tax_liability': total_tax_liability,
         'total_withheld': total_withheld,
         'amount_owed': amount_owed,
         'refund_or_owed': 'refund' if amount_owed < 0 else 'owed',
-        'tax_year': tax_year,
     }
+
+
+def assemble_summary(
+        values: dict,
+        income: dict,
+        federal_result: FederalTaxResult,
+        california_result: CaliforniaTaxResult,
+        total_federal_withheld: float,
+        totals: dict,
+        detail: str = DETAIL_BREAKDOWN) -> TaxSummary:
+    """Combine the calculation stages into a TaxSummary."""
+    summary = {
+        'total_wages': income['total_wages'],
+        'total_interest': income['total_interest'],
+        'total_tax_exempt_interest': values['tax_exempt_interest'],
+        'total_dividends': income['total_dividends'],
+        'total_capital_gains': income['total_capital_gains'],
+        'total_self_employment': income['total_self_employment'],
+        'gross_income': income['gross_income'],
+        'federal': federal_result,
+        'california': california_result,
+        'total_federal_withheld': total_federal_withheld,
+        # CASDI (w2_casdi) is a separate tax (Disability Insurance), NOT a
+        # prepayment of Income Tax, so it is left out of state withholding.
+        'total_state_withheld': values['w2_state_withheld'],
+        'estimated_tax_payments': values['estimated_tax_payments'],
+        'other_withholding': values['other_withholding'],
+        **totals,
+        'tax_year': values['tax_year'],
+    }
+
+    if detail == DETAIL_TRACE:
+        summary['trace'] = {
+            'detail': detail,
+            'state': values['state'],
+            'net_capital_gains': income['net_capital_gains'],
+            'non_qualified_dividends': values['ordinary_dividends'] - values['qualified_dividends'],
+            'w2_medicare_wages': values['w2_medicare_wages'],
+            'w2_medicare_tax': values['w2_medicare_tax'],
+        }
+
+    return summary
+
+
+def calculate_taxes(
+        tax_input: TaxInput,
+        detail: str = DETAIL_BREAKDOWN) -> TaxSummary:
+    """
+    Calculate complete federal and California tax liability.
+
+    Args:
+        tax_input: Dictionary with all income and withholding amounts
+        detail: 'totals' (no bracket breakdowns), 'breakdown' (default) or
+            'trace' (breakdowns plus intermediate worksheet values)
+
+    Returns:
+        TaxSummary with complete breakdown
+    """
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(
+            f"Unknown detail level {detail!r}, expected one of {DETAIL_LEVELS}")
+
+    values = read_tax_input(tax_input)
+    income = summarize_income(values)
+
+    federal_result = calculate_federal_tax(**federal_arguments(values), detail=detail)
+
+    california_result = calculate_state_tax(
+        values['state'],
+        state_input(
+            values,
+            income['total_capital_gains'],
+            federal_result['adjusted_gross_income'],
+            federal_result['taxable_income'],
+        ),
+        detail,
+    )
+
+    total_federal_withheld = total_federal_withholding(
+        values, federal_result.get('additional_medicare_withholding', 0.0))
+
+    totals = bottom_line(
+        federal_result['total_federal_tax'],
+        california_result['total_california_tax'],
+        total_federal_withheld,
+        values['w2_state_withheld'],
+    )
+
+    return assemble_summary(
+        values, income, federal_result, california_result,
+        total_federal_withheld, totals, detail)
@@ -0,0 +1,227 @@
+"""
+State Comparison
+
+Taxes one return in every state at once. Federal tax is computed a single
+time; every state's brackets are stacked into padded 2-D tables so that
+all states are evaluated in one vectorized pass, with results matching the
+registered state calculators exactly.
+"""
+
+from typing import NamedTuple, TypedDict
+import numpy as np
+from .cache import LRUCache, canonicalize_input
+from .calculator import TaxInput, federal_arguments, summarize_income
+from .federal import calculate_federal_tax, check_filing_status, check_tax_year
+from .states import generic
+from .states.california import (
+    CA_TAX_RATES,
+    CA_MENTAL_HEALTH_RATE,
+    CA_MENTAL_HEALTH_THRESHOLD,
+)
+from .utils import (
+    BracketTable,
+    DETAIL_TOTALS,
+    compile_brackets,
+    get_bracket_table,
+    tax_tables_version,
+)
+
+
+class StackedStateTables(NamedTuple):
+    """Every state's rates for one tax year and filing status, one row per state."""
+    codes: tuple[str, ...]
+    names: tuple[str, ...]
+    has_income_tax: np.ndarray  # bool
+    # California taxes its own gross income; the generic states start from
+    # federal AGI and report marginal rates as fractions rather than percent
+    is_california: np.ndarray  # bool
+    standard_deduction: np.ndarray
+    # Brackets padded to the longest schedule with infinite upper limits
+    bracket_count: np.ndarray  # int
+    lower_limits: np.ndarray
+    upper_limits: np.ndarray
+    rates: np.ndarray
+    base_tax: np.ndarray
+    surcharge_threshold: np.ndarray
+    surcharge_rate: np.ndarray
+
+
+class StateComparisonRow(TypedDict):
+    """One row of the ranked comparison."""
+    rank: int
+    state: str
+    name: str
+    taxable_income: float
+    state_tax: float
+    effective_rate: float  # percent, as reported by the state's calculator
+    marginal_rate: float  # percent
+    total_tax: float  # federal plus state
+
+
+class _StateRow(NamedTuple):
+    code: str
+    name: str
+    has_income_tax: bool
+    is_california: bool
+    standard_deduction: float
+    brackets: BracketTable
+    surcharge_threshold: float = float('inf')
+    surcharge_rate: float = 0.0
+
+
+def stack_state_tables(tax_year: int, filing_status: str) -> StackedStateTables:
+    """Stack California's and every states.json table into 2-D arrays."""
+    ca_rates = CA_TAX_RATES[tax_year][filing_status]
+    rows = [_StateRow(
+        'CA',
+        'California',
+        True,
+        True,
+        float(ca_rates['standard_deduction']),
+        get_bracket_table('CA', tax_year, filing_status, ca_rates['brackets']),
+        CA_MENTAL_HEALTH_THRESHOLD,
+        CA_MENTAL_HEALTH_RATE,
+    )]
+
+    no_brackets = compile_brackets([(None, 0.0)])
+    for code, table in sorted(generic.STATE_TABLES.items()):
+        if code == 'CA':
+            # Always taxed by CaliforniaStateCalculator
+            continue
+        if table.has_income_tax:
+            rates = table.rates_for(tax_year, filing_status)
+            rows.append(_StateRow(
+                code, table.name, True, False, rates.standard_deduction, rates.brackets))
+        else:
+            rows.append(_StateRow(code, table.name, False, False, 0.0, no_brackets))
+
+    width = max(len(row.brackets.rates) for row in rows)
+
+    def column(field, dtype=float):
+        return np.asarray([getattr(row, field) for row in rows], dtype=dtype)
+
+    def bracket_column(field, fill, width):
+        return np.asarray([
+            getattr(row.brackets, field) +
+            (fill,) * (width - len(getattr(row.brackets, field)))
+            for row in rows
+        ], dtype=float)
+
+    return StackedStateTables(
+        codes=tuple(row.code for row in rows),
+        names=tuple(row.name for row in rows),
+        has_income_tax=column('has_income_tax', bool),
+        is_california=column('is_california', bool),
+        standard_deduction=column('standard_deduction'),
+        bracket_count=np.asarray([len(row.brackets.rates) for row in rows]),
+        lower_limits=bracket_column('lower_limits', float('inf'), width),
+        upper_limits=bracket_column('upper_limits', float('inf'), width),
+        rates=bracket_column('rates', 0.0, width),
+        base_tax=bracket_column('base_tax', 0.0, width + 1),
+        surcharge_threshold=column('surcharge_threshold'),
+        surcharge_rate=column('surcharge_rate'),
+    )
+
+
+# Stacked tables keyed by (tax_year, filing_status)
+_stacked_tables = LRUCache(32, version=tax_tables_version)
+
+
+def get_stacked_state_tables(tax_year: int, filing_status: str) -> StackedStateTables:
+    return _stacked_tables.get_or_compute(
+        (tax_year, filing_status),
+        lambda: stack_state_tables(tax_year, filing_status))
+
+
+def compare_states(tax_input: TaxInput) -> dict:
+    """
+    Tax the same return in California and every state in states.json.
+
+    Args:
+        tax_input: The return; its state field is ignored
+
+    Returns:
+        Dict with 'federal' (tax and AGI, computed once) and 'states', a
+        list of StateComparisonRow ranked from lowest to highest state tax
+
+    Raises:
+        ValueError: The tax year or filing status is not supported
+    """
+    values = canonicalize_input(tax_input)
+    tax_year = values['tax_year']
+    filing_status = values['filing_status']
+    check_tax_year(tax_year)
+    check_filing_status(filing_status)
+
+    income = summarize_income(values)
+    federal = calculate_federal_tax(**federal_arguments(values), detail=DETAIL_TOTALS)
+    federal_agi = federal['adjusted_gross_income']
+
+    tables = get_stacked_state_tables(tax_year, filing_status)
+    rows = np.arange(len(tables.codes))
+
+    # Income each state taxes (CA gross income, or federal AGI with the
+    # same approximation GenericStateCalculator applies when AGI is zero)
+    gross_income = (
+        values['w2_wages'] +
+        values['interest_income'] +
+        values['ordinary_dividends'] +
+        income['total_capital_gains'] +
+        values['self_employment_income']
+    )
+    generic_income = gross_income if federal_agi == 0.0 else federal_agi
+    state_income = np.where(tables.is_california, gross_income, generic_income)
+
+    taxable_income = np.maximum(0.0, state_income - tables.standard_deduction)
+
+    # Row-wise bisect_left over the padded upper limits, capped at the top
+    # bracket exactly as calculate_tax_from_brackets does
+    index = np.minimum(
+        (tables.upper_limits < taxable_income[:, None]).sum(axis=1),
+        tables.bracket_count - 1)
+    capped_income = np.minimum(taxable_income, tables.upper_limits[rows, index])
+    rate = tables.rates[rows, index]
+    bracket_tax = tables.base_tax[rows, index] + \
+        (capped_income - tables.lower_limits[rows, index]) * rate
+
+    positive = taxable_income > 0
+    bracket_tax = np.where(positive, bracket_tax, 0.0)
+    marginal_rate = np.where(positive, rate, tables.rates[:, 0])
+
+    # States without a surcharge have an infinite threshold and a zero rate
+    surcharge = np.maximum(
+        taxable_income - tables.surcharge_threshold, 0.0) * tables.surcharge_rate
+    state_tax = np.where(tables.has_income_tax, bracket_tax + surcharge, 0.0)
+    taxable_income = np.where(tables.has_income_tax, taxable_income, 0.0)
+    marginal_rate = np.where(tables.has_income_tax, marginal_rate * 100, 0.0)
+
+    has_income = tables.has_income_tax & (state_income > 0)
+    effective_rate = np.where(
+        has_income,
+        state_tax / np.where(has_income, state_income, 1.0) * 100,
+        0.0)
+
+    total_federal_tax = federal['total_federal_tax']
+    order = np.lexsort((np.asarray(tables.codes), state_tax))
+    ranked = [
+        {
+            'rank': rank,
+            'state': tables.codes[i],
+            'name': tables.names[i],
+            'taxable_income': float(taxable_income[i]),
+            'state_tax': float(state_tax[i]),
+            'effective_rate': float(effective_rate[i]),
+            'marginal_rate': float(marginal_rate[i]),
+            'total_tax': total_federal_tax + float(state_tax[i]),
+        }
+        for rank, i in enumerate(order, start=1)
+    ]
+
+    return {
+        'federal': {
+            'adjusted_gross_income': federal_agi,
+            'taxable_income': federal['taxable_income'],
+            'total_federal_tax': total_federal_tax,
+        },
+        'states': ranked,
+    }
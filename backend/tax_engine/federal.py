@@ -11,7 +11,15 @@ Implements federal income tax calculation including:
 
 
 from typing import TypedDict
-from .utils import calculate_tax_from_brackets
+import numpy as np
+from .utils import (
+    calculate_tax_from_brackets,
+    calculate_tax_from_brackets_batch,
+    get_bracket_table,
+    DETAIL_BREAKDOWN,
+    DETAIL_TOTALS,
+    DETAIL_TRACE,
+)
 
 
 class FederalTaxResult(TypedDict):
@@ -120,6 +128,24 @@ SE_ADDITIONAL_MEDICARE_THRESHOLD_JOINT = 250000
 # Default tax year
 DEFAULT_TAX_YEAR = 2024
 
+# Filing statuses every year of TAX_RATES has rates for
+FILING_STATUSES = ('single', 'joint')
+
+
+def check_filing_status(filing_status: str):
+    """Raise ValueError for a filing status without rates in TAX_RATES."""
+    if filing_status not in FILING_STATUSES:
+        raise ValueError(
+            f"Unsupported filing status {filing_status!r}; "
+            f"supported statuses: {', '.join(FILING_STATUSES)}")
+
+
+def check_tax_year(tax_year: int):
+    """Raise ValueError for a tax year without rates in TAX_RATES."""
+    if tax_year not in TAX_RATES:
+        supported = ', '.join(str(year) for year in TAX_RATES)
+        raise ValueError(f"Unsupported tax year {tax_year}; supported years: {supported}")
+
 
 # calculate_tax_from_brackets moved to utils.py
 
@@ -220,47 +246,38 @@ def calculate_self_employment_tax(
     return total_se_tax, ss_tax, medicare_tax
 
 
-def calculate_federal_tax(
-    wages: float = 0.0,
-    interest_income: float = 0.0,
-    ordinary_dividends: float = 0.0,
-    qualified_dividends: float = 0.0,
-    short_term_gains: float = 0.0,
-    long_term_gains: float = 0.0,
-    self_employment_income: float = 0.0,
-    foreign_income: float = 0.0,
-    itemized_deductions: float = 0.0,
-    w2_social_security_wages: float = 0.0,
-    w2_medicare_wages: float = 0.0,
-    w2_medicare_tax: float = 0.0,
-    tax_year: int = DEFAULT_TAX_YEAR,
-    filing_status: str = 'single',
-) -> FederalTaxResult:
+def calculate_additional_medicare_withholding(
+    w2_medicare_wages: float,
+    w2_medicare_tax: float,
+) -> float:
     """
-    Calculate total federal tax liability.
+    Additional Medicare Tax withheld by employers (Form 1040 line 25c).
 
-    Args:
-        ...
-        filing_status: 'single' or 'joint'
+    Employers withhold 1.45% (regular) + 0.9% (additional if wages > 200k),
+    so Box 6 total = (Wages * 0.0145) + AdditionalMedicareWithholding and
+    Additional = Box 6 - (Wages * 0.0145).
     """
-    # Calculate Additional Medicare Tax withholding for Line 25c
-    # Employers withhold 1.45% (regular) + 0.9% (additional if wages > 200k)
-    # Box 6 total = (Wages * 0.0145) + AdditionalMedicareWithholding
-    # So Additional = Box 6 - (Wages * 0.0145)
     regular_medicare_withholding = w2_medicare_wages * 0.0145
-    additional_medicare_withholding = max(
-        0, w2_medicare_tax - regular_medicare_withholding)
+    return max(0, w2_medicare_tax - regular_medicare_withholding)
 
-    # Get rates for the selected year and filing status
-    rates = TAX_RATES[tax_year][filing_status]
 
-    # Calculate gross income
-    # Note: Capital losses are limited to $3,000 offset against ordinary income
+def net_capital_gains(
+    short_term_gains: float,
+    long_term_gains: float,
+) -> tuple[float, float]:
+    """
+    Schedule D netting of short- and long-term gains.
+
+    Capital losses are limited to $3,000 offset against ordinary income.
+
+    Returns:
+        Tuple of (taxable_ordinary_capital_gain,
+        taxable_preferential_capital_gain)
+    """
     net_st = short_term_gains
     net_lt = long_term_gains
     total_net_capital_gains = net_st + net_lt
 
-    # Schedule D Netting Logic
     taxable_ordinary_capital_gain = 0.0
     taxable_preferential_capital_gain = 0.0
 
@@ -284,62 +301,106 @@ def calculate_federal_tax(
             taxable_ordinary_capital_gain = 0.0
             taxable_preferential_capital_gain = total_net_capital_gains
 
-    # Gross income includes total NET capital gain (or deductible loss)
-    gross_income_capital_component = taxable_ordinary_capital_gain + \
-        taxable_preferential_capital_gain
+    return taxable_ordinary_capital_gain, taxable_preferential_capital_gain
+
+
+def calculate_adjusted_gross_income(
+    wages: float,
+    interest_income: float,
+    ordinary_dividends: float,
+    qualified_dividends: float,
+    capital_gains: float,
+    self_employment_income: float,
+    foreign_income: float,
+    self_employment_tax: float,
+) -> tuple[float, float]:
+    """
+    Gross income and AGI (gross income less half of SE tax).
+
+    Args:
+        capital_gains: Net capital gain or deductible loss from Schedule D
 
+    Returns:
+        Tuple of (gross_income, adjusted_gross_income)
+    """
     gross_income = (
         wages +
         interest_income +
         ordinary_dividends +
         qualified_dividends +
-        gross_income_capital_component +
+        capital_gains +
         self_employment_income +
         foreign_income
     )
 
     # Self-employment deduction (half of SE tax)
-    se_tax_total, se_ss_tax, se_medicare_tax = calculate_self_employment_tax(
-        self_employment_income,
-        w2_social_security_wages,
-        tax_year,
-    )
-    se_deduction = se_tax_total / 2
+    se_deduction = self_employment_tax / 2
 
-    # Adjusted Gross Income
-    agi = gross_income - se_deduction
+    return gross_income, gross_income - se_deduction
 
-    # Apply deductions (Standard vs Itemized)
-    standard_deduction = rates['standard_deduction']
+
+def calculate_taxable_income(
+    agi: float,
+    itemized_deductions: float,
+    preferential_income: float,
+    tax_year: int = DEFAULT_TAX_YEAR,
+    filing_status: str = 'single',
+) -> tuple[float, float, float, float]:
+    """
+    Apply the larger of the standard and itemized deductions.
+
+    Args:
+        preferential_income: Qualified dividends plus preferential capital
+            gain, taxed on the capital gains worksheet instead of brackets
+
+    Returns:
+        Tuple of (standard_deduction, total_deductions, taxable_income,
+        ordinary_taxable_income)
+    """
+    standard_deduction = TAX_RATES[tax_year][filing_status]['standard_deduction']
     total_deductions = max(standard_deduction, itemized_deductions)
 
     taxable_income = max(0, agi - total_deductions)
-
-    # Ordinary Taxable Income
-    preferential_income = qualified_dividends + taxable_preferential_capital_gain
     ordinary_taxable_income = max(0.0, taxable_income - preferential_income)
 
-    # Calculate ordinary income tax
-    ordinary_tax, marginal_rate, bracket_breakdown = calculate_tax_from_brackets(
-        ordinary_taxable_income, rates['brackets'], )
+    return standard_deduction, total_deductions, taxable_income, ordinary_taxable_income
 
-    # Calculate capital gains tax (on LTCG + qualified dividends)
-    capital_gains_tax = calculate_capital_gains_tax(
+
+def calculate_ordinary_income_tax(
+    ordinary_taxable_income: float,
+    tax_year: int = DEFAULT_TAX_YEAR,
+    filing_status: str = 'single',
+    include_breakdown: bool = True,
+) -> tuple[float, float, list[dict]]:
+    """
+    Bracket tax on ordinary taxable income.
+
+    Returns:
+        Tuple of (ordinary_tax, marginal_rate, bracket_breakdown)
+    """
+    brackets = TAX_RATES[tax_year][filing_status]['brackets']
+    return calculate_tax_from_brackets(
         ordinary_taxable_income,
-        taxable_preferential_capital_gain,  # Net LT gain
-        qualified_dividends,
-        tax_year,
-        filing_status,
+        get_bracket_table('federal', tax_year, filing_status, brackets),
+        include_breakdown=include_breakdown,
     )
 
-    # Total federal income tax
-    total_income_tax = ordinary_tax + capital_gains_tax
 
-    # Additional Medicare Tax (0.9% on W-2 wages over Threshold) - Schedule 2, Part I
+def calculate_additional_medicare_tax(
+    wages: float,
+    w2_medicare_wages: float,
+    self_employment_income: float,
+    filing_status: str = 'single',
+) -> tuple[float, float, float]:
+    """
+    Additional Medicare Tax (0.9% over the threshold) - Form 8959.
+
+    Returns:
+        Tuple of (additional_medicare_tax, subject_wages, threshold)
+    """
     # Threshold depends on filing status
     medicare_threshold = SE_ADDITIONAL_MEDICARE_THRESHOLD_JOINT if filing_status == 'joint' else SE_ADDITIONAL_MEDICARE_THRESHOLD_SINGLE
 
-    additional_medicare_tax = 0.0
     # Use Medicare wages (Box 5) if available, otherwise fallback to regular wages
     # Also include Self-Employment income for the threshold test (Form 8959)
     # Total subject to Addt'l Medicare Tax = (Medicare Wages + SE Income) -
@@ -351,16 +412,24 @@ def calculate_federal_tax(
         additional_medicare_tax = (
             subject_wages - medicare_threshold) * SE_TAX_RATE_ADDITIONAL_MEDICARE
 
-    print(
-        f"DEBUG_FED: subject_wages={subject_wages}, threshold={medicare_threshold}, tax={additional_medicare_tax}")
+    return additional_medicare_tax, subject_wages, medicare_threshold
 
-    # Total federal tax (income tax + SE tax + Additional Medicare Tax)
-    total_federal_tax = total_income_tax + se_tax_total + additional_medicare_tax
 
-    # Net Investment Income Tax (NIIT) - Form 8960
-    # 3.8% on the lesser of Net Investment Income (NII) or MAGI over the threshold.
+def calculate_net_investment_income_tax(
+    agi: float,
+    net_investment_income: float,
+    filing_status: str = 'single',
+) -> tuple[float, float]:
+    """
+    Net Investment Income Tax (NIIT) - Form 8960.
+
+    3.8% on the lesser of Net Investment Income (NII) or MAGI over the
+    threshold.
+
+    Returns:
+        Tuple of (net_investment_income_tax, threshold)
+    """
     niit_threshold = 250000.0 if filing_status == 'joint' else 200000.0
-    net_investment_income = interest_income + ordinary_dividends + qualified_dividends + gross_income_capital_component
     net_investment_income_tax = 0.0
 
     if agi > niit_threshold and net_investment_income > 0:
@@ -368,6 +437,164 @@ def calculate_federal_tax(
         amount_subject_to_niit = min(net_investment_income, magi_overage)
         net_investment_income_tax = amount_subject_to_niit * 0.038
 
+    return net_investment_income_tax, niit_threshold
+
+
+def calculate_federal_tax(
+    wages: float = 0.0,
+    interest_income: float = 0.0,
+    ordinary_dividends: float = 0.0,
+    qualified_dividends: float = 0.0,
+    short_term_gains: float = 0.0,
+    long_term_gains: float = 0.0,
+    self_employment_income: float = 0.0,
+    foreign_income: float = 0.0,
+    itemized_deductions: float = 0.0,
+    w2_social_security_wages: float = 0.0,
+    w2_medicare_wages: float = 0.0,
+    w2_medicare_tax: float = 0.0,
+    tax_year: int = DEFAULT_TAX_YEAR,
+    filing_status: str = 'single',
+    detail: str = DETAIL_BREAKDOWN,
+) -> FederalTaxResult:
+    """
+    Calculate total federal tax liability.
+
+    Args:
+        ...
+        filing_status: 'single' or 'joint'
+        detail: 'totals' skips the bracket breakdown, 'trace' adds the
+            intermediate worksheet values under 'trace'
+    """
+    additional_medicare_withholding = calculate_additional_medicare_withholding(
+        w2_medicare_wages, w2_medicare_tax)
+
+    # Schedule D Netting Logic
+    taxable_ordinary_capital_gain, taxable_preferential_capital_gain = \
+        net_capital_gains(short_term_gains, long_term_gains)
+
+    self_employment = calculate_self_employment_tax(
+        self_employment_income,
+        w2_social_security_wages,
+        tax_year,
+    )
+
+    # Gross income includes total NET capital gain (or deductible loss)
+    gross_income_capital_component = taxable_ordinary_capital_gain + \
+        taxable_preferential_capital_gain
+
+    gross_income, agi = calculate_adjusted_gross_income(
+        wages,
+        interest_income,
+        ordinary_dividends,
+        qualified_dividends,
+        gross_income_capital_component,
+        self_employment_income,
+        foreign_income,
+        self_employment[0],
+    )
+
+    deductions = calculate_taxable_income(
+        agi,
+        itemized_deductions,
+        qualified_dividends + taxable_preferential_capital_gain,
+        tax_year,
+        filing_status,
+    )
+
+    ordinary_income_tax = calculate_ordinary_income_tax(
+        deductions[3],
+        tax_year,
+        filing_status,
+        include_breakdown=detail != DETAIL_TOTALS,
+    )
+
+    # Calculate capital gains tax (on LTCG + qualified dividends)
+    capital_gains_tax = calculate_capital_gains_tax(
+        deductions[3],
+        taxable_preferential_capital_gain,  # Net LT gain
+        qualified_dividends,
+        tax_year,
+        filing_status,
+    )
+
+    additional_medicare = calculate_additional_medicare_tax(
+        wages, w2_medicare_wages, self_employment_income, filing_status)
+
+    net_investment_income = interest_income + ordinary_dividends + \
+        qualified_dividends + gross_income_capital_component
+    niit = calculate_net_investment_income_tax(
+        agi, net_investment_income, filing_status)
+
+    return assemble_federal_result(
+        wages=wages,
+        filing_status=filing_status,
+        interest_income=interest_income,
+        ordinary_dividends=ordinary_dividends,
+        qualified_dividends=qualified_dividends,
+        itemized_deductions=itemized_deductions,
+        foreign_income=foreign_income,
+        capital_gains=(taxable_ordinary_capital_gain,
+                       taxable_preferential_capital_gain),
+        self_employment=self_employment,
+        income=(gross_income, agi),
+        deductions=deductions,
+        ordinary_income_tax=ordinary_income_tax,
+        capital_gains_tax=capital_gains_tax,
+        additional_medicare=additional_medicare,
+        net_investment_income=net_investment_income,
+        niit=niit,
+        additional_medicare_withholding=additional_medicare_withholding,
+        detail=detail,
+    )
+
+
+def assemble_federal_result(
+    wages: float,
+    filing_status: str,
+    interest_income: float,
+    ordinary_dividends: float,
+    qualified_dividends: float,
+    itemized_deductions: float,
+    foreign_income: float,
+    capital_gains: tuple[float, float],
+    self_employment: tuple[float, float, float],
+    income: tuple[float, float],
+    deductions: tuple[float, float, float, float],
+    ordinary_income_tax: tuple[float, float, list[dict]],
+    capital_gains_tax: float,
+    additional_medicare: tuple[float, float, float],
+    net_investment_income: float,
+    niit: tuple[float, float],
+    additional_medicare_withholding: float,
+    detail: str = DETAIL_BREAKDOWN,
+) -> FederalTaxResult:
+    """
+    Combine the worksheet stages into a FederalTaxResult.
+
+    Each tuple argument is the return value of the matching stage function
+    (net_capital_gains, calculate_self_employment_tax,
+    calculate_adjusted_gross_income, calculate_taxable_income,
+    calculate_ordinary_income_tax, calculate_additional_medicare_tax and
+    calculate_net_investment_income_tax).
+    """
+    taxable_ordinary_capital_gain, taxable_preferential_capital_gain = capital_gains
+    se_tax_total, se_ss_tax, se_medicare_tax = self_employment
+    gross_income, agi = income
+    standard_deduction, total_deductions, taxable_income, ordinary_taxable_income = deductions
+    ordinary_tax, marginal_rate, bracket_breakdown = ordinary_income_tax
+    additional_medicare_tax, subject_wages, medicare_threshold = additional_medicare
+    net_investment_income_tax, niit_threshold = niit
+
+    gross_income_capital_component = taxable_ordinary_capital_gain + \
+        taxable_preferential_capital_gain
+
+    # Total federal income tax
+    total_income_tax = ordinary_tax + capital_gains_tax
+
+    # Total federal tax (income tax + SE tax + Additional Medicare Tax)
+    total_federal_tax = total_income_tax + se_tax_total + additional_medicare_tax
+
     # Add NIIT to total federal tax
     total_federal_tax += net_investment_income_tax
 
@@ -377,7 +604,7 @@ def calculate_federal_tax(
         gross_income *
         100) if gross_income > 0 else 0.0
 
-    return {
+    result = {
         'wages': wages,
         'filing_status': filing_status,
         'interest_income': interest_income,
@@ -403,3 +630,242 @@ def calculate_federal_tax(
         'bracket_breakdown': bracket_breakdown,
         'additional_medicare_withholding': additional_medicare_withholding,
     }
+
+    if detail == DETAIL_TRACE:
+        result['trace'] = {
+            'taxable_ordinary_capital_gain': taxable_ordinary_capital_gain,
+            'taxable_preferential_capital_gain': taxable_preferential_capital_gain,
+            'self_employment_social_security_tax': se_ss_tax,
+            'self_employment_medicare_tax': se_medicare_tax,
+            'self_employment_deduction': se_tax_total / 2,
+            'total_deductions': total_deductions,
+            'preferential_income': qualified_dividends + taxable_preferential_capital_gain,
+            'ordinary_taxable_income': ordinary_taxable_income,
+            'medicare_subject_wages': subject_wages,
+            'medicare_threshold': medicare_threshold,
+            'net_investment_income': net_investment_income,
+            'niit_threshold': niit_threshold,
+        }
+
+    return result
+
+
+# Vectorized kernels for calculate_taxes_batch. Each mirrors its scalar
+# counterpart above operation for operation so that every row matches the
+# scalar engine exactly. tax_year and filing_status are scalars: callers
+# group rows by (tax_year, filing_status) before invoking them.
+
+
+def calculate_capital_gains_tax_batch(
+    taxable_income: np.ndarray,
+    long_term_gains: np.ndarray,
+    qualified_dividends: np.ndarray,
+    tax_year: int = DEFAULT_TAX_YEAR,
+    filing_status: str = 'single',
+) -> np.ndarray:
+    """Vectorized calculate_capital_gains_tax."""
+    total_preferential_income = long_term_gains + qualified_dividends
+    has_preferential = (
+        ~((long_term_gains <= 0) & (qualified_dividends <= 0)) &
+        (total_preferential_income > 0)
+    )
+
+    starting_income = taxable_income
+    ending_income = taxable_income + total_preferential_income
+
+    total_tax = np.zeros_like(taxable_income)
+    finished = np.zeros(taxable_income.shape, dtype=bool)
+    previous_limit = 0.0
+
+    ltcg_brackets = TAX_RATES[tax_year][filing_status]['ltcg_brackets']
+    for upper_limit, rate in ltcg_brackets:
+        below_start = upper_limit <= starting_income
+
+        bracket_start = np.maximum(starting_income, previous_limit)
+        bracket_end = np.minimum(ending_income, upper_limit)
+
+        in_bracket = ~below_start & ~finished & (bracket_end > bracket_start)
+        total_tax = np.where(
+            in_bracket,
+            total_tax + (bracket_end - bracket_start) * rate,
+            total_tax)
+
+        finished |= ~below_start & (ending_income <= upper_limit)
+        previous_limit = upper_limit
+
+    return np.where(has_preferential, total_tax, 0.0)
+
+
+def calculate_self_employment_tax_batch(
+    self_employment_income: np.ndarray,
+    w2_social_security_wages: np.ndarray,
+    tax_year: int = DEFAULT_TAX_YEAR,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized calculate_self_employment_tax."""
+    has_se_income = self_employment_income > 0
+
+    net_se_earnings = self_employment_income * 0.9235
+
+    ss_wage_base = TAX_RATES[tax_year]['ss_wage_base']
+    ss_wage_room = np.maximum(0, ss_wage_base - w2_social_security_wages)
+    ss_taxable = np.minimum(net_se_earnings, ss_wage_room)
+    ss_tax = ss_taxable * SE_TAX_RATE_SOCIAL_SECURITY
+
+    medicare_tax = net_se_earnings * SE_TAX_RATE_MEDICARE
+
+    total_se_tax = ss_tax + medicare_tax
+
+    return (
+        np.where(has_se_income, total_se_tax, 0.0),
+        np.where(has_se_income, ss_tax, 0.0),
+        np.where(has_se_income, medicare_tax, 0.0),
+    )
+
+
+def calculate_federal_tax_batch(
+    wages: np.ndarray,
+    interest_income: np.ndarray,
+    ordinary_dividends: np.ndarray,
+    qualified_dividends: np.ndarray,
+    short_term_gains: np.ndarray,
+    long_term_gains: np.ndarray,
+    self_employment_income: np.ndarray,
+    foreign_income: np.ndarray,
+    itemized_deductions: np.ndarray,
+    w2_social_security_wages: np.ndarray,
+    w2_medicare_wages: np.ndarray,
+    w2_medicare_tax: np.ndarray,
+    tax_year: int = DEFAULT_TAX_YEAR,
+    filing_status: str = 'single',
+) -> dict[str, np.ndarray]:
+    """
+    Vectorized calculate_federal_tax over equal-length input arrays.
+
+    Returns the numeric fields of FederalTaxResult as arrays. The
+    per-row bracket_breakdown and the filing_status echo are omitted.
+    """
+    regular_medicare_withholding = w2_medicare_wages * 0.0145
+    additional_medicare_withholding = np.maximum(
+        0, w2_medicare_tax - regular_medicare_withholding)
+
+    rates = TAX_RATES[tax_year][filing_status]
+
+    # Schedule D Netting Logic
+    net_st = short_term_gains
+    net_lt = long_term_gains
+    total_net_capital_gains = net_st + net_lt
+
+    net_loss = total_net_capital_gains < 0
+    st_positive = net_st > 0
+    lt_positive = net_lt > 0
+
+    taxable_ordinary_capital_gain = np.select(
+        [net_loss,
+         st_positive & lt_positive,
+         st_positive & ~lt_positive],
+        [np.maximum(total_net_capital_gains, -3000.0),
+         net_st,
+         total_net_capital_gains],
+        default=0.0)
+    taxable_preferential_capital_gain = np.select(
+        [net_loss,
+         st_positive & lt_positive,
+         ~st_positive & lt_positive],
+        [0.0,
+         net_lt,
+         total_net_capital_gains],
+        default=0.0)
+
+    gross_income_capital_component = taxable_ordinary_capital_gain + \
+        taxable_preferential_capital_gain
+
+    gross_income = (
+        wages +
+        interest_income +
+        ordinary_dividends +
+        qualified_dividends +
+        gross_income_capital_component +
+        self_employment_income +
+        foreign_income
+    )
+
+    se_tax_total, se_ss_tax, se_medicare_tax = calculate_self_employment_tax_batch(
+        self_employment_income,
+        w2_social_security_wages,
+        tax_year,
+    )
+    se_deduction = se_tax_total / 2
+
+    agi = gross_income - se_deduction
+
+    standard_deduction = rates['standard_deduction']
+    total_deductions = np.maximum(standard_deduction, itemized_deductions)
+
+    taxable_income = np.maximum(0, agi - total_deductions)
+
+    preferential_income = qualified_dividends + taxable_preferential_capital_gain
+    ordinary_taxable_income = np.maximum(0.0, taxable_income - preferential_income)
+
+    ordinary_tax, marginal_rate = calculate_tax_from_brackets_batch(
+        ordinary_taxable_income,
+        get_bracket_table('federal', tax_year, filing_status, rates['brackets']),
+    )
+
+    capital_gains_tax = calculate_capital_gains_tax_batch(
+        ordinary_taxable_income,
+        taxable_preferential_capital_gain,
+        qualified_dividends,
+        tax_year,
+        filing_status,
+    )
+
+    total_income_tax = ordinary_tax + capital_gains_tax
+
+    medicare_threshold = SE_ADDITIONAL_MEDICARE_THRESHOLD_JOINT if filing_status == 'joint' else SE_ADDITIONAL_MEDICARE_THRESHOLD_SINGLE
+    subject_wages = np.maximum(wages, w2_medicare_wages) + self_employment_income
+    additional_medicare_tax = np.where(
+        subject_wages > medicare_threshold,
+        (subject_wages - medicare_threshold) * SE_TAX_RATE_ADDITIONAL_MEDICARE,
+        0.0)
+
+    total_federal_tax = total_income_tax + se_tax_total + additional_medicare_tax
+
+    niit_threshold = 250000.0 if filing_status == 'joint' else 200000.0
+    net_investment_income = interest_income + ordinary_dividends + qualified_dividends + gross_income_capital_component
+    net_investment_income_tax = np.where(
+        (agi > niit_threshold) & (net_investment_income > 0),
+        np.minimum(net_investment_income, agi - niit_threshold) * 0.038,
+        0.0)
+
+    total_federal_tax = total_federal_tax + net_investment_income_tax
+
+    positive_income = gross_income > 0
+    effective_rate = np.where(
+        positive_income,
+        total_federal_tax / np.where(positive_income, gross_income, 1.0) * 100,
+        0.0)
+
+    return {
+        'wages': wages,
+        'interest_income': interest_income,
+        'ordinary_dividends': ordinary_dividends,
+        'qualified_dividends': qualified_dividends,
+        'total_ordinary_dividends': ordinary_dividends + qualified_dividends,
+        'capital_gains': gross_income_capital_component,
+        'total_income': gross_income,
+        'adjusted_gross_income': agi,
+        'gross_income': gross_income,
+        'standard_deduction': np.full_like(wages, standard_deduction),
+        'itemized_deductions': itemized_deductions,
+        'foreign_income': foreign_income,
+        'taxable_income': taxable_income,
+        'ordinary_income_tax': ordinary_tax,
+        'capital_gains_tax': capital_gains_tax,
+        'self_employment_tax': se_tax_total,
+        'additional_medicare_tax': additional_medicare_tax,
+        'net_investment_income_tax': net_investment_income_tax,
+        'total_federal_tax': total_federal_tax,
+        'effective_rate': effective_rate,
+        'marginal_rate': marginal_rate * 100,
+        'additional_medicare_withholding': additional_medicare_withholding,
+    }
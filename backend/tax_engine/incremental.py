@@ -0,0 +1,255 @@
+"""
+Incremental Tax Calculator
+
+Models calculate_taxes as a dependency graph of return lines (inputs, AGI,
+taxable income, capital gains worksheet, SE tax, state tax, bottom line) so
+that after an edit only the lines depending on the changed fields are
+recomputed. Used by the live-editing UI, where each keystroke changes a
+single field.
+"""
+
+from typing import Any, Callable, Iterable, NamedTuple
+from .calculator import (
+    TaxInput,
+    TaxSummary,
+    TAX_INPUT_DEFAULTS,
+    assemble_summary,
+    bottom_line,
+    calculate_state_tax,
+    read_tax_input,
+    state_input,
+    summarize_income,
+    total_federal_withholding,
+)
+from .federal import (
+    assemble_federal_result,
+    calculate_additional_medicare_tax,
+    calculate_additional_medicare_withholding,
+    calculate_adjusted_gross_income,
+    calculate_capital_gains_tax,
+    calculate_net_investment_income_tax,
+    calculate_ordinary_income_tax,
+    calculate_self_employment_tax,
+    calculate_taxable_income,
+    net_capital_gains,
+)
+from .utils import DETAIL_BREAKDOWN, DETAIL_LEVELS, DETAIL_TOTALS
+
+
+class Node(NamedTuple):
+    """A line of the return and the inputs or lines it is computed from."""
+    name: str
+    depends_on: tuple[str, ...]
+    # compute(values, lines, detail) -> line value
+    compute: Callable[[dict, dict, str], Any]
+
+
+def _non_qualified_dividends(v):
+    return v['ordinary_dividends'] - v['qualified_dividends']
+
+
+def _federal_long_term_gains(v):
+    return v['long_term_gains'] + v['capital_gain_distributions']
+
+
+# Listed in dependency order: every node only depends on input fields and
+# on nodes listed before it.
+NODES = (
+    Node('income_totals',
+         ('w2_wages', 'interest_income', 'ordinary_dividends',
+          'short_term_gains', 'long_term_gains', 'capital_gain_distributions',
+          'self_employment_income'),
+         lambda v, n, d: summarize_income(v)),
+    Node('additional_medicare_withholding',
+         ('w2_medicare_wages', 'w2_medicare_tax'),
+         lambda v, n, d: calculate_additional_medicare_withholding(
+             v['w2_medicare_wages'], v['w2_medicare_tax'])),
+    Node('capital_gains',
+         ('short_term_gains', 'long_term_gains', 'capital_gain_distributions'),
+         lambda v, n, d: net_capital_gains(
+             v['short_term_gains'], _federal_long_term_gains(v))),
+    Node('self_employment_tax',
+         ('self_employment_income', 'w2_social_security_wages', 'tax_year'),
+         lambda v, n, d: calculate_self_employment_tax(
+             v['self_employment_income'], v['w2_social_security_wages'], v['tax_year'])),
+    Node('adjusted_gross_income',
+         ('w2_wages', 'interest_income', 'ordinary_dividends', 'qualified_dividends',
+          'self_employment_income', 'foreign_income', 'capital_gains',
+          'self_employment_tax'),
+         lambda v, n, d: calculate_adjusted_gross_income(
+             v['w2_wages'],
+             v['interest_income'],
+             _non_qualified_dividends(v),
+             v['qualified_dividends'],
+             n['capital_gains'][0] + n['capital_gains'][1],
+             v['self_employment_income'],
+             v['foreign_income'],
+             n['self_employment_tax'][0])),
+    Node('taxable_income',
+         ('adjusted_gross_income', 'itemized_deductions', 'qualified_dividends',
+          'capital_gains', 'tax_year', 'filing_status'),
+         lambda v, n, d: calculate_taxable_income(
+             n['adjusted_gross_income'][1],
+             v['itemized_deductions'],
+             v['qualified_dividends'] + n['capital_gains'][1],
+             v['tax_year'],
+             v['filing_status'])),
+    Node('ordinary_income_tax',
+         ('taxable_income', 'tax_year', 'filing_status'),
+         lambda v, n, d: calculate_ordinary_income_tax(
+             n['taxable_income'][3],
+             v['tax_year'],
+             v['filing_status'],
+             include_breakdown=d != DETAIL_TOTALS)),
+    Node('capital_gains_tax',
+         ('taxable_income', 'capital_gains', 'qualified_dividends',
+          'tax_year', 'filing_status'),
+         lambda v, n, d: calculate_capital_gains_tax(
+             n['taxable_income'][3],
+             n['capital_gains'][1],
+             v['qualified_dividends'],
+             v['tax_year'],
+             v['filing_status'])),
+    Node('additional_medicare_tax',
+         ('w2_wages', 'w2_medicare_wages', 'self_employment_income', 'filing_status'),
+         lambda v, n, d: calculate_additional_medicare_tax(
+             v['w2_wages'], v['w2_medicare_wages'],
+             v['self_employment_income'], v['filing_status'])),
+    Node('net_investment_income',
+         ('interest_income', 'ordinary_dividends', 'qualified_dividends',
+          'capital_gains'),
+         lambda v, n, d: v['interest_income'] + _non_qualified_dividends(v) +
+         v['qualified_dividends'] + (n['capital_gains'][0] + n['capital_gains'][1])),
+    Node('net_investment_income_tax',
+         ('adjusted_gross_income', 'net_investment_income', 'filing_status'),
+         lambda v, n, d: calculate_net_investment_income_tax(
+             n['adjusted_gross_income'][1],
+             n['net_investment_income'],
+             v['filing_status'])),
+    Node('federal',
+         ('w2_wages', 'filing_status', 'interest_income', 'ordinary_dividends',
+          'qualified_dividends', 'itemized_deductions', 'foreign_income',
+          'capital_gains', 'self_employment_tax', 'adjusted_gross_income',
+          'taxable_income', 'ordinary_income_tax', 'capital_gains_tax',
+          'additional_medicare_tax', 'net_investment_income',
+          'net_investment_income_tax', 'additional_medicare_withholding'),
+         lambda v, n, d: assemble_federal_result(
+             wages=v['w2_wages'],
+             filing_status=v['filing_status'],
+             interest_income=v['interest_income'],
+             ordinary_dividends=_non_qualified_dividends(v),
+             qualified_dividends=v['qualified_dividends'],
+             itemized_deductions=v['itemized_deductions'],
+             foreign_income=v['foreign_income'],
+             capital_gains=n['capital_gains'],
+             self_employment=n['self_employment_tax'],
+             income=n['adjusted_gross_income'],
+             deductions=n['taxable_income'],
+             ordinary_income_tax=n['ordinary_income_tax'],
+             capital_gains_tax=n['capital_gains_tax'],
+             additional_medicare=n['additional_medicare_tax'],
+             net_investment_income=n['net_investment_income'],
+             niit=n['net_investment_income_tax'],
+             additional_medicare_withholding=n['additional_medicare_withholding'],
+             detail=d)),
+    Node('state',
+         ('state', 'w2_wages', 'interest_income', 'ordinary_dividends',
+          'self_employment_income', 'tax_year', 'filing_status',
+          'income_totals', 'adjusted_gross_income', 'taxable_income'),
+         lambda v, n, d: calculate_state_tax(
+             v['state'],
+             state_input(
+                 v,
+                 n['income_totals']['total_capital_gains'],
+                 n['adjusted_gross_income'][1],
+                 n['taxable_income'][2]),
+             d)),
+    Node('total_federal_withheld',
+         ('w2_federal_withheld', 'interest_federal_withheld',
+          'dividend_federal_withheld', 'self_employment_federal_withheld',
+          'estimated_tax_payments', 'other_withholding',
+          'additional_medicare_withholding'),
+         lambda v, n, d: total_federal_withholding(
+             v, n['additional_medicare_withholding'])),
+    Node('bottom_line',
+         ('federal', 'state', 'total_federal_withheld', 'w2_state_withheld'),
+         lambda v, n, d: bottom_line(
+             n['federal']['total_federal_tax'],
+             n['state']['total_california_tax'],
+             n['total_federal_withheld'],
+             v['w2_state_withheld'])),
+    Node('summary',
+         ('income_totals', 'federal', 'state', 'total_federal_withheld',
+          'bottom_line', 'tax_exempt_interest', 'w2_state_withheld',
+          'estimated_tax_payments', 'other_withholding', 'tax_year', 'state',
+          'ordinary_dividends', 'qualified_dividends', 'w2_medicare_wages',
+          'w2_medicare_tax'),
+         lambda v, n, d: assemble_summary(
+             v, n['income_totals'], n['federal'], n['state'],
+             n['total_federal_withheld'], n['bottom_line'], d)),
+)
+
+
+def _dependents(nodes: Iterable[Node]) -> dict[str, tuple[str, ...]]:
+    """Map each input field or node name to the nodes reading it directly."""
+    dependents: dict[str, list[str]] = {}
+    for node in nodes:
+        for name in node.depends_on:
+            dependents.setdefault(name, []).append(node.name)
+    return {name: tuple(names) for name, names in dependents.items()}
+
+
+DEPENDENTS = _dependents(NODES)
+
+
+class IncrementalCalculator:
+    """
+    calculate_taxes that keeps every intermediate line between calls.
+
+    update() applies changed input fields and recomputes only the nodes
+    downstream of them. A recomputed node whose value did not change does
+    not invalidate its own dependents. Results equal calculate_taxes on
+    the merged input; they share unchanged sub-dicts with earlier results
+    and must not be modified.
+    """
+
+    def __init__(self, tax_input: TaxInput, detail: str = DETAIL_BREAKDOWN):
+        if detail not in DETAIL_LEVELS:
+            raise ValueError(
+                f"Unknown detail level {detail!r}, expected one of {DETAIL_LEVELS}")
+        self.detail = detail
+        self.values = read_tax_input(tax_input)
+        self.lines: dict[str, Any] = {}
+        for node in NODES:
+            self.lines[node.name] = node.compute(self.values, self.lines, detail)
+        self.last_recomputed = tuple(node.name for node in NODES)
+
+    @property
+    def result(self) -> TaxSummary:
+        return self.lines['summary']
+
+    def update(self, changes: TaxInput) -> TaxSummary:
+        """
+        Apply changed input fields and return the new summary.
+
+        Fields calculate_taxes does not read are ignored. The names of the
+        nodes that were recomputed are left in last_recomputed.
+        """
+        dirty = set()
+        for field, value in changes.items():
+            if field in TAX_INPUT_DEFAULTS and self.values[field] != value:
+                self.values[field] = value
+                dirty.update(DEPENDENTS.get(field, ()))
+
+        recomputed = []
+        for node in NODES:
+            if node.name not in dirty:
+                continue
+            value = node.compute(self.values, self.lines, self.detail)
+            recomputed.append(node.name)
+            if value != self.lines[node.name]:
+                self.lines[node.name] = value
+                dirty.update(DEPENDENTS.get(node.name, ()))
+
+        self.last_recomputed = tuple(recomputed)
+        return self.result
@@ -16,21 +16,21 @@ class StateTaxRegistry:
         cls._instances[state_code] = calc
         return calc
 
+    @classmethod
+    def clear(cls):
+        """Drop cached calculators so they are rebuilt from current tables."""
+        cls._instances.clear()
+
     @staticmethod
     def _create_calculator(state_code: str) -> StateTaxCalculator:
         if state_code == 'CA':
             from .states.california import CaliforniaStateCalculator
             return CaliforniaStateCalculator()
 
+        from .states.generic import GenericStateCalculator, no_income_tax_table
         try:
-            from .states.generic import GenericStateCalculator
             return GenericStateCalculator(state_code)
         except ValueError:
             # Fallback for states completely missing from states.json (prevent breakage)
             # Default to no income tax representation
-            from .states.generic import GenericStateCalculator
-            # Temporarily inject a blank config so the generic calculator works without raising ValueError
-            calc = GenericStateCalculator.__new__(GenericStateCalculator)
-            calc.state_code = state_code
-            calc.state_data = {"name": state_code, "has_income_tax": False}
-            return calc
+            return GenericStateCalculator(state_code, no_income_tax_table(state_code))
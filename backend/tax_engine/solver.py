@@ -0,0 +1,249 @@
+"""
+Inverse Solver
+
+Finds the value of one input field at which an output reaches a target,
+e.g. the long-term gains that can be realized before the marginal rate
+reaches 32% or the withholding that brings amount_owed to zero.
+
+Candidate points (bracket and threshold edges plus an even grid) are
+evaluated in one batched pass to bracket the first crossing; the crossing
+is then refined with Illinois false position, falling back to bisection,
+over the scalar engine.
+"""
+
+from typing import TypedDict
+import numpy as np
+from .batch import calculate_taxes_batch
+from .cache import LRUCache, canonicalize_input, input_key
+from .calculator import calculate_taxes, TaxInput, TAX_INPUT_DEFAULTS
+from .federal import (
+    TAX_RATES,
+    SE_ADDITIONAL_MEDICARE_THRESHOLD_JOINT,
+    SE_ADDITIONAL_MEDICARE_THRESHOLD_SINGLE,
+    check_tax_year,
+)
+from .sweep import select_output
+from .utils import DETAIL_TOTALS, tax_tables_version
+
+# Default search interval for the variable field
+DEFAULT_LOWER_BOUND = 0.0
+DEFAULT_UPPER_BOUND = 10_000_000.0
+
+# Evenly spaced points evaluated alongside the bracket edges
+GRID_POINTS = 64
+
+# Refinement steps before giving up on reaching the tolerance
+MAX_ITERATIONS = 100
+
+# Maximum number of memoized solutions
+SOLUTION_CACHE_SIZE = 1024
+
+# Income fields whose sum moves the return through the brackets
+INCOME_FIELDS = (
+    'w2_wages',
+    'interest_income',
+    'ordinary_dividends',
+    'short_term_gains',
+    'long_term_gains',
+    'capital_gain_distributions',
+    'self_employment_income',
+    'foreign_income',
+)
+
+
+class Solution(TypedDict):
+    """Result of an inverse solve."""
+    variable: str
+    output: str
+    target: float
+    value: float  # variable value at which output reaches target
+    achieved: float  # output at value
+    evaluations: int  # returns calculated, batched candidates included
+
+
+def _candidate_points(canonical: dict, variable: str, lower: float, upper: float) -> np.ndarray:
+    """
+    Points at which the outputs may change slope, plus an even grid.
+
+    Bracket limits apply to taxable income, so each federal threshold is
+    also mapped to the variable value putting the return at it, given the
+    rest of the return's income and the standard deduction.
+    """
+    year_rates = TAX_RATES[canonical['tax_year']]
+    rates = year_rates.get(canonical['filing_status'], year_rates['single'])
+    thresholds = [
+        limit for limit, _ in rates['brackets'] + rates['ltcg_brackets']
+        if limit != float('inf')
+    ]
+    thresholds += [
+        SE_ADDITIONAL_MEDICARE_THRESHOLD_SINGLE,
+        SE_ADDITIONAL_MEDICARE_THRESHOLD_JOINT,
+        year_rates['ss_wage_base'],
+    ]
+
+    other_income = sum(
+        canonical[field] for field in INCOME_FIELDS if field != variable)
+    deduction = max(rates['standard_deduction'], canonical['itemized_deductions'])
+    edges = np.asarray(thresholds, dtype=float)
+    points = np.concatenate([
+        np.linspace(lower, upper, GRID_POINTS + 1),
+        edges,
+        edges + deduction - other_income,
+    ])
+    points = points[(points >= lower) & (points <= upper)]
+    return np.unique(points)
+
+
+def _solve(
+        canonical: dict,
+        variable: str,
+        output: str,
+        target: float,
+        lower: float,
+        upper: float,
+        tolerance: float) -> Solution:
+    candidates = _candidate_points(canonical, variable, lower, upper)
+
+    columns = {
+        field: np.full(len(candidates), value)
+        for field, value in canonical.items() if field != variable
+    }
+    columns[variable] = candidates
+    residual = np.asarray(
+        select_output(calculate_taxes_batch(columns), output), dtype=float) - target
+    evaluations = len(candidates)
+
+    # Look for the first candidate on the other side of the target from
+    # the lower bound; landing exactly on the target counts as reaching it
+    if residual[0] == 0:
+        return _solution(variable, output, target, lower, target, evaluations)
+    rising = residual[0] < 0
+    reached = residual >= 0 if rising else residual <= 0
+    crossings = np.flatnonzero(reached)
+    if len(crossings) == 0:
+        raise ValueError(
+            f"{output} does not reach {target} for {variable} "
+            f"between {lower} and {upper}")
+
+    i = crossings[0]
+    a, b = float(candidates[i - 1]), float(candidates[i])
+    fa, fb = float(residual[i - 1]), float(residual[i])
+
+    def evaluate(x):
+        summary = calculate_taxes({**canonical, variable: x}, DETAIL_TOTALS)
+        return float(select_output(summary, output)) - target
+
+    def reaches(r):
+        return r >= 0 if rising else r <= 0
+
+    # Illinois false position: a stays short of the target, b reaches it.
+    # The weights halve the residual of an endpoint retained twice in a row.
+    weight_a = weight_b = 1.0
+    last_replaced = None
+    interpolate = True
+    for _ in range(MAX_ITERATIONS):
+        if b - a <= tolerance:
+            break
+        if interpolate and abs(fb) <= tolerance:
+            # b is within tolerance of the target; check that a slightly
+            # smaller value does not reach it too
+            x = b - tolerance
+            fx = evaluate(x)
+            evaluations += 1
+            if not reaches(fx):
+                a, fa = x, fx
+                break
+            # Output is flat at the target (a step function such as the
+            # marginal rate): bisect towards the edge of the step instead
+            interpolate = False
+            b, fb = x, fx
+            continue
+
+        x = (a + b) / 2
+        if interpolate:
+            secant = b - weight_b * fb * (b - a) / (weight_b * fb - weight_a * fa)
+            if a < secant < b:
+                x = secant
+        fx = evaluate(x)
+        evaluations += 1
+
+        if reaches(fx):
+            b, fb, weight_b = x, fx, 1.0
+            if last_replaced == 'b':
+                weight_a /= 2
+            last_replaced = 'b'
+        else:
+            a, fa, weight_a = x, fx, 1.0
+            if last_replaced == 'a':
+                weight_b /= 2
+            last_replaced = 'a'
+
+    return _solution(variable, output, target, b, fb + target, evaluations)
+
+
+def _solution(variable, output, target, value, achieved, evaluations) -> Solution:
+    return {
+        'variable': variable,
+        'output': output,
+        'target': target,
+        'value': value,
+        'achieved': achieved,
+        'evaluations': evaluations,
+    }
+
+
+_solution_cache = LRUCache(SOLUTION_CACHE_SIZE, version=tax_tables_version)
+
+
+def solve(
+        base_input: TaxInput,
+        variable: str,
+        output: str,
+        target: float,
+        lower: float = DEFAULT_LOWER_BOUND,
+        upper: float = DEFAULT_UPPER_BOUND,
+        tolerance: float = 0.01) -> Solution:
+    """
+    Find the smallest value of variable in [lower, upper] at which output
+    reaches target.
+
+    Args:
+        base_input: Return supplying every other field; its own value of
+            variable is ignored
+        variable: Numeric TaxInput field to solve for
+        output: TaxSummary key, dotted for nested values such as
+            'federal.marginal_rate'
+        target: Output value to reach, in the output's own units
+        tolerance: Stop once the variable is pinned to within this width
+            or the output is within this distance of the target
+
+    Returns:
+        Solution; solutions are memoized per base return and must not be
+        modified.
+
+    Raises:
+        ValueError: variable is not a numeric field, the tax year is not
+            supported, the bounds are invalid, or output never reaches
+            target within them
+    """
+    if not isinstance(TAX_INPUT_DEFAULTS.get(variable), float):
+        raise ValueError(f"Cannot solve for {variable!r}: not a numeric input field")
+    if not lower < upper:
+        raise ValueError(f"Lower bound {lower} must be below upper bound {upper}")
+    if tolerance <= 0:
+        raise ValueError("tolerance must be positive")
+
+    canonical = canonicalize_input(base_input)
+    check_tax_year(canonical['tax_year'])
+    canonical[variable] = 0.0
+    key = (input_key(canonical), variable, output,
+           float(target), float(lower), float(upper), float(tolerance))
+    return _solution_cache.get_or_compute(
+        key,
+        lambda: _solve(canonical, variable, output, float(target),
+                       float(lower), float(upper), float(tolerance)))
+
+
+def solution_cache_stats() -> dict:
+    """Hit, miss and eviction counters of the solution cache."""
+    return _solution_cache.stats()
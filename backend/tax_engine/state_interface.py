@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, TypedDict, List
+import numpy as np
+from .utils import DETAIL_BREAKDOWN
 
 
 class StateTaxResult(TypedDict):
@@ -33,10 +35,51 @@ class StateTaxCalculator(ABC):
     """Abstract base class for state tax implementations."""
 
     @abstractmethod
-    def calculate(self, tax_input: StateTaxInput) -> StateTaxResult:
-        """Calculate tax liability for the state."""
+    def calculate(
+            self,
+            tax_input: StateTaxInput,
+            detail: str = DETAIL_BREAKDOWN) -> StateTaxResult:
+        """
+        Calculate tax liability for the state.
+
+        detail follows calculate_taxes: 'totals' leaves bracket_breakdown
+        empty, 'trace' adds intermediate values under 'trace'.
+        """
         pass
 
+    def calculate_batch(
+            self,
+            tax_input: Dict[str, np.ndarray],
+            tax_year: int,
+            filing_status: str) -> Dict[str, np.ndarray]:
+        """
+        Calculate tax liability for many returns sharing a tax year and
+        filing status.
+
+        tax_input maps StateTaxInput numeric fields to equal-length arrays.
+        Returns the numeric StateTaxResult fields as arrays. The default
+        implementation loops over calculate(); states override it with a
+        vectorized kernel.
+        """
+        length = len(next(iter(tax_input.values())))
+        rows = []
+        for i in range(length):
+            row = {key: float(values[i]) for key, values in tax_input.items()}
+            row['tax_year'] = tax_year
+            row['filing_status'] = filing_status
+            rows.append(self.calculate(row))
+
+        if not rows:
+            return {}
+        numeric_keys = [
+            key for key, value in rows[0].items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        ]
+        return {
+            key: np.array([row[key] for row in rows], dtype=float)
+            for key in numeric_keys
+        }
+
     @abstractmethod
     def get_standard_deduction(
             self,
@@ -6,7 +6,15 @@ Implements California state income tax calculation.
 
 from ..state_interface import StateTaxCalculator, StateTaxInput, StateTaxResult
 from typing import TypedDict
-from ..utils import calculate_tax_from_brackets
+import numpy as np
+from ..utils import (
+    calculate_tax_from_brackets,
+    calculate_tax_from_brackets_batch,
+    get_bracket_table,
+    DETAIL_BREAKDOWN,
+    DETAIL_TOTALS,
+    DETAIL_TRACE,
+)
 
 
 class CaliforniaTaxResult(TypedDict):
@@ -107,6 +115,7 @@ def calculate_california_tax(
     self_employment_income: float = 0.0,
     tax_year: int = DEFAULT_TAX_YEAR,
     filing_status: str = 'single',
+    detail: str = DETAIL_BREAKDOWN,
 ) -> CaliforniaTaxResult:
     """
     Calculate California state tax liability.
@@ -121,6 +130,8 @@ def calculate_california_tax(
         self_employment_income: 1099-NEC income
         tax_year: The tax year (2024 or 2025)
         filing_status: 'single' or 'joint'
+        detail: 'totals' skips the bracket breakdown, 'trace' adds the
+            intermediate values under 'trace'
 
     Returns:
         CaliforniaTaxResult with complete tax breakdown
@@ -145,7 +156,8 @@ def calculate_california_tax(
     # Calculate state tax using brackets
     state_tax, marginal_rate, bracket_breakdown = calculate_tax_from_brackets(
         taxable_income,
-        rates['brackets'],
+        get_bracket_table('CA', tax_year, filing_status, rates['brackets']),
+        include_breakdown=detail != DETAIL_TOTALS,
     )
 
     # Mental Health Services Tax (1% on income over $1M)
@@ -163,7 +175,7 @@ def calculate_california_tax(
         gross_income *
         100) if gross_income > 0 else 0.0
 
-    return {
+    result = {
         'gross_income': gross_income,
         'standard_deduction': standard_deduction,
         'taxable_income': taxable_income,
@@ -175,9 +187,81 @@ def calculate_california_tax(
         'bracket_breakdown': bracket_breakdown,
     }
 
+    if detail == DETAIL_TRACE:
+        result['trace'] = {
+            'tax_year': tax_year,
+            'filing_status': filing_status,
+            'mental_health_threshold': CA_MENTAL_HEALTH_THRESHOLD,
+        }
+
+    return result
+
+
+def calculate_california_tax_batch(
+    wages: np.ndarray,
+    interest_income: np.ndarray,
+    dividend_income: np.ndarray,
+    capital_gains: np.ndarray,
+    self_employment_income: np.ndarray,
+    tax_year: int = DEFAULT_TAX_YEAR,
+    filing_status: str = 'single',
+) -> dict[str, np.ndarray]:
+    """
+    Vectorized calculate_california_tax over equal-length input arrays.
+
+    Returns the numeric CaliforniaTaxResult fields as arrays (no
+    bracket_breakdown).
+    """
+    rates = CA_TAX_RATES[tax_year][filing_status]
+
+    gross_income = (
+        wages +
+        interest_income +
+        dividend_income +
+        capital_gains +
+        self_employment_income
+    )
+
+    standard_deduction = rates['standard_deduction']
+    taxable_income = np.maximum(0, gross_income - standard_deduction)
+
+    state_tax, marginal_rate = calculate_tax_from_brackets_batch(
+        taxable_income,
+        get_bracket_table('CA', tax_year, filing_status, rates['brackets']),
+    )
+
+    mental_health_surcharge = np.where(
+        taxable_income > CA_MENTAL_HEALTH_THRESHOLD,
+        (taxable_income - CA_MENTAL_HEALTH_THRESHOLD) * CA_MENTAL_HEALTH_RATE,
+        0.0)
+
+    total_california_tax = state_tax + mental_health_surcharge
+
+    positive_income = gross_income > 0
+    effective_rate = np.where(
+        positive_income,
+        total_california_tax /
+        np.where(positive_income, gross_income, 1.0) *
+        100,
+        0.0)
+
+    return {
+        'gross_income': gross_income,
+        'standard_deduction': np.full_like(gross_income, standard_deduction),
+        'taxable_income': taxable_income,
+        'state_tax': state_tax,
+        'mental_health_surcharge': mental_health_surcharge,
+        'total_california_tax': total_california_tax,
+        'effective_rate': effective_rate,
+        'marginal_rate': marginal_rate * 100,
+    }
+
 
 class CaliforniaStateCalculator(StateTaxCalculator):
-    def calculate(self, tax_input: StateTaxInput) -> StateTaxResult:
+    def calculate(
+            self,
+            tax_input: StateTaxInput,
+            detail: str = DETAIL_BREAKDOWN) -> StateTaxResult:
         # Call Existing Logic
         res = calculate_california_tax(
             wages=tax_input.get(
@@ -187,10 +271,11 @@ class CaliforniaStateCalculator(StateTaxCalculator):
                     'capital_gains', 0.0), self_employment_income=tax_input.get(
                         'self_employment_income', 0.0), tax_year=tax_input.get(
                             'tax_year', 2024), filing_status=tax_input.get(
-                                'filing_status', 'single'))
+                                'filing_status', 'single'),
+            detail=detail)
 
         # Map to Generic Result
-        return {
+        result = {
             "total_taxable_income": res['taxable_income'],
             "total_state_tax": res['total_california_tax'],
             "standard_deduction": res['standard_deduction'],
@@ -206,6 +291,34 @@ class CaliforniaStateCalculator(StateTaxCalculator):
             "marginal_rate": res['marginal_rate'],
             "exemption_credit": 0.0
         }
+        if 'trace' in res:
+            result['trace'] = res['trace']
+        return result
+
+    def calculate_batch(self, tax_input, tax_year, filing_status):
+        res = calculate_california_tax_batch(
+            wages=tax_input['wages'],
+            interest_income=tax_input['interest_income'],
+            dividend_income=tax_input['dividend_income'],
+            capital_gains=tax_input['capital_gains'],
+            self_employment_income=tax_input['self_employment_income'],
+            tax_year=tax_year,
+            filing_status=filing_status)
+
+        return {
+            "total_taxable_income": res['taxable_income'],
+            "total_state_tax": res['total_california_tax'],
+            "standard_deduction": res['standard_deduction'],
+            "gross_income": res['gross_income'],
+            "taxable_income": res['taxable_income'],
+            "state_tax": res['state_tax'],
+            "mental_health_surcharge": res['mental_health_surcharge'],
+            "total_california_tax": res['total_california_tax'],
+            "mental_health_tax": res['mental_health_surcharge'],
+            "effective_rate": res['effective_rate'],
+            "marginal_rate": res['marginal_rate'],
+            "exemption_credit": np.zeros_like(res['gross_income']),
+        }
 
     def get_standard_deduction(
             self,
@@ -1,39 +1,146 @@
 import json
 import os
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+import numpy as np
 from ..state_interface import StateTaxCalculator, StateTaxInput, StateTaxResult
-from ..utils import calculate_tax_from_brackets
+from ..utils import (
+    BracketTable,
+    calculate_tax_from_brackets,
+    calculate_tax_from_brackets_batch,
+    compile_brackets,
+    invalidate_tax_tables,
+    DETAIL_BREAKDOWN,
+    DETAIL_TOTALS,
+    DETAIL_TRACE,
+)
 
 # Load states.json once when module is imported
 DATA_DIR = os.path.dirname(os.path.dirname(__file__))
 STATES_FILE = os.path.join(DATA_DIR, 'data', 'states.json')
 
+# Year whose rates are used for tax years missing from states.json
+FALLBACK_TAX_YEAR = 2024
+
 with open(STATES_FILE, 'r') as f:
     STATES_DATA = json.load(f)
 
+
+class StateRates(NamedTuple):
+    """Compiled rates for one state, tax year and filing status."""
+    tax_year: int  # Year the rates were taken from
+    standard_deduction: float
+    brackets: BracketTable
+
+
+class StateTable(NamedTuple):
+    """A states.json entry compiled into immutable lookup tables."""
+    code: str
+    name: str
+    has_income_tax: bool
+    notes: str
+    # tax_year -> filing_status -> rates; every year also has 'single'
+    years: Mapping[int, Mapping[str, StateRates]]
+    # Rates used for tax years not in years
+    fallback: Mapping[str, StateRates]
+
+    def rates_for(self, tax_year: int, filing_status: str) -> StateRates:
+        """Rates for a year and filing status, falling back to single."""
+        year = self.years.get(tax_year, self.fallback)
+        return year.get(filing_status, year['single'])
+
+
+def _compile_year(tax_year: int, year_data: dict) -> Mapping[str, StateRates]:
+    std_deduction_map = year_data.get('std_deduction', {})
+    brackets_map = year_data.get('brackets', {})
+
+    # Deductions and brackets each fall back to the single values
+    statuses = {'single', 'joint', *std_deduction_map, *brackets_map}
+    return MappingProxyType({
+        status: StateRates(
+            tax_year,
+            float(std_deduction_map.get(status, std_deduction_map.get('single', 0.0))),
+            compile_brackets(brackets_map.get(status, brackets_map.get('single', []))),
+        )
+        for status in statuses
+    })
+
+
+def compile_state_table(state_code: str, state_data: dict) -> StateTable:
+    """Compile one states.json entry, resolving every fallback up front."""
+    name = state_data.get('name', state_code)
+    has_income_tax = state_data.get('has_income_tax', False)
+    notes = state_data.get('notes', f"{name} has no state income tax.")
+
+    years = {}
+    if has_income_tax:
+        years = {
+            int(year): _compile_year(int(year), year_data)
+            for year, year_data in state_data.items() if year.isdigit()
+        }
+        if FALLBACK_TAX_YEAR not in years:
+            years[FALLBACK_TAX_YEAR] = _compile_year(FALLBACK_TAX_YEAR, {})
+
+    return StateTable(
+        code=state_code,
+        name=name,
+        has_income_tax=has_income_tax,
+        notes=notes,
+        years=MappingProxyType(years),
+        fallback=years.get(FALLBACK_TAX_YEAR, MappingProxyType({})),
+    )
+
+
+def no_income_tax_table(state_code: str) -> StateTable:
+    """Table for a state missing from states.json: no income tax."""
+    return compile_state_table(state_code, {"name": state_code, "has_income_tax": False})
+
+
+def compile_state_tables(states_data: dict) -> Mapping[str, StateTable]:
+    return MappingProxyType({
+        code.upper(): compile_state_table(code.upper(), state_data)
+        for code, state_data in states_data.items()
+    })
+
+
+STATE_TABLES = compile_state_tables(STATES_DATA)
+
+
+def reload_states(path: str = STATES_FILE):
+    """
+    Re-read states.json and recompile the state tables.
+
+    Cached calculators and memoized results computed from the old tables
+    are dropped.
+    """
+    global STATES_DATA, STATE_TABLES
+    from ..registry import StateTaxRegistry
+
+    with open(path, 'r') as f:
+        STATES_DATA = json.load(f)
+    STATE_TABLES = compile_state_tables(STATES_DATA)
+    StateTaxRegistry.clear()
+    invalidate_tax_tables()
+
+
 class GenericStateCalculator(StateTaxCalculator):
-    def __init__(self, state_code: str):
+    def __init__(self, state_code: str, table: StateTable = None):
         self.state_code = state_code.upper()
-        self.state_data = STATES_DATA.get(self.state_code)
-        if not self.state_data:
+        self.table = table or STATE_TABLES.get(self.state_code)
+        if not self.table:
             raise ValueError(f"State code {self.state_code} not found in states.json")
 
-    def calculate(self, tax_input: StateTaxInput) -> StateTaxResult:
-        has_income_tax = self.state_data.get('has_income_tax', False)
-        if not has_income_tax:
-            return self._calculate_no_tax(tax_input)
-
-        tax_year = tax_input.get('tax_year', 2024)
-        year_str = str(tax_year)
+    def calculate(self, tax_input: StateTaxInput, detail: str = DETAIL_BREAKDOWN) -> StateTaxResult:
+        if not self.table.has_income_tax:
+            return self._calculate_no_tax(tax_input, detail)
 
-        # Fallback to 2024 if year not found
-        if year_str not in self.state_data:
-            year_str = "2024"
-
-        year_data = self.state_data.get(year_str, {})
+        filing_status = tax_input.get('filing_status', 'single')
+        rates = self.table.rates_for(tax_input.get('tax_year', 2024), filing_status)
 
         # Approximate AGI if not provided
         federal_agi = tax_input.get('federal_agi', 0.0)
-        if federal_agi == 0.0:
+        agi_approximated = federal_agi == 0.0
+        if agi_approximated:
             wages = tax_input.get('wages', 0.0)
             interest = tax_input.get('interest_income', 0.0)
             divs = tax_input.get('dividend_income', 0.0)
@@ -41,29 +148,13 @@ class GenericStateCalculator(StateTaxCalculator):
             se = tax_input.get('self_employment_income', 0.0)
             federal_agi = wages + interest + divs + caps + se
 
-        filing_status = tax_input.get('filing_status', 'single')
-
-        # Standard deduction
-        std_deduction_map = year_data.get('std_deduction', {})
-        std_deduction = std_deduction_map.get(filing_status, std_deduction_map.get('single', 0.0))
-
+        std_deduction = rates.standard_deduction
         taxable_income = max(0.0, federal_agi - std_deduction)
 
-        # Brackets
-        brackets_map = year_data.get('brackets', {})
-        raw_brackets = brackets_map.get(filing_status, brackets_map.get('single', []))
-
-        # Convert null to float('inf')
-        brackets = []
-        for upper, rate in raw_brackets:
-            if upper is None:
-                brackets.append((float('inf'), rate))
-            else:
-                brackets.append((float(upper), float(rate)))
-
-        tax, marginal, breakdown = calculate_tax_from_brackets(taxable_income, brackets)
+        tax, marginal, breakdown = calculate_tax_from_brackets(
+            taxable_income, rates.brackets, include_breakdown=detail != DETAIL_TOTALS)
 
-        return {
+        result = {
             "total_taxable_income": taxable_income,
             "total_state_tax": tax,
             "standard_deduction": std_deduction,
@@ -83,18 +174,89 @@ class GenericStateCalculator(StateTaxCalculator):
             "total_state_tax": tax
         }
 
-    def _calculate_no_tax(self, tax_input: StateTaxInput) -> StateTaxResult:
+        if detail == DETAIL_TRACE:
+            result['trace'] = {
+                'tax_year': rates.tax_year,
+                'filing_status': filing_status,
+                'federal_agi': federal_agi,
+                'agi_approximated': agi_approximated,
+            }
+
+        return result
+
+    def calculate_batch(self, tax_input, tax_year, filing_status):
+        federal_agi = tax_input.get('federal_agi', tax_input['wages'])
+        zeros = np.zeros_like(federal_agi)
+
+        if not self.table.has_income_tax:
+            return {
+                "total_taxable_income": zeros,
+                "total_state_tax": zeros,
+                "standard_deduction": zeros,
+                "exemption_credit": zeros,
+                "effective_rate": zeros,
+                "marginal_rate": zeros,
+                "mental_health_tax": zeros,
+                "gross_income": federal_agi,
+                "taxable_income": zeros,
+                "state_tax": zeros,
+                "mental_health_surcharge": zeros,
+                "total_california_tax": zeros,
+            }
+
+        rates = self.table.rates_for(tax_year, filing_status)
+
+        # Approximate AGI where not provided
+        approximate_agi = (
+            tax_input['wages'] +
+            tax_input['interest_income'] +
+            tax_input['dividend_income'] +
+            tax_input['capital_gains'] +
+            tax_input['self_employment_income']
+        )
+        federal_agi = np.where(federal_agi == 0.0, approximate_agi, federal_agi)
+
+        std_deduction = rates.standard_deduction
+        taxable_income = np.maximum(0.0, federal_agi - std_deduction)
+
+        tax, marginal = calculate_tax_from_brackets_batch(taxable_income, rates.brackets)
+
+        positive_agi = federal_agi > 0
+        effective_rate = np.where(
+            positive_agi,
+            tax / np.where(positive_agi, federal_agi, 1.0) * 100,
+            0.0)
+
+        return {
+            "total_taxable_income": taxable_income,
+            "total_state_tax": tax,
+            "standard_deduction": np.full_like(federal_agi, std_deduction),
+            "exemption_credit": zeros,
+            "effective_rate": effective_rate,
+            "marginal_rate": marginal,
+            "mental_health_tax": zeros,
+            "gross_income": federal_agi,
+            "taxable_income": taxable_income,
+            "state_tax": tax,
+            "mental_health_surcharge": zeros,
+            "total_california_tax": tax,
+        }
+
+    def _calculate_no_tax(self, tax_input: StateTaxInput, detail: str = DETAIL_BREAKDOWN) -> StateTaxResult:
         wages = tax_input.get('wages', 0.0)
         federal_agi = tax_input.get('federal_agi', wages)
-        notes = self.state_data.get('notes', f"{self.state_data['name']} has no state income tax.")
+
+        breakdown = []
+        if detail != DETAIL_TOTALS:
+            breakdown.append({"bracket": self.table.notes, "amount": 0.0, "rate": 0.0, "tax": 0.0})
 
         return {
             "total_taxable_income": 0.0,
             "total_state_tax": 0.0,
             "standard_deduction": 0.0,
             "exemption_credit": 0.0,
-            "bracket_breakdown": [{"bracket": notes, "amount": 0.0, "rate": 0.0, "tax": 0.0}],
-            "breakdown": [{"bracket": notes, "amount": 0.0, "rate": 0.0, "tax": 0.0}],
+            "bracket_breakdown": breakdown,
+            "breakdown": breakdown,  # Alias for compatibility
             "effective_rate": 0.0,
             "marginal_rate": 0.0,
             "mental_health_tax": 0.0,
@@ -107,13 +269,6 @@ class GenericStateCalculator(StateTaxCalculator):
         }
 
     def get_standard_deduction(self, filing_status: str, tax_year: int) -> float:
-        if not self.state_data.get('has_income_tax', False):
+        if not self.table.has_income_tax:
             return 0.0
-
-        year_str = str(tax_year)
-        if year_str not in self.state_data:
-            year_str = "2024"
-
-        year_data = self.state_data.get(year_str, {})
-        std_deduction_map = year_data.get('std_deduction', {})
-        return std_deduction_map.get(filing_status, std_deduction_map.get('single', 0.0))
+        return self.table.rates_for(tax_year, filing_status).standard_deduction
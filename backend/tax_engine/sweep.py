@@ -0,0 +1,112 @@
+"""
+Scenario Sweep
+
+Evaluates a base return over the cartesian grid of one or more input axes
+(e.g. wages x long-term gains x filing status) in a single batched pass
+and returns one dense array per requested output.
+"""
+
+from math import prod
+from typing import Mapping, Sequence
+import numpy as np
+from .batch import calculate_taxes_batch
+from .cache import canonicalize_input
+from .calculator import TaxInput, TAX_INPUT_DEFAULTS
+from .federal import check_filing_status, check_tax_year
+
+# Largest grid a single sweep may evaluate
+MAX_SWEEP_POINTS = 250_000
+
+DEFAULT_SWEEP_OUTPUTS = ('total_tax_liability', 'amount_owed')
+
+
+def _axis_values(field: str, values: Sequence) -> np.ndarray:
+    if field not in TAX_INPUT_DEFAULTS:
+        raise ValueError(f"Unknown sweep axis {field!r}")
+    if len(values) == 0:
+        raise ValueError(f"Sweep axis {field!r} has no values")
+
+    default = TAX_INPUT_DEFAULTS[field]
+    if isinstance(default, float):
+        return np.asarray(values, dtype=float)
+    if field == 'tax_year':
+        for year in values:
+            check_tax_year(year)
+        return np.asarray(values, dtype=np.int64)
+    values = [str(value) for value in values]
+    if field == 'filing_status':
+        for status in values:
+            check_filing_status(status)
+    return np.asarray(values)
+
+
+def select_output(result: dict, output: str):
+    """Look up an output such as 'amount_owed' or 'federal.marginal_rate'."""
+    column = result
+    for key in output.split('.'):
+        if not isinstance(column, dict) or key not in column:
+            raise ValueError(f"Unknown output {output!r}")
+        column = column[key]
+    if isinstance(column, dict):
+        raise ValueError(f"Output {output!r} is not a single value")
+    return column
+
+
+def sweep(
+        base_input: TaxInput,
+        axes: Mapping[str, Sequence],
+        outputs: Sequence[str] = DEFAULT_SWEEP_OUTPUTS) -> dict:
+    """
+    Calculate taxes for every combination of axis values.
+
+    Args:
+        base_input: Return supplying every field that is not swept
+        axes: Ordered mapping of TaxInput field to the values it takes
+        outputs: TaxSummary keys to return; nested values use dotted
+            paths such as 'federal.marginal_rate'
+
+    Returns:
+        Dict with 'axes' (field -> values array), 'shape' (one dimension
+        per axis, in axes order) and 'results' (output -> array of that
+        shape, indexed [i, j, ...] by the position of each axis value).
+
+    Raises:
+        ValueError: Unknown axis or output, empty axis, unsupported tax
+            year or filing status, or a grid larger than MAX_SWEEP_POINTS
+    """
+    if not axes:
+        raise ValueError("sweep requires at least one axis")
+
+    axis_values = {field: _axis_values(field, values) for field, values in axes.items()}
+    shape = tuple(len(values) for values in axis_values.values())
+    size = prod(shape)
+    if size > MAX_SWEEP_POINTS:
+        raise ValueError(
+            f"Sweep grid has {size} points, the limit is {MAX_SWEEP_POINTS}")
+
+    canonical = canonicalize_input(base_input)
+    if 'tax_year' not in axis_values:
+        check_tax_year(canonical['tax_year'])
+    if 'filing_status' not in axis_values:
+        check_filing_status(canonical['filing_status'])
+
+    columns = {
+        field: np.full(size, value)
+        for field, value in canonical.items()
+        if field not in axis_values
+    }
+    # Index grids rather than value grids, so string axes need no copies
+    positions = np.meshgrid(*(np.arange(n) for n in shape), indexing='ij')
+    for (field, values), position in zip(axis_values.items(), positions):
+        columns[field] = values[position.ravel()]
+
+    batch = calculate_taxes_batch(columns)
+
+    return {
+        'axes': axis_values,
+        'shape': shape,
+        'results': {
+            output: select_output(batch, output).reshape(shape)
+            for output in outputs
+        },
+    }
@@ -1,42 +1,200 @@
+from bisect import bisect_left
+from typing import NamedTuple, Optional, Union
+import numpy as np
+
+
+# Result detail levels accepted by calculate_taxes
+DETAIL_TOTALS = 'totals'  # totals only, no per-bracket rows
+DETAIL_BREAKDOWN = 'breakdown'  # totals plus bracket_breakdown (default)
+DETAIL_TRACE = 'trace'  # breakdown plus intermediate worksheet values
+DETAIL_LEVELS = (DETAIL_TOTALS, DETAIL_BREAKDOWN, DETAIL_TRACE)
+
+
+class BracketTable(NamedTuple):
+    """Progressive brackets compiled into sorted threshold arrays."""
+    lower_limits: tuple[float, ...]
+    upper_limits: tuple[float, ...]
+    rates: tuple[float, ...]
+    # Tax owed on all income below each lower limit; one extra trailing
+    # entry holds the tax owed at the top of the last bracket.
+    base_tax: tuple[float, ...]
+
+
+Brackets = Union[list[tuple[Optional[float], float]], BracketTable]
+
+
+def compile_brackets(brackets: list[tuple[Optional[float], float]]) -> BracketTable:
+    """
+    Compile (upper_limit, rate) tuples into a BracketTable.
+
+    An upper limit of None (as stored in states.json) means no limit.
+    """
+    lower_limits = []
+    upper_limits = []
+    rates = []
+    base_tax = [0.0]
+
+    previous_limit = 0.0
+    for upper_limit, rate in brackets:
+        upper_limit = float('inf') if upper_limit is None else float(upper_limit)
+        rate = float(rate)
+        lower_limits.append(previous_limit)
+        upper_limits.append(upper_limit)
+        rates.append(rate)
+        # Accumulate in bracket order, exactly as a linear walk would
+        base_tax.append(base_tax[-1] + (upper_limit - previous_limit) * rate)
+        previous_limit = upper_limit
+
+    return BracketTable(
+        tuple(lower_limits),
+        tuple(upper_limits),
+        tuple(rates),
+        tuple(base_tax),
+    )
+
+
+# Compiled tables keyed by (jurisdiction, tax_year, filing_status)
+_BRACKET_TABLES: dict[tuple[str, int, str], BracketTable] = {}
+
+# Bumped whenever tax tables change so derived caches can drop stale entries
+_tax_tables_version = 0
+
+
+def get_bracket_table(
+    jurisdiction: str,
+    tax_year: int,
+    filing_status: str,
+    brackets: Brackets,
+) -> BracketTable:
+    """
+    Return the compiled table for a jurisdiction, compiling it on first use.
+
+    Args:
+        jurisdiction: 'federal' or a state code
+        tax_year: The tax year the brackets belong to
+        filing_status: 'single' or 'joint'
+        brackets: The raw brackets, only read when the table is not cached
+    """
+    key = (jurisdiction, tax_year, filing_status)
+    table = _BRACKET_TABLES.get(key)
+    if table is None:
+        table = brackets if isinstance(
+            brackets, BracketTable) else compile_brackets(brackets)
+        _BRACKET_TABLES[key] = table
+    return table
+
+
+def clear_bracket_tables():
+    """Drop all compiled tables so they are rebuilt from the raw rates."""
+    _BRACKET_TABLES.clear()
+
+
+def tax_tables_version() -> int:
+    """Return a counter that changes every time the tax tables change."""
+    return _tax_tables_version
+
+
+def invalidate_tax_tables():
+    """
+    Signal that rate tables were modified.
+
+    Call after editing TAX_RATES, CA_TAX_RATES or the state data at
+    runtime. Compiled brackets are rebuilt and memoized results computed
+    from the old tables are discarded.
+    """
+    global _tax_tables_version
+    clear_bracket_tables()
+    _tax_tables_version += 1
+
+
 def calculate_tax_from_brackets(
     taxable_income: float,
-    brackets: list[tuple[float, float]],
+    brackets: Brackets,
+    include_breakdown: bool = True,
 ) -> tuple[float, float, list[dict]]:
     """
     Calculate tax using progressive tax brackets.
 
     Args:
         taxable_income: The taxable income amount
-        brackets: List of (upper_limit, rate) tuples
+        brackets: A compiled BracketTable, or a list of (upper_limit, rate)
+            tuples which is compiled on the fly
+        include_breakdown: Build the per-bracket rows; when False the
+            returned breakdown is always empty
 
     Returns:
         Tuple of (total_tax, marginal_rate, bracket_breakdown)
     """
+    table = brackets if isinstance(
+        brackets, BracketTable) else compile_brackets(brackets)
+
     if taxable_income <= 0:
-        return 0.0, brackets[0][1], []
+        return 0.0, table.rates[0], []
+
+    index = bisect_left(table.upper_limits, taxable_income)
+    if index == len(table.rates):
+        # Income above a finite top bracket is not taxed further
+        index -= 1
+        taxable_income = table.upper_limits[index]
+
+    rate = table.rates[index]
+    lower_limit = table.lower_limits[index]
+    total_tax = table.base_tax[index] + (taxable_income - lower_limit) * rate
 
-    total_tax = 0.0
-    previous_limit = 0.0
-    marginal_rate = 0.0
     breakdown = []
+    if not include_breakdown:
+        return total_tax, rate, breakdown
 
-    for upper_limit, rate in brackets:
-        if taxable_income <= previous_limit:
-            break
-
-        bracket_income = min(taxable_income, upper_limit) - previous_limit
-        if bracket_income > 0:
-            tax_in_bracket = bracket_income * rate
-            total_tax += tax_in_bracket
-            marginal_rate = rate
-            breakdown.append({
-                'range_start': previous_limit,
-                'range_end': min(taxable_income, upper_limit),
-                'rate': rate,
-                'income_in_bracket': bracket_income,
-                'tax_in_bracket': tax_in_bracket,
-            })
+    for i in range(index + 1):
+        range_end = taxable_income if i == index else table.upper_limits[i]
+        income_in_bracket = range_end - table.lower_limits[i]
+        if income_in_bracket <= 0:
+            # An empty bracket has no row
+            continue
+        breakdown.append({
+            'range_start': table.lower_limits[i],
+            'range_end': range_end,
+            'rate': table.rates[i],
+            'income_in_bracket': income_in_bracket,
+            'tax_in_bracket': income_in_bracket * table.rates[i],
+        })
 
-        previous_limit = upper_limit
+    return total_tax, rate, breakdown
+
+
+def calculate_tax_from_brackets_batch(
+    taxable_income: np.ndarray,
+    brackets: Brackets,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized calculate_tax_from_brackets over an array of incomes.
+
+    Uses the same threshold search and cumulative base tax as the scalar
+    version so every row matches it exactly.
+
+    Args:
+        taxable_income: Array of taxable income amounts
+        brackets: A compiled BracketTable or a list of (upper_limit, rate)
+            tuples
+
+    Returns:
+        Tuple of (total_tax, marginal_rate) arrays
+    """
+    table = brackets if isinstance(
+        brackets, BracketTable) else compile_brackets(brackets)
+    taxable_income = np.asarray(taxable_income, dtype=float)
+
+    upper_limits = np.asarray(table.upper_limits)
+    top = len(table.rates) - 1
+    index = np.minimum(np.searchsorted(upper_limits, taxable_income, side='left'), top)
+    capped_income = np.minimum(taxable_income, upper_limits[index])
+
+    rates = np.asarray(table.rates)[index]
+    total_tax = np.asarray(table.base_tax)[index] + \
+        (capped_income - np.asarray(table.lower_limits)[index]) * rates
 
-    return total_tax, marginal_rate, breakdown
+    positive = taxable_income > 0
+    return (
+        np.where(positive, total_tax, 0.0),
+        np.where(positive, rates, table.rates[0]),
+    )
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+# Keep uploads made by the tests out of the user's persistent parse cache
+# and layout templates
+os.environ.setdefault('OPENTAX_PARSE_CACHE', 'off')
+os.environ.setdefault('OPENTAX_LAYOUT_TEMPLATES', 'off')
+
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(pages, fields=None) -> bytes:
+    """
+    Build a minimal PDF for parser tests.
+
+    Args:
+        pages: One entry per page, each a list of lines of text or of
+            (x, y, text) tuples placed on a US Letter page in 10pt Helvetica,
+            or (x, y, text, size) tuples in another size
+        fields: Optional {name: value} AcroForm text fields, put on page 1
+
+    Returns:
+        The PDF file's bytes
+    """
+    fields = fields or {}
+    objects = []  # bodies, object number = index + 1
+
+    def add(body) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    page_tree = add(None)
+    font = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+
+    widgets = []
+    for index, (name, value) in enumerate(fields.items()):
+        y = 20 + 12 * index
+        widgets.append(add(
+            f'<< /Type /Annot /Subtype /Widget /FT /Tx /T ({_escape(name)}) '
+            f'/V ({_escape(str(value))}) /Rect [400 {y} 600 {y + 10}] >>'.encode()))
+
+    page_numbers = []
+    for page_index, lines in enumerate(pages):
+        commands = []
+        for line_index, line in enumerate(lines):
+            size = 10
+            if isinstance(line, str):
+                x, y, text = 50, 740 - 14 * line_index, line
+            elif len(line) == 4:
+                x, y, text, size = line
+            else:
+                x, y, text = line
+            commands.append(f'BT /F1 {size} Tf {x} {y} Td ({_escape(text)}) Tj ET')
+        stream = '\n'.join(commands).encode('latin-1')
+        content = add(
+            b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        annots = ''
+        if page_index == 0 and widgets:
+            annots = ' /Annots [' + ' '.join(f'{w} 0 R' for w in widgets) + ']'
+        page_numbers.append(add(
+            f'<< /Type /Page /Parent {page_tree} 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 {font} 0 R >> >> '
+            f'/Contents {content} 0 R{annots} >>'.encode()))
+
+    kids = ' '.join(f'{n} 0 R' for n in page_numbers)
+    objects[page_tree - 1] = \
+        f'<< /Type /Pages /Kids [{kids}] /Count {len(page_numbers)} >>'.encode()
+    acroform = ''
+    if widgets:
+        acroform = ' /AcroForm << /Fields [' + \
+            ' '.join(f'{w} 0 R' for w in widgets) + '] >>'
+    objects[catalog - 1] = \
+        f'<< /Type /Catalog /Pages {page_tree} 0 R{acroform} >>'.encode()
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """Write build_pdf(pages, fields) to a temporary file and return its path."""
+    counter = iter(range(1_000_000))
+
+    def make(pages, fields=None, name=None) -> str:
+        path = tmp_path / (name or f'document_{next(counter)}.pdf')
+        path.write_bytes(build_pdf(pages, fields))
+        return str(path)
+
+    return make
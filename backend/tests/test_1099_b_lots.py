@@ -0,0 +1,138 @@
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import parse_1099_b
+from parsers.document import ParsedDocument
+from parsers.form_1099_b import iter_1099_b_lots, parse_lot_line
+
+STATEMENT = [
+    [
+        'Example Brokerage 2024 Form 1099-B',
+        'Broker',
+        'Example Securities LLC',
+        'Federal income tax withheld 12.00',
+        'Short-term transactions for which basis is reported to the IRS',
+        '10 sh APPLE INC 01/15/2024 06/20/2024 1,850.00 1,500.00 350.00',
+        '5 sh TESLA INC 02/01/2024 03/01/2024 900.00 1,000.00 25.00 (75.00)',
+    ],
+    [
+        'Long-term transactions for which basis is not reported to the IRS',
+        '20 sh MICROSOFT CORP VARIOUS 06/20/2024 8,000.00 5,000.00 3,000.00',
+        'Total long-term 8,000.00 5,000.00 3,000.00',
+    ],
+]
+
+
+def test_lot_line_columns():
+    lot = parse_lot_line('5 sh TESLA INC 02/01/2024 03/01/2024 900.00 1,000.00 25.00 (75.00)')
+    assert lot['description'] == '5 sh TESLA INC'
+    assert (lot['date_acquired'], lot['date_sold']) == ('02/01/2024', '03/01/2024')
+    assert (lot['proceeds'], lot['cost_basis']) == (900.0, 1000.0)
+    assert lot['wash_sale_loss_disallowed'] == 25.0
+    assert lot['gain_loss'] == -75.0
+    # No section header: the holding period decides the term
+    assert lot['term'] == 'short'
+
+    assert parse_lot_line('X 01/02/2020 01/03/2022 10.00 4.00')['term'] == 'long'
+    assert parse_lot_line('Total long-term 8,000.00 5,000.00 3,000.00') is None
+
+
+def test_four_amount_lots_follow_the_column_header(make_pdf):
+    lot_line = '5 sh TESLA INC 02/01/2024 03/01/2024 900.00 1,000.00 25.00 (75.00)'
+    wash_sale_columns = 'Description Acquired Sold Proceeds Cost basis Wash sale loss disallowed Gain/loss'
+    market_discount_columns = 'Description Acquired Sold Proceeds Cost basis Accrued market discount Gain/loss'
+
+    lots = list(iter_1099_b_lots(make_pdf([
+        [wash_sale_columns, lot_line],
+        [market_discount_columns, lot_line],
+    ])))
+    assert [lot['wash_sale_loss_disallowed'] for lot in lots] == [25.0, 0.0]
+    assert [lot['gain_loss'] for lot in lots] == [-75.0, -75.0]
+
+    assert parse_lot_line(lot_line, market_discount=True)['wash_sale_loss_disallowed'] == 0.0
+
+
+def test_lots_stream_with_section_term_and_box(make_pdf):
+    lots = list(iter_1099_b_lots(make_pdf(STATEMENT)))
+
+    assert [lot['box'] for lot in lots] == ['A', 'A', 'E']
+    assert [lot['term'] for lot in lots] == ['short', 'short', 'long']
+    assert lots[2]['date_acquired'] == 'VARIOUS'
+
+
+def test_lots_are_not_kept_in_memory(make_pdf):
+    with ParsedDocument.open(make_pdf(STATEMENT)) as document:
+        for _ in iter_1099_b_lots(document):
+            pass
+        assert document._page_text == {}
+
+
+def test_totals_are_computed_from_the_lots(make_pdf):
+    result = parse_1099_b(make_pdf(STATEMENT))
+
+    assert result['parse_confidence'] == 'high'
+    assert result['transaction_count'] == 3
+    assert len(result['transactions']) == 3
+    assert result['short_term_proceeds'] == 2750.0
+    assert result['short_term_cost_basis'] == 2500.0
+    assert result['short_term_gains'] == 275.0
+    assert result['long_term_gains'] == 3000.0
+    assert result['box_totals']['A']['count'] == 2
+    assert result['box_totals']['E']['wash_sale_loss_disallowed'] == 0.0
+    assert result['federal_tax_withheld'] == 12.0
+
+
+def test_summary_totals_without_lots(make_pdf):
+    result = parse_1099_b(make_pdf([[
+        'Form 1099-B Summary',
+        'Short-term totals 1,200.00',
+        'Long-term totals (300.00)',
+    ]]))
+    assert 'transaction_count' not in result
+    assert result['short_term_gains'] == 1200.0
+    assert result['parse_confidence'] == 'medium'
+
+
+def test_summary_text_is_read_in_the_lot_pass(make_pdf):
+    with ParsedDocument.open(make_pdf([
+        ['Form 1099-B Summary', 'Short-term totals 1,200.00'],
+        ['Long-term totals 300.00'],
+    ])) as document:
+        result = parse_1099_b(document)
+        assert document._page_text == {}
+
+    # Found on the second page
+    assert result['long_term_gains'] == 300.0
+    assert 'Long-term totals' in result['raw_text']
+
+
+def test_lots_of_unknown_term_are_totaled_apart(make_pdf):
+    result = parse_1099_b(make_pdf([[
+        'Form 1099-B',
+        '20 sh MICROSOFT CORP VARIOUS 06/20/2024 8,000.00 5,000.00 3,000.00',
+        '10 sh APPLE INC 01/15/2024 06/20/2024 1,850.00 1,500.00 350.00',
+    ]]))
+
+    assert result['short_term_gains'] == 350.0
+    assert result['long_term_gains'] == 0.0
+    assert result['unclassified_count'] == 1
+    assert result['unclassified_proceeds'] == 8000.0
+    assert result['unclassified_gains'] == 3000.0
+    assert result['parse_confidence'] == 'medium'
+
+
+def test_header_fields_are_read_in_the_lot_pass(make_pdf):
+    pages = [STATEMENT[0][:3] + STATEMENT[0][4:], STATEMENT[1] + [STATEMENT[0][3]]]
+    with ParsedDocument.open(make_pdf(pages)) as document:
+        result = parse_1099_b(document)
+        # No page's text is kept
+        assert document._page_text == {}
+
+    assert result['transaction_count'] == 3
+    assert result['unclassified_count'] == 0
+    # Found on the second page
+    assert result['federal_tax_withheld'] == 12.0
+    assert result['raw_text'].startswith('Example Brokerage')
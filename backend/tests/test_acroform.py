@@ -0,0 +1,151 @@
+import sys
+import os
+import json
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import ParsedDocument, parse_w2, parse_1099_int, parse_1099_nec
+from parsers.acroform import load_field_maps, normalize_field_name, read_form_fields
+
+W2_FIELDS = {
+    'employer_name': 'Example Payroll Corp',
+    'box1_wages': '85,000.00',
+    'box2_federal_income_tax_withheld': '12,000.00',
+    'social_security_wages': '85,000.00',
+    'medicare_wages': '85,000.00',
+    'box16_state_wages': '85,000.00',
+    'box17_state_income_tax': '4,100.00',
+    'employee_address': '1 Main St',
+}
+
+
+def test_field_names_are_normalized():
+    assert normalize_field_name('topmostSubform[0].CopyA[0].Box 1 Wages[0]') == 'box_1_wages'
+    assert normalize_field_name("Payer's name") == 'payer_s_name'
+
+
+def test_fillable_w2_skips_layout_analysis(make_pdf):
+    path = make_pdf([['Form W-2 Wage and Tax Statement']], fields=W2_FIELDS)
+    with ParsedDocument.open(path) as document:
+        result = parse_w2(document)
+        assert not document._tables
+        assert not document._page_text
+
+    assert result['wages'] == 85000.0
+    assert result['federal_tax_withheld'] == 12000.0
+    assert result['state_tax_withheld'] == 4100.0
+    assert result['employer_name'] == 'Example Payroll Corp'
+    assert result['parse_confidence'] == 'high'
+    # Copies are not compared without the page's words
+    assert result['copy_count'] is None
+    assert result['copies_consistent'] is None
+
+
+def test_empty_fields_fall_back_to_text(make_pdf):
+    path = make_pdf([[
+        'Form 1099-INT Interest Income',
+        '1 Interest income 1,234.56',
+    ]], fields={'interest_income': '', 'payer_name': 'Field Credit Union'})
+    with ParsedDocument.open(path) as document:
+        assert read_form_fields(document, '1099-INT') == {}
+        result = parse_1099_int(document)
+
+    assert result['interest_income'] == 1234.56
+    assert result['payer_name'] == 'Field Credit Union'
+
+
+def test_fields_of_another_form_are_not_read(make_pdf):
+    path = make_pdf([['Form W-2']], fields=W2_FIELDS)
+    with ParsedDocument.open(path) as document:
+        assert read_form_fields(document, '1099-INT') == {}
+
+
+def test_issuer_map_is_chosen_by_field_names(make_pdf, tmp_path):
+    maps_path = tmp_path / 'field_maps.json'
+    maps_path.write_text(json.dumps({
+        'examplebank': {
+            'detect': r'^examplebank\.',
+            '1099-INT': {
+                'required': ['interest_income'],
+                'fields': {'interest_income': 'f1_07', 'payer_name': 'f1_01'},
+            },
+        },
+        'generic': {
+            '1099-INT': {
+                'required': ['interest_income'],
+                'fields': {'interest_income': 'interest_income'},
+            },
+        },
+    }))
+    maps = load_field_maps(str(maps_path))
+    path = make_pdf([['Form 1099-INT']], fields={
+        'examplebank.f1_01': 'Example Bank NA',
+        'examplebank.f1_07': '(12.50)',
+    })
+    with ParsedDocument.open(path) as document:
+        assert read_form_fields(document, '1099-INT', maps) == {
+            'interest_income': -12.5,
+            'payer_name': 'Example Bank NA',
+        }
+
+
+# Field names of the IRS fillable forms: the same "f<page>_<n>" names on
+# every form, one page per copy
+IRS_W2_FIELDS = {
+    'topmostSubform[0].CopyA[0].Col_Left[0].f1_03[0]': 'Example Payroll Corp\n1 Industrial Way',
+    'topmostSubform[0].CopyA[0].Col_Right[0].Box1_ReadOrder[0].f1_09[0]': '85000.00',
+    'topmostSubform[0].CopyA[0].Col_Right[0].f1_10[0]': '12000.00',
+    'topmostSubform[0].CopyA[0].Col_Right[0].Box3_ReadOrder[0].f1_11[0]': '85000.00',
+    'topmostSubform[0].CopyA[0].Col_Right[0].f1_12[0]': '5270.00',
+    'topmostSubform[0].CopyA[0].Col_Right[0].Box5_ReadOrder[0].f1_13[0]': '85000.00',
+    'topmostSubform[0].CopyA[0].Col_Right[0].f1_14[0]': '1232.50',
+    'topmostSubform[0].CopyA[0].Boxes15_ReadOrder[0].f1_31[0]': '85000.00',
+    'topmostSubform[0].CopyA[0].Boxes15_ReadOrder[0].f1_32[0]': '4100.00',
+}
+
+
+def test_irs_fillable_w2_fields_are_read(make_pdf):
+    path = make_pdf([['Form W-2 Wage and Tax Statement']], fields=IRS_W2_FIELDS)
+    with ParsedDocument.open(path) as document:
+        assert read_form_fields(document, 'W-2') == {
+            'employer_name': 'Example Payroll Corp',
+            'wages': 85000.0,
+            'federal_tax_withheld': 12000.0,
+            'social_security_wages': 85000.0,
+            'social_security_tax_withheld': 5270.0,
+            'medicare_wages': 85000.0,
+            'medicare_tax_withheld': 1232.5,
+            'state_wages': 85000.0,
+            'state_tax_withheld': 4100.0,
+        }
+        # The same field names on another form are not read as a W-2
+        assert read_form_fields(document, '1099-NEC') == {}
+
+
+def test_irs_fillable_1099_int_fields_are_read(make_pdf):
+    path = make_pdf([['Form 1099-INT Interest Income']], fields={
+        'topmostSubform[0].CopyB[0].LeftColumn[0].f2_2[0]': 'Example Bank NA\n1 Main St',
+        'topmostSubform[0].CopyB[0].RightColumn[0].f2_10[0]': '1,234.56',
+        'topmostSubform[0].CopyB[0].RightColumn[0].f2_13[0]': '120.00',
+    })
+    with ParsedDocument.open(path) as document:
+        result = parse_1099_int(document)
+
+    assert result['interest_income'] == 1234.56
+    assert result['federal_tax_withheld'] == 120.0
+    assert result['payer_name'] == 'Example Bank NA'
+
+
+def test_payer_name_missing_from_fields_is_read_from_the_text(make_pdf):
+    path = make_pdf([[
+        'Form 1099-NEC Nonemployee Compensation',
+        "PAYER'S name, street address, city",
+        'Acme Consulting LLC',
+    ]], fields={'nonemployee_compensation': '5,000.00'})
+    with ParsedDocument.open(path) as document:
+        result = parse_1099_nec(document)
+
+    assert result['nonemployee_compensation'] == 5000.0
+    assert result['payer_name'] == 'Acme Consulting LLC'
+    assert result['raw_text']
@@ -0,0 +1,81 @@
+import random
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tax_engine.batch import calculate_taxes_batch, NUMERIC_FIELDS
+from tax_engine.calculator import calculate_taxes
+
+
+def random_returns(count, seed=2024):
+    """Build a varied set of returns covering losses, SE income and high earners."""
+    rng = random.Random(seed)
+    states = ['CA', 'NY', 'TX', 'CO', 'PR', 'GU', 'NJ', 'OR', 'ZZ']
+    returns = []
+    for _ in range(count):
+        row = {field: 0.0 for field in NUMERIC_FIELDS}
+        row['w2_wages'] = rng.choice([0.0, 45000.0, 185000.0, rng.uniform(0, 900000)])
+        row['w2_medicare_wages'] = row['w2_wages'] * rng.choice([0.0, 1.0, 1.05])
+        row['w2_medicare_tax'] = row['w2_medicare_wages'] * rng.choice([0.0, 0.0145, 0.0235])
+        row['w2_social_security_wages'] = min(row['w2_wages'], 168600.0)
+        row['w2_federal_withheld'] = row['w2_wages'] * 0.2
+        row['w2_state_withheld'] = row['w2_wages'] * 0.05
+        row['interest_income'] = rng.choice([0.0, rng.uniform(0, 20000)])
+        row['ordinary_dividends'] = rng.choice([0.0, rng.uniform(0, 50000)])
+        row['qualified_dividends'] = row['ordinary_dividends'] * rng.random()
+        row['capital_gain_distributions'] = rng.choice([0.0, rng.uniform(0, 5000)])
+        row['short_term_gains'] = rng.choice([0.0, rng.uniform(-40000, 60000)])
+        row['long_term_gains'] = rng.choice([0.0, rng.uniform(-40000, 400000)])
+        row['self_employment_income'] = rng.choice([0.0, 0.0, rng.uniform(-5000, 250000)])
+        row['itemized_deductions'] = rng.choice([0.0, rng.uniform(0, 60000)])
+        row['foreign_income'] = rng.choice([0.0, rng.uniform(0, 30000)])
+        row['estimated_tax_payments'] = rng.choice([0.0, rng.uniform(0, 20000)])
+        row['tax_year'] = rng.choice([2024, 2025])
+        row['filing_status'] = rng.choice(['single', 'joint'])
+        row['state'] = rng.choice(states)
+        if row['tax_year'] == 2025 and row['state'] == 'CA':
+            row['state'] = rng.choice(['CA', 'NY'])
+        returns.append(row)
+    return returns
+
+
+def to_columns(returns):
+    keys = returns[0].keys()
+    return {key: np.array([row[key] for row in returns]) for key in keys}
+
+
+def test_batch_matches_scalar_engine_exactly():
+    returns = random_returns(400)
+    batch = calculate_taxes_batch(to_columns(returns))
+
+    for i, row in enumerate(returns):
+        expected = calculate_taxes(dict(row))
+        for key, value in expected.items():
+            if isinstance(value, dict):
+                for sub_key, sub_value in value.items():
+                    if isinstance(sub_value, (int, float)):
+                        assert batch[key][sub_key][i] == sub_value, (i, key, sub_key)
+            else:
+                assert batch[key][i] == value, (i, key)
+
+
+def test_batch_defaults_missing_columns():
+    batch = calculate_taxes_batch({'w2_wages': np.array([100000.0, 0.0])})
+    expected = calculate_taxes({'w2_wages': 100000.0})
+
+    assert batch['total_tax_liability'][0] == expected['total_tax_liability']
+    assert batch['total_tax_liability'][1] == 0.0
+    assert batch['refund_or_owed'][0] == 'owed'
+    assert list(batch['tax_year']) == [2024, 2024]
+
+
+def test_batch_rejects_ragged_columns():
+    try:
+        calculate_taxes_batch({'w2_wages': [1.0, 2.0], 'interest_income': [1.0]})
+    except ValueError:
+        return
+    assert False, "expected ValueError for mismatched column lengths"
@@ -0,0 +1,142 @@
+import json
+import sys
+import os
+
+import pytest
+
+pytest.importorskip("httpx")
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from main import app
+from tax_engine.calculator import calculate_taxes
+
+client = TestClient(app)
+
+ROWS = [
+    {'w2_wages': 85000, 'state': 'CA'},
+    {'w2_wages': 120000, 'long_term_gains': 20000, 'state': 'NY'},
+    {'w2_wages': 40000, 'state': 'TX'},
+]
+
+
+def read_lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_ndjson_rows_stream_back_in_order():
+    body = '\n'.join(json.dumps(row) for row in ROWS) + '\n'
+    response = client.post('/api/calculate/batch', content=body)
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    lines = read_lines(response)
+    assert [line['index'] for line in lines] == [0, 1, 2]
+    for row, line in zip(ROWS, lines):
+        expected = calculate_taxes(row, detail='totals')
+        assert line['result']['total_tax_liability'] == expected['total_tax_liability']
+        assert line['result']['federal']['bracket_breakdown'] == []
+
+
+def test_json_array_input_and_row_errors():
+    rows = ROWS + [{'w2_wages': 'lots'}]
+    body = json.dumps(rows)
+    response = client.post('/api/calculate/batch?detail=breakdown', content=body)
+
+    lines = read_lines(response)
+    assert len(lines) == 4
+    assert lines[0]['result']['federal']['bracket_breakdown']
+    assert 'error' in lines[3]
+    assert lines[3]['index'] == 3
+
+
+def test_invalid_ndjson_line_reported():
+    body = json.dumps(ROWS[0]) + '\n{not json\n' + json.dumps(ROWS[2])
+    lines = read_lines(client.post('/api/calculate/batch', content=body))
+
+    assert 'result' in lines[0]
+    assert lines[1]['error'].startswith('Invalid JSON')
+    assert 'result' in lines[2]
+
+
+def test_rows_decoded_across_chunk_boundaries():
+    import asyncio
+    from main import _iter_json_rows
+
+    body = json.dumps([{'state': 'NY', 'w2_wages': 1.5}, {'state': 'Åland'}]).encode()
+
+    async def chunks():
+        for i in range(0, len(body), 5):
+            yield body[i:i + 5]
+
+    async def collect():
+        return [row async for row in _iter_json_rows(chunks())]
+
+    assert asyncio.run(collect()) == [{'state': 'NY', 'w2_wages': 1.5}, {'state': 'Åland'}]
+
+
+def test_row_that_fails_to_calculate_is_reported_alone():
+    body = json.dumps([{'w2_wages': 1}, {'w2_wages': 2, 'tax_year': 2023}, {'w2_wages': 3}])
+    response = client.post('/api/calculate/batch', content=body)
+
+    assert response.status_code == 200
+    lines = read_lines(response)
+    assert [line['index'] for line in lines] == [0, 1, 2]
+    assert 'result' in lines[0]
+    assert 'Unsupported tax year 2023' in lines[1]['error']
+    assert 'result' in lines[2]
+
+
+def test_malformed_array_element_is_skipped():
+    body = '[{"w2_wages": 1}, {bad}, {"w2_wages": "x]", "state": "CA"}, [1, {"a": 2}], {"w2_wages": 3}]'
+    lines = read_lines(client.post('/api/calculate/batch', content=body))
+
+    assert len(lines) == 5
+    assert 'result' in lines[0]
+    assert lines[1]['error'].startswith('Invalid JSON')
+    # Brackets inside strings and nested values do not end an element
+    assert 'error' in lines[2] and 'error' in lines[3]
+    assert 'result' in lines[4]
+
+
+def test_malformed_element_is_found_across_chunks():
+    import asyncio
+    from main import _iter_json_rows
+
+    body = b'[{"w2_wages": 1}, {"bad": tru}, {"w2_wages": 3}]'
+
+    async def chunks():
+        for i in range(0, len(body), 4):
+            yield body[i:i + 4]
+
+    async def collect():
+        return [row async for row in _iter_json_rows(chunks())]
+
+    rows = asyncio.run(collect())
+    assert rows[0] == {'w2_wages': 1}
+    assert isinstance(rows[1], json.JSONDecodeError)
+    assert rows[2] == {'w2_wages': 3}
+
+
+def test_endless_array_element_stops_reading(monkeypatch):
+    import asyncio
+    import main
+
+    monkeypatch.setattr(main, 'MAX_BATCH_ROW_CHARS', 64)
+    read = []
+
+    async def chunks():
+        yield b'[{"w2_wages": 1}, {"note": "'
+        for _ in range(100):
+            read.append(1)
+            yield b'x' * 16
+
+    async def collect():
+        return [row async for row in main._iter_json_rows(chunks())]
+
+    rows = asyncio.run(collect())
+    assert rows[0] == {'w2_wages': 1}
+    assert rows[1].msg == 'Array element is too long'
+    assert len(read) < 10
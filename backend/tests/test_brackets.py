@@ -0,0 +1,94 @@
+import random
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tax_engine.federal import TAX_RATES
+from tax_engine.states.california import CA_TAX_RATES
+from tax_engine.utils import (
+    calculate_tax_from_brackets,
+    calculate_tax_from_brackets_batch,
+    compile_brackets,
+    get_bracket_table,
+    invalidate_tax_tables,
+)
+
+
+def linear_bracket_tax(taxable_income, brackets):
+    """Reference implementation: walk every bracket in order."""
+    if taxable_income <= 0:
+        return 0.0, brackets[0][1]
+    total_tax = 0.0
+    previous_limit = 0.0
+    marginal_rate = 0.0
+    for upper_limit, rate in brackets:
+        if taxable_income <= previous_limit:
+            break
+        bracket_income = min(taxable_income, upper_limit) - previous_limit
+        if bracket_income > 0:
+            total_tax += bracket_income * rate
+            marginal_rate = rate
+        previous_limit = upper_limit
+    return total_tax, marginal_rate
+
+
+def all_bracket_sets():
+    for rates in (TAX_RATES, CA_TAX_RATES):
+        for year_rates in rates.values():
+            for status in ('single', 'joint'):
+                yield year_rates[status]['brackets']
+    # Finite top bracket: income above it is not taxed further
+    yield [(10000, 0.01), (20000, 0.02)]
+
+
+def test_compiled_lookup_matches_linear_walk():
+    rng = random.Random(7)
+    for brackets in all_bracket_sets():
+        incomes = [0.0, -50.0, 1.0] + [upper for upper, _ in brackets if upper != float('inf')]
+        incomes += [rng.uniform(0, 2000000) for _ in range(300)]
+        table = compile_brackets(brackets)
+        batch_tax, batch_marginal = calculate_tax_from_brackets_batch(np.array(incomes), table)
+        for i, income in enumerate(incomes):
+            expected_tax, expected_marginal = linear_bracket_tax(income, brackets)
+            tax, marginal, _ = calculate_tax_from_brackets(income, table)
+            assert (tax, marginal) == (expected_tax, expected_marginal), income
+            assert (batch_tax[i], batch_marginal[i]) == (expected_tax, expected_marginal), income
+
+
+def test_breakdown_sums_to_total():
+    brackets = TAX_RATES[2024]['single']['brackets']
+    tax, marginal, breakdown = calculate_tax_from_brackets(150000.0, brackets)
+
+    assert [row['rate'] for row in breakdown] == [0.10, 0.12, 0.22, 0.24]
+    assert breakdown[-1]['range_end'] == 150000.0
+    assert abs(sum(row['tax_in_bracket'] for row in breakdown) - tax) < 1e-6
+    assert marginal == 0.24
+
+
+def test_breakdown_has_no_empty_brackets():
+    brackets = [(1000, 0.10), (1000, 0.15), (2000, 0.20), (float('inf'), 0.30)]
+
+    _, _, breakdown = calculate_tax_from_brackets(2000.0, brackets)
+    assert [(row['rate'], row['income_in_bracket']) for row in breakdown] == [
+        (0.10, 1000.0), (0.20, 1000.0)]
+
+    # Income exactly on a limit ends in that limit's bracket
+    _, marginal, breakdown = calculate_tax_from_brackets(1000.0, brackets)
+    assert [row['rate'] for row in breakdown] == [0.10]
+    assert marginal == 0.10
+
+
+def test_null_upper_limit_and_cache():
+    try:
+        table = get_bracket_table('XX', 2024, 'single', [[1000.0, 0.02], [None, 0.05]])
+
+        assert table.upper_limits == (1000.0, float('inf'))
+        assert table.base_tax == (0.0, 20.0, float('inf'))
+        # Cached per (jurisdiction, year, status): raw brackets are not re-read
+        assert get_bracket_table('XX', 2024, 'single', []) is table
+    finally:
+        invalidate_tax_tables()
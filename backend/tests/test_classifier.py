@@ -0,0 +1,92 @@
+import sys
+import os
+import time
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import parse_w2, parse_1099_int, parse_1099_div, parse_1099_b
+from parsers.classifier import CONSOLIDATED_1099, classify, classify_text, select_parsers
+
+W2_PAGE = [
+    'Form W-2 Wage and Tax Statement 2024',
+    'b Employer identification number (EIN) 12-3456789',
+    '1 Wages, tips, other compensation 85000.00',
+    '3 Social security wages 85000.00',
+    '5 Medicare wages and tips 85000.00',
+]
+
+CONSOLIDATED_PAGE = [
+    'Example Brokerage 2024 Consolidated Form 1099',
+    'Form 1099-DIV Dividends and Distributions',
+    '1a Total ordinary dividends 500.00',
+    'Form 1099-INT Interest Income',
+    '1 Interest income 40.00',
+    'Form 1099-B Proceeds From Broker and Barter Exchange Transactions',
+]
+
+# First page of a Form 1040, which mentions W-2s and 1099s in its lines
+FORM_1040_TEXT = """Form 1040 U.S. Individual Income Tax Return 2024
+Filing Status Single
+1a Total amount from Form(s) W-2, box 1 85,000.
+2b Taxable interest 40.
+11 Adjusted gross income 85,040.
+25b Federal income tax withheld from Form(s) 1099
+"""
+
+
+def test_single_form_routes_to_its_parser(make_pdf):
+    classifications = classify(make_pdf([W2_PAGE]))
+
+    assert classifications[0].form_type == 'W-2'
+    assert classifications[0].score == 1.0
+    assert select_parsers(classifications) == [parse_w2]
+
+
+def test_consolidated_1099_routes_to_its_parts(make_pdf):
+    classifications = classify(make_pdf([CONSOLIDATED_PAGE]))
+
+    assert classifications[0].form_type == CONSOLIDATED_1099
+    assert set(select_parsers(classifications)) == {
+        parse_1099_int, parse_1099_div, parse_1099_b}
+
+
+def test_references_to_other_forms_do_not_classify():
+    classifications = classify_text(FORM_1040_TEXT)
+    scores = dict(classifications)
+
+    assert classifications[0].form_type == 'Form 1040'
+    assert scores.get('W-2', 0.0) < 0.5
+    assert scores.get('1099-INT', 0.0) < 0.5
+    assert classify_text('Grocery receipt') == []
+
+
+def test_field_names_are_scored():
+    classifications = classify_text('', ('f1_1[0].PayerName', 'Box1_InterestIncome'))
+    assert select_parsers(classifications, threshold=0.3) == [parse_1099_int]
+
+
+@pytest.mark.parametrize('text', ['\n'.join(W2_PAGE), FORM_1040_TEXT * 20])
+def test_classifying_text_is_fast(text):
+    start = time.perf_counter()
+    for _ in range(10):
+        classify_text(text)
+    assert (time.perf_counter() - start) / 10 < 0.02
+
+
+def test_upload_dispatches_to_the_classified_parser(make_pdf):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with open(make_pdf([W2_PAGE]), 'rb') as f:
+        content = f.read()
+
+    client = TestClient(app)
+    response = client.post(
+        '/api/upload', files={'file': ('scan.pdf', content, 'application/pdf')})
+    assert response.status_code == 200
+    # Only the W-2 parser ran, so nothing is merged in from other forms
+    assert response.json()['form_type'] == 'W-2'
@@ -0,0 +1,62 @@
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tax_engine.calculator import calculate_taxes
+from tax_engine.compare import compare_states
+from tax_engine.states.generic import STATE_TABLES
+
+TAX_INPUT = {
+    'w2_wages': 240000.0,
+    'interest_income': 3000.0,
+    'ordinary_dividends': 8000.0,
+    'qualified_dividends': 6000.0,
+    'long_term_gains': 25000.0,
+    'filing_status': 'joint',
+}
+
+
+def test_every_state_matches_its_calculator():
+    comparison = compare_states(TAX_INPUT)
+    rows = {row['state']: row for row in comparison['states']}
+
+    assert set(rows) == set(STATE_TABLES) | {'CA'}
+    for code, row in rows.items():
+        full = calculate_taxes({**TAX_INPUT, 'state': code}, 'totals')
+        state = full['california']
+        marginal = state['marginal_rate'] if code == 'CA' else state['marginal_rate'] * 100
+
+        assert row['state_tax'] == state['total_california_tax']
+        assert row['effective_rate'] == state['effective_rate']
+        assert row['marginal_rate'] == marginal
+        assert row['total_tax'] == full['total_tax_liability']
+        assert comparison['federal']['total_federal_tax'] == full['federal']['total_federal_tax']
+
+
+def test_rows_are_ranked_by_state_tax():
+    states = compare_states(TAX_INPUT)['states']
+
+    assert [row['rank'] for row in states] == list(range(1, len(states) + 1))
+    assert [row['state_tax'] for row in states] == sorted(row['state_tax'] for row in states)
+    assert states[0]['state_tax'] == 0.0
+
+
+def test_compare_states_endpoint():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from main import app
+
+    response = TestClient(app).post('/api/compare-states', json=TAX_INPUT)
+    assert response.status_code == 200
+    assert response.json() == compare_states(TAX_INPUT)
+
+    for bad, message in [
+            ({'tax_year': 2023}, 'Unsupported tax year 2023'),
+            ({'filing_status': 'hoh'}, "Unsupported filing status 'hoh'")]:
+        response = TestClient(app).post('/api/compare-states', json={'w2_wages': 1000, **bad})
+        assert response.status_code == 400
+        assert message in response.json()['detail']
@@ -0,0 +1,60 @@
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tax_engine.calculator import calculate_taxes
+
+TAX_INPUT = {
+    'w2_wages': 250000.0,
+    'w2_medicare_wages': 250000.0,
+    'interest_income': 12000.0,
+    'long_term_gains': 40000.0,
+    'self_employment_income': 20000.0,
+    'state': 'NY',
+    'filing_status': 'single',
+    'tax_year': 2024,
+}
+
+
+def strip_details(result):
+    """Drop breakdown and trace entries, keeping only the totals."""
+    skipped = {'bracket_breakdown', 'breakdown', 'trace'}
+    return {
+        key: strip_details(value) if isinstance(value, dict) else value
+        for key, value in result.items() if key not in skipped
+    }
+
+
+@pytest.mark.parametrize('state', ['NY', 'CA', 'TX'])
+def test_totals_detail_skips_breakdowns(state):
+    tax_input = {**TAX_INPUT, 'state': state}
+    full = calculate_taxes(tax_input)
+    totals = calculate_taxes(tax_input, detail='totals')
+
+    assert full['federal']['bracket_breakdown']
+    assert full['california']['bracket_breakdown']
+    assert totals['federal']['bracket_breakdown'] == []
+    assert totals['california']['bracket_breakdown'] == []
+    assert strip_details(totals) == strip_details(full)
+
+
+def test_trace_detail_exposes_worksheet_values():
+    result = calculate_taxes(TAX_INPUT, detail='trace')
+    trace = result['federal']['trace']
+
+    assert trace['taxable_preferential_capital_gain'] == 40000.0
+    assert trace['ordinary_taxable_income'] == (
+        result['federal']['taxable_income'] - trace['preferential_income'])
+    assert trace['medicare_subject_wages'] == 270000.0
+    assert result['california']['trace']['tax_year'] == 2024
+    assert result['trace']['state'] == 'NY'
+    assert strip_details(result) == strip_details(calculate_taxes(TAX_INPUT))
+
+
+def test_unknown_detail_level_rejected():
+    with pytest.raises(ValueError):
+        calculate_taxes(TAX_INPUT, detail='everything')
@@ -0,0 +1,75 @@
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import ParsedDocument, parse_1099_int, parse_1099_nec
+from parsers.field_spec import FieldScanner, FieldSpec, get_scanner
+
+SPECS = {
+    'INT': (
+        FieldSpec('interest', (r'Box\s*1\b', r'Interest\s*income')),
+        FieldSpec('withheld', (r'Box\s*4',)),
+    ),
+    'NEC': (
+        FieldSpec('compensation', (r'Nonemployee\s*compensation',)),
+        FieldSpec('withheld', (r'Box\s*4',)),
+    ),
+}
+
+
+def test_labels_shared_by_forms_compile_to_one_pattern():
+    scanner = FieldScanner(SPECS)
+
+    # Box 4 is read once for both forms
+    assert len(scanner.patterns) == 4
+    matches = scanner.scan_text('Box 4 Federal income tax withheld 25.00')
+    assert matches[('INT', 'withheld')].group(1) == '25.00'
+    assert matches[('NEC', 'withheld')].group(1) == '25.00'
+
+
+def test_label_listed_first_wins_wherever_it_appears():
+    scanner = FieldScanner(SPECS)
+    matches = scanner.scan_text('Interest income 10.00\nBox 1 20.00')
+    assert matches[('INT', 'interest')].group(1) == '20.00'
+
+
+def test_scan_reads_on_until_the_form_is_complete(make_pdf):
+    scanner = FieldScanner(SPECS)
+    path = make_pdf([
+        ['Interest income'],
+        ['1,000.00', 'Nothing else'],
+        ['Box 4 Federal income tax withheld 25.00'],
+        ['Nonemployee compensation 300.00'],
+        ['Unread'],
+    ])
+    with ParsedDocument.open(path) as document:
+        # The interest runs across the first page break
+        values, text = scanner.scan(document, 'INT')
+        assert values == {'interest': 1000.0, 'withheld': 25.0}
+        assert text.count('\n') == 4
+        assert list(document._page_text) == [0, 1, 2]
+
+        # A second form continues from the pages already scanned
+        values, text = scanner.scan(document, 'NEC')
+        assert values == {'compensation': 300.0, 'withheld': 25.0}
+        assert 'Unread' not in text
+        assert list(document._page_text) == [0, 1, 2, 3]
+
+
+def test_parsers_share_one_scan_of_the_document(make_pdf):
+    path = make_pdf([[
+        'Form 1099-NEC',
+        '1 Nonemployee compensation 5,000.00',
+        '4 Federal income tax withheld 500.00',
+    ]])
+    with ParsedDocument.open(path) as document:
+        nec = parse_1099_nec(document)
+        scanned = dict(get_scanner()._states[document].values)
+        assert scanned[('1099-INT', 'federal_tax_withheld')] == 500.0
+
+        parse_1099_int(document)
+        assert get_scanner()._states[document].values == scanned
+        assert nec['nonemployee_compensation'] == 5000.0
+        assert nec['federal_tax_withheld'] == 500.0
@@ -0,0 +1,75 @@
+import random
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tax_engine.calculator import calculate_taxes, TAX_INPUT_DEFAULTS
+from tax_engine.incremental import IncrementalCalculator, NODES
+
+BASE_INPUT = {
+    'w2_wages': 185000.0,
+    'w2_federal_withheld': 32000.0,
+    'w2_state_withheld': 11000.0,
+    'w2_medicare_wages': 185000.0,
+    'w2_medicare_tax': 2700.0,
+    'interest_income': 4200.0,
+    'ordinary_dividends': 9000.0,
+    'qualified_dividends': 6500.0,
+    'short_term_gains': -2500.0,
+    'long_term_gains': 41000.0,
+    'self_employment_income': 22000.0,
+    'tax_year': 2024,
+    'state': 'CA',
+    'filing_status': 'single',
+}
+
+
+def test_withholding_change_skips_tax_computation():
+    calc = IncrementalCalculator(BASE_INPUT)
+    result = calc.update({'w2_state_withheld': 9000.0})
+
+    assert set(calc.last_recomputed) == {'bottom_line', 'summary'}
+    assert result == calculate_taxes({**BASE_INPUT, 'w2_state_withheld': 9000.0})
+
+
+def test_federal_only_change_leaves_state_alone():
+    calc = IncrementalCalculator(BASE_INPUT)
+    calc.update({'w2_medicare_tax': 4000.0})
+
+    assert 'state' not in calc.last_recomputed
+    assert 'ordinary_income_tax' not in calc.last_recomputed
+    assert 'total_federal_withheld' in calc.last_recomputed
+
+
+def test_unchanged_values_recompute_nothing():
+    calc = IncrementalCalculator(BASE_INPUT)
+    before = calc.result
+    assert calc.update({'w2_wages': 185000, 'unknown_field': 1.0}) is before
+    assert calc.last_recomputed == ()
+
+
+def test_random_edit_sequences_match_full_recalculation():
+    rng = random.Random(7)
+    numeric_fields = [
+        field for field, default in TAX_INPUT_DEFAULTS.items()
+        if isinstance(default, float)
+    ]
+
+    for detail in ('totals', 'breakdown', 'trace'):
+        current = dict(BASE_INPUT)
+        calc = IncrementalCalculator(current, detail)
+        for _ in range(150):
+            changes = {
+                field: round(rng.uniform(-20000, 400000), 2)
+                for field in rng.sample(numeric_fields, rng.randint(1, 3))
+            }
+            if rng.random() < 0.15:
+                changes['filing_status'] = rng.choice(['single', 'joint'])
+            if rng.random() < 0.15:
+                changes['state'] = rng.choice(['CA', 'NY', 'TX', 'IL'])
+            current.update(changes)
+
+            assert calc.update(changes) == calculate_taxes(current, detail)
+            assert len(calc.last_recomputed) <= len(NODES)
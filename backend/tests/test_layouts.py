@@ -0,0 +1,137 @@
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from parsers import ParsedDocument, parse_w2, layouts
+from parsers.layouts import LayoutStore, layout_fingerprint
+from parsers.w2 import W2_LAYOUT_ANCHORS
+from test_w2_words import w2_copy
+
+HEADER = (50, 750, 'Form W-2 Wage and Tax Statement 2024')
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LayoutStore(str(tmp_path / 'layouts.sqlite3'))
+    monkeypatch.setattr(layouts, '_store', store)
+    monkeypatch.setattr(layouts, '_store_loaded', True)
+    yield store
+    store.close()
+
+
+def test_known_layout_is_read_from_its_box_areas(make_pdf, store):
+    first = make_pdf([[HEADER] + w2_copy()])
+    assert parse_w2(first)['wages'] == 85000.0
+    assert store.stats()['templates'] == {'W-2': 1}
+
+    second = make_pdf([[HEADER] + w2_copy(wages='90,000.00')])
+    with ParsedDocument.open(second) as document:
+        result = parse_w2(document)
+        # Neither the page's text nor its words were extracted
+        assert not document._page_text
+        assert not document._words
+
+    assert result['wages'] == 90000.0
+    assert result['medicare_tax_withheld'] == 1232.5
+    assert result['employer_name'] == 'Example Payroll Corp'
+    assert result['parse_confidence'] == 'high'
+    assert result['copies_consistent'] is None
+    assert store.stats()['hits'] == 1
+
+
+def fingerprint_of(path):
+    with ParsedDocument.open(path) as document:
+        return layout_fingerprint(document, 'W-2', anchors=W2_LAYOUT_ANCHORS)
+
+
+def test_layouts_from_the_same_software_are_told_apart(make_pdf, store):
+    first = make_pdf([[HEADER] + w2_copy()])
+    parse_w2(first)
+
+    # Same page size and producer, boxes elsewhere
+    moved = make_pdf([[HEADER] + w2_copy(y=600, wages='70,000.00')])
+    assert fingerprint_of(moved) != fingerprint_of(first)
+    with ParsedDocument.open(moved) as document:
+        result = parse_w2(document)
+        assert document._words
+
+    assert result['wages'] == 70000.0
+    assert store.stats()['templates'] == {'W-2': 2}
+    assert store.get(fingerprint_of(moved)).regions['wages'][1] > 150
+
+
+def test_moved_box_drops_the_template(make_pdf, store):
+    parse_w2(make_pdf([[HEADER] + w2_copy()]))
+
+    # Boxes 1 and 2 stay put, the state boxes move down
+    lines = [
+        (x, y - 60 if y < 560 else y, text, size)
+        for x, y, text, size in w2_copy(state_tax='3,000.00')
+    ]
+    moved = make_pdf([[HEADER] + lines])
+    fingerprint = fingerprint_of(moved)
+    result = parse_w2(moved)
+
+    assert result['state_tax_withheld'] == 3000.0
+    # Learned again from the generic parse
+    assert store.get(fingerprint).regions['state_tax_withheld'][1] > 250
+
+
+def test_box_empty_when_learned_is_read_later(make_pdf, store):
+    parse_w2(make_pdf([[HEADER] + w2_copy(state_tax=None)]))
+
+    with ParsedDocument.open(make_pdf([[HEADER] + w2_copy()])) as document:
+        result = parse_w2(document)
+        assert not document._words
+
+    assert result['state_tax_withheld'] == 4100.0
+
+
+def test_box_missing_when_learned_falls_back(make_pdf, store):
+    without_box_17 = [
+        line for line in w2_copy()
+        if line[2] not in ('17 State income tax', '4,100.00')]
+    parse_w2(make_pdf([[HEADER] + without_box_17]))
+    assert 'state_tax_withheld' not in store.get(
+        fingerprint_of(make_pdf([[HEADER] + w2_copy()]))).regions
+
+    result = parse_w2(make_pdf([[HEADER] + w2_copy()]))
+
+    assert result['state_tax_withheld'] == 4100.0
+    assert result['wages'] == 85000.0
+
+
+def test_longer_values_stay_whole(make_pdf, store):
+    parse_w2(make_pdf([[HEADER] + w2_copy()]))
+
+    longer = make_pdf([[HEADER] + w2_copy(
+        employer='Example Payroll Corporation International', wages='1,285,000.00')])
+    with ParsedDocument.open(longer) as document:
+        result = parse_w2(document)
+        assert not document._words
+
+    assert result['employer_name'] == 'Example Payroll Corporation International'
+    assert result['wages'] == 1285000.0
+
+
+def test_templates_persist(make_pdf, store):
+    path = make_pdf([[HEADER] + w2_copy()])
+    parse_w2(path)
+    with ParsedDocument.open(path) as document:
+        fingerprint = layout_fingerprint(document, 'W-2', anchors=W2_LAYOUT_ANCHORS)
+
+    reopened = LayoutStore(store.path)
+    try:
+        template = reopened.get(fingerprint)
+        assert template.form_type == 'W-2'
+        assert set(template.regions) >= {'wages', 'federal_tax_withheld', 'employer_name'}
+    finally:
+        reopened.close()
+
+
+def test_templates_are_off_in_tests():
+    assert LayoutStore.from_env() is None
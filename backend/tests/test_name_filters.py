@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from parsers.utils import clean_name, looks_like_address
+
+
+@pytest.mark.parametrize('line', [
+    '123 Main St',
+    'P.O. Box 2600',
+    'Suite 400',
+    'San Francisco, CA 94102',
+    'Valley Forge PA 19482',
+    'Boston, MA',
+    'Big Oak Court Way',
+    'Phone: 800-555-0100',
+    'www.example.com',
+    '',
+])
+def test_addresses(line):
+    assert looks_like_address(line)
+
+
+@pytest.mark.parametrize('line', [
+    'Vanguard Marketing Corp',
+    'The Vanguard Group',
+    'Charles Schwab & Co Inc',
+    'Main Street Bank',
+])
+def test_not_addresses(line):
+    assert not looks_like_address(line)
+
+
+@pytest.mark.parametrize('line, name', [
+    ('Vanguard Marketing Corporation', 'Vanguard Marketing Corporation'),
+    ("Payer's name: Chase Bank", 'Chase Bank'),
+    ('Name Line 1: Vanguard', 'Vanguard'),
+    # 'tin' is only a label as a whole word
+    ('Acme Marketing LLC', 'Acme Marketing LLC'),
+    ("PAYER'S TIN", ''),
+    ('Box 4 Federal income tax withheld', ''),
+    ('Form 1099-INT', ''),
+    ('City: Boston', ''),
+    ('12-3456789', ''),
+    ('100 Vanguard Blvd', ''),
+    ('x', ''),
+])
+def test_clean_name(line, name):
+    assert clean_name(line) == name
+
+
+def test_line_verdicts_are_memoized():
+    clean_name.cache_clear()
+    for _ in range(3):
+        clean_name('First Example Bank')
+    assert clean_name.cache_info().hits == 2
@@ -0,0 +1,96 @@
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conftest import build_pdf
+from parsers.parse_cache import ParseCache, content_hash, parser_version
+
+RESULT = {'form_type': '1099-INT', 'interest_income': 40.0, 'payer_name': 'x' * 100}
+
+
+def test_results_are_keyed_by_content_and_hint(tmp_path):
+    cache = ParseCache(str(tmp_path / 'cache.sqlite3'))
+    digest = content_hash(b'%PDF-1.4 one')
+
+    cache.put(digest, None, RESULT)
+    assert cache.get(digest) == RESULT
+    assert cache.get(digest, 'w2') is None
+    assert cache.get(content_hash(b'%PDF-1.4 two')) is None
+
+    stats = cache.stats()
+    assert (stats['entries'], stats['hits'], stats['misses']) == (1, 1, 2)
+
+
+def test_page_text_is_not_stored(tmp_path):
+    path = tmp_path / 'cache.sqlite3'
+    cache = ParseCache(str(path))
+    cache.put('abc', None, {**RESULT, 'raw_text': 'SSN 123-45-6789'})
+
+    assert cache.get('abc') == RESULT
+    cache.close()
+    assert b'123-45-6789' not in path.read_bytes()
+    # Readable by its owner only
+    assert path.stat().st_mode & 0o777 == 0o600
+
+
+def test_results_persist_until_the_parser_version_changes(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    ParseCache(path, version='v1').put('abc', None, RESULT)
+
+    assert ParseCache(path, version='v1').get('abc') == RESULT
+    # Opening with a new parser version drops the old results
+    assert ParseCache(path, version='v2').stats()['entries'] == 0
+    assert ParseCache(path, version='v1').get('abc') is None
+
+
+def test_parser_version_hashes_the_parser_sources(tmp_path):
+    (tmp_path / 'w2.py').write_text('A = 1\n')
+    before = parser_version(str(tmp_path))
+    assert parser_version(str(tmp_path)) == before
+
+    (tmp_path / 'w2.py').write_text('A = 2\n')
+    assert parser_version(str(tmp_path)) != before
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = ParseCache(str(tmp_path / 'cache.sqlite3'), max_bytes=350)
+    cache.put('a', None, RESULT)
+    cache.put('b', None, RESULT)
+    cache.get('a')
+    cache.put('c', None, RESULT)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == RESULT
+    assert cache.get('c') == RESULT
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] <= 350
+
+
+def test_repeated_upload_is_served_from_the_cache(monkeypatch, tmp_path):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import main
+
+    monkeypatch.setattr(main, 'parse_cache', ParseCache(str(tmp_path / 'cache.sqlite3')))
+    content = build_pdf([['Form 1099-INT Interest Income', '1 Interest income 1,234.56']])
+    client = TestClient(main.app)
+
+    def upload():
+        response = client.post(
+            '/api/upload', files={'file': ('statement.pdf', content, 'application/pdf')})
+        assert response.status_code == 200
+        return response.json()
+
+    first = upload()
+    submitted = main.parse_pool.stats()['submitted']
+    second = upload()
+    assert second['data'] == first['data']
+    # The page text is not kept in the cache
+    assert first['raw_text'] and not second['raw_text']
+    # The second upload never reached the parse pool
+    assert main.parse_pool.stats()['submitted'] == submitted
+    assert main.parse_cache.stats()['hits'] == 1
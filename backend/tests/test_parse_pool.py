@@ -0,0 +1,120 @@
+import sys
+import os
+import asyncio
+import signal
+import time
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers.pool import ParsePool, ParsePoolFull, ParseTimeout
+
+
+@pytest.fixture
+def pool():
+    pool = ParsePool(max_workers=1, max_queue=1, timeout=0.5)
+    yield pool
+    pool.shutdown()
+
+
+def test_jobs_run_in_worker_processes(pool):
+    pool.start()
+    assert asyncio.run(pool.run(os.getpid)) != os.getpid()
+
+    stats = pool.stats()
+    assert stats['completed'] == 1
+    assert stats['running'] == 0
+    assert stats['queue_depth'] == 0
+
+
+def test_full_queue_is_rejected(pool):
+    running = pool.submit(time.sleep, 0.3)
+    queued = pool.submit(time.sleep, 0)
+
+    stats = pool.stats()
+    assert stats['running'] == 1
+    assert stats['queue_depth'] == 1
+    assert stats['utilization'] == 1.0
+
+    with pytest.raises(ParsePoolFull) as excinfo:
+        pool.submit(time.sleep, 0)
+    assert excinfo.value.retry_after >= 1
+    assert pool.stats()['rejected'] == 1
+
+    running.result()
+    queued.result()
+
+
+def test_jobs_past_the_timeout_are_interrupted(pool):
+    with pytest.raises(ParseTimeout):
+        asyncio.run(pool.run(time.sleep, 30))
+
+    # The worker is free again for the next job
+    assert asyncio.run(pool.run(os.getpid)) > 0
+    assert pool.stats()['timed_out'] == 1
+
+
+def test_configuration_from_environment(monkeypatch):
+    monkeypatch.setenv('OPENTAX_PARSE_WORKERS', '3')
+    monkeypatch.setenv('OPENTAX_PARSE_QUEUE', '0')
+    monkeypatch.setenv('OPENTAX_PARSE_TIMEOUT', '2.5')
+    pool = ParsePool.from_env()
+    assert (pool.max_workers, pool.max_queue, pool.timeout) == (3, 0, 2.5)
+
+
+def test_upload_returns_503_when_the_queue_is_full(monkeypatch, make_pdf):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import main
+
+    def reject(fn, *args):
+        raise ParsePoolFull(7)
+
+    monkeypatch.setattr(main.parse_pool, 'submit', reject)
+    with open(make_pdf([['Form W-2 Wage and Tax Statement']]), 'rb') as f:
+        content = f.read()
+
+    client = TestClient(main.app)
+    response = client.post(
+        '/api/upload', files={'file': ('w2.pdf', content, 'application/pdf')})
+    assert response.status_code == 503
+    assert response.headers['retry-after'] == '7'
+
+    metrics = client.get('/api/metrics').json()
+    assert {'queue_depth', 'utilization', 'average_utilization'} <= set(metrics['parse_pool'])
+
+
+def _crash():
+    os._exit(1)
+
+
+def _ignore_alarm_and_sleep(seconds):
+    # Like native code that never returns to the interpreter
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+    time.sleep(seconds)
+
+
+def test_dead_worker_is_replaced(pool):
+    from concurrent.futures.process import BrokenProcessPool
+
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(pool.run(_crash))
+
+    # Later jobs run on a new executor
+    assert asyncio.run(pool.run(os.getpid)) > 0
+    stats = pool.stats()
+    assert stats['broken'] == 1
+    assert stats['completed'] == 1
+
+
+@pytest.mark.skipif(not hasattr(signal, 'pthread_sigmask'), reason="needs pthread_sigmask")
+def test_caller_stops_waiting_for_an_uninterruptible_job(pool, monkeypatch):
+    import parsers.pool
+
+    monkeypatch.setattr(parsers.pool, 'TIMEOUT_GRACE', 0.1)
+    started = time.monotonic()
+    with pytest.raises(ParseTimeout):
+        asyncio.run(pool.run(_ignore_alarm_and_sleep, 2))
+    assert time.monotonic() - started < 1.5
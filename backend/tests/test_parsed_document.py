@@ -0,0 +1,74 @@
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import ParsedDocument, open_document, parse_1099_int, parse_1099_div
+
+INT_PAGE = [
+    'Form 1099-INT Interest Income',
+    'PAYER\'S name: First Example Bank',
+    '1 Interest income 1,234.56',
+    '4 Federal income tax withheld 100.00',
+]
+
+
+def test_text_is_extracted_once_per_page(make_pdf):
+    path = make_pdf([INT_PAGE, ['Page two']])
+    with ParsedDocument.open(path) as document:
+        calls = []
+        pages = document.pages
+        for page in pages:
+            original = page.extract_text
+            page.extract_text = lambda page=page, original=original: (
+                calls.append(page.page_number) or original())
+
+        assert document.page_count == 2
+        assert document.text.startswith('Form 1099-INT')
+        assert document.text.endswith('Page two\n')
+        assert 'interest income' in document.lower_text
+        assert document.page_text(1) == 'Page two'
+        assert calls == [1, 2]
+
+        assert document.words(1)[0]['text'] == 'Page'
+        assert document.words(1) is document.words(1)
+
+
+def test_parsers_share_an_open_document(make_pdf):
+    path = make_pdf([INT_PAGE])
+    with ParsedDocument.open(path) as document:
+        from_document = parse_1099_int(document)
+        parse_1099_div(document)
+        # Parsers leave a document they were given open
+        assert document.page_text(0)
+
+    from_path = parse_1099_int(path)
+    assert from_document == from_path
+    assert from_document['interest_income'] == 1234.56
+    assert from_document['federal_tax_withheld'] == 100.0
+
+
+def test_open_document_owns_only_what_it_opens(make_pdf):
+    path = make_pdf([INT_PAGE], fields={'payer_name': 'Field Credit Union'})
+    with open_document(path) as document:
+        assert [a['data']['T'] for a in document.annotations] == [b'payer_name']
+    with ParsedDocument.open(path) as document:
+        with open_document(document) as same:
+            assert same is document
+        assert document.page_count == 1
+
+
+def test_parsers_stop_reading_once_every_field_is_found(make_pdf):
+    filler = [['Transaction detail continued']] * 49
+    path = make_pdf([INT_PAGE + [
+        '2 Early withdrawal penalty 0.00',
+        '3 Interest on U.S. Savings Bonds 0.00',
+    ]] + filler)
+
+    with ParsedDocument.open(path) as document:
+        result = parse_1099_int(document)
+        assert result['interest_income'] == 1234.56
+        assert list(document._page_text) == [0]
+        # pdfplumber's per-page objects are released after extraction
+        assert not hasattr(document.pages[0], '_objects')
@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers.payer_db import POPULAR_PAYERS, PayerMatcher, get_payer_score, load_payers
+
+
+def test_payers_are_loaded_from_the_data_file(tmp_path):
+    path = tmp_path / 'payers.txt'
+    path.write_text('# Banks\nFirst Example Bank\n\n  second example bank  \n')
+
+    assert load_payers(str(path)) == ['FIRST EXAMPLE BANK', 'SECOND EXAMPLE BANK']
+    assert 'VANGUARD MARKETING CORPORATION' in POPULAR_PAYERS
+
+
+def test_automaton_finds_every_payer_in_the_text():
+    matcher = PayerMatcher(['CHASE BANK', 'JPMORGAN CHASE BANK', 'BANK', 'ASE'])
+
+    found = list(matcher.find_all('jpmorgan chase bank, n.a.'))
+    assert sorted(found) == ['ASE', 'BANK', 'CHASE BANK', 'JPMORGAN CHASE BANK']
+    assert matcher.find('Nothing here') is None
+
+
+def test_automaton_agrees_with_substring_search():
+    matcher = PayerMatcher(POPULAR_PAYERS)
+    lines = [
+        'THE VANGUARD GROUP', 'Robinhood Securities LLC', 'E*TRADE FROM MORGAN STANLEY',
+        '123 MAIN STREET', 'PAYER\'S TIN', 'M&T BANK CORPORATION', '',
+    ]
+    for line in lines:
+        expected = {payer for payer in POPULAR_PAYERS if payer in line.upper()}
+        assert set(matcher.find_all(line)) == expected
+
+
+def test_payer_scores():
+    assert get_payer_score('Vanguard Marketing Corporation') == 100
+    assert get_payer_score('The Vanguard Group, Inc.') == 90
+    # Misspelled, found through the trigram index
+    assert 50 < get_payer_score('Vangaurd Marketing Corporation') < 90
+    assert get_payer_score('Jane Q Taxpayer') == 0
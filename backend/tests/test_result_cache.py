@@ -0,0 +1,102 @@
+import sys
+import os
+import threading
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tax_engine.calculator import calculate_taxes
+from tax_engine.cache import (
+    LRUCache,
+    cached_calculate_taxes,
+    canonicalize_input,
+    clear_result_cache,
+    result_cache_stats,
+)
+from tax_engine.utils import DETAIL_TOTALS, invalidate_tax_tables
+
+
+def test_lru_cache_hits_misses_and_eviction():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'a' becomes most recent
+    cache.put('c', 3)  # evicts 'b'
+
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert cache.stats() == {
+        'hits': 2, 'misses': 1, 'evictions': 1, 'size': 2, 'maxsize': 2}
+
+
+def test_lru_cache_clears_on_version_change():
+    version = [0]
+    cache = LRUCache(4, version=lambda: version[0])
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+
+    version[0] += 1
+    assert cache.get('a') is None
+
+
+def test_equivalent_inputs_share_one_entry():
+    base = {'w2_wages': 85000, 'tax_year': 2024, 'state': 'CA'}
+    variants = [
+        base,
+        {'w2_wages': 85000.0, 'tax_year': 2024.0, 'state': 'CA'},
+        {**base, 'interest_income': None, 'filing_status': 'single'},
+        {**base, 'ordinary_dividends': 0},
+    ]
+    assert len({tuple(canonicalize_input(v).items()) for v in variants}) == 1
+
+    clear_result_cache()
+    before = result_cache_stats()
+    results = [cached_calculate_taxes(v) for v in variants]
+    after = result_cache_stats()
+
+    assert after['misses'] - before['misses'] == 1
+    assert after['hits'] - before['hits'] == len(variants) - 1
+    assert all(result is results[0] for result in results)
+    assert results[0] == calculate_taxes(base)
+
+
+def test_detail_level_is_part_of_the_key():
+    clear_result_cache()
+    tax_input = {'w2_wages': 120000, 'tax_year': 2024}
+    totals = cached_calculate_taxes(tax_input, DETAIL_TOTALS)
+    breakdown = cached_calculate_taxes(tax_input)
+
+    assert totals['federal']['bracket_breakdown'] == []
+    assert breakdown['federal']['bracket_breakdown']
+
+
+def test_invalidate_tax_tables_discards_results():
+    tax_input = {'w2_wages': 64000, 'tax_year': 2024}
+    first = cached_calculate_taxes(tax_input)
+    assert cached_calculate_taxes(tax_input) is first
+
+    invalidate_tax_tables()
+    second = cached_calculate_taxes(tax_input)
+    assert second is not first
+    assert second == first
+
+
+def test_concurrent_lookups():
+    clear_result_cache()
+    inputs = [{'w2_wages': 50000 + 1000 * (i % 8)} for i in range(200)]
+    expected = {i % 8: calculate_taxes(inputs[i]) for i in range(8)}
+    errors = []
+
+    def worker(offset):
+        for i in range(offset, len(inputs), 4):
+            if cached_calculate_taxes(inputs[i]) != expected[i % 8]:
+                errors.append(i)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert result_cache_stats()['size'] == 8
@@ -0,0 +1,102 @@
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tax_engine.calculator import calculate_taxes
+from tax_engine.cache import canonicalize_input
+from tax_engine.federal import TAX_RATES
+from tax_engine.solver import _candidate_points, solve, solution_cache_stats
+
+BASE_INPUT = {
+    'w2_wages': 120000.0,
+    'w2_federal_withheld': 15000.0,
+    'w2_state_withheld': 6000.0,
+    'state': 'CA',
+}
+
+
+def test_withholding_that_zeroes_balance_due():
+    solution = solve(BASE_INPUT, 'other_withholding', 'amount_owed', 0.0)
+
+    owed = calculate_taxes({**BASE_INPUT, 'other_withholding': solution['value']})
+    assert abs(owed['amount_owed']) <= 0.01
+    assert solution['achieved'] == owed['amount_owed']
+
+
+def test_continuous_target_on_total_liability():
+    solution = solve(BASE_INPUT, 'long_term_gains', 'total_tax_liability', 40000.0)
+
+    value = solution['value']
+    at = calculate_taxes({**BASE_INPUT, 'long_term_gains': value})
+    below = calculate_taxes({**BASE_INPUT, 'long_term_gains': value - 0.02})
+    assert at['total_tax_liability'] >= 40000.0 - 0.01
+    assert below['total_tax_liability'] < 40000.0
+
+
+def test_marginal_rate_step_is_located_within_tolerance():
+    solution = solve(BASE_INPUT, 'w2_wages', 'federal.marginal_rate', 32.0, tolerance=1.0)
+
+    value = solution['value']
+    assert calculate_taxes({**BASE_INPUT, 'w2_wages': value})['federal']['marginal_rate'] == 32.0
+    assert calculate_taxes({**BASE_INPUT, 'w2_wages': value - 1.0})['federal']['marginal_rate'] < 32.0
+
+
+def test_solutions_are_cached_per_base_return():
+    before = solution_cache_stats()
+    first = solve(BASE_INPUT, 'short_term_gains', 'amount_owed', 5000.0)
+    # The base's own value of the solved field does not matter
+    second = solve({**BASE_INPUT, 'short_term_gains': 999.0}, 'short_term_gains', 'amount_owed', 5000)
+    after = solution_cache_stats()
+
+    assert second is first
+    assert after['misses'] - before['misses'] == 1
+    assert after['hits'] - before['hits'] == 1
+
+
+def test_unreachable_and_invalid_requests():
+    with pytest.raises(ValueError, match='does not reach'):
+        solve(BASE_INPUT, 'w2_wages', 'federal.marginal_rate', 50.0)
+    with pytest.raises(ValueError, match='numeric input field'):
+        solve(BASE_INPUT, 'filing_status', 'amount_owed', 0.0)
+    with pytest.raises(ValueError, match='Unknown output'):
+        solve(BASE_INPUT, 'w2_wages', 'federal.nope', 0.0)
+    with pytest.raises(ValueError, match='Unsupported tax year 2019'):
+        solve({**BASE_INPUT, 'tax_year': 2019}, 'w2_wages', 'amount_owed', 0.0)
+
+
+def test_candidates_use_the_tax_years_wage_base():
+    canonical = canonicalize_input({**BASE_INPUT, 'tax_year': 2025})
+    points = _candidate_points(canonical, 'self_employment_income', 0.0, 1_000_000.0)
+
+    assert TAX_RATES[2025]['ss_wage_base'] in points
+    assert TAX_RATES[2024]['ss_wage_base'] not in points
+
+
+def test_solve_endpoint():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    response = client.post('/api/solve', json={
+        'base': {'w2_wages': 90000, 'w2_federal_withheld': 8000},
+        'variable': 'estimated_tax_payments',
+        'output': 'amount_owed',
+        'target': 0,
+    })
+    assert response.status_code == 200
+    assert abs(response.json()['achieved']) <= 0.01
+
+    response = client.post('/api/solve', json={'variable': 'state'})
+    assert response.status_code == 400
+
+    response = client.post('/api/solve', json={
+        'base': {'w2_wages': 90000, 'tax_year': 2019},
+        'variable': 'estimated_tax_payments',
+    })
+    assert response.status_code == 400
+    assert 'Unsupported tax year 2019' in response.json()['detail']
@@ -0,0 +1,68 @@
+import json
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tax_engine.cache import cached_calculate_taxes
+from tax_engine.registry import StateTaxRegistry
+from tax_engine.states import generic
+from tax_engine.states.generic import STATE_TABLES, STATES_FILE, reload_states
+from tax_engine.utils import compile_brackets
+
+
+def test_tables_are_compiled_and_immutable():
+    table = STATE_TABLES['NY']
+    rates = table.rates_for(2024, 'joint')
+
+    assert rates.standard_deduction == 16050.0
+    assert rates.brackets == compile_brackets(
+        generic.STATES_DATA['NY']['2024']['brackets']['joint'])
+    assert rates.brackets.upper_limits[-1] == float('inf')
+
+    with pytest.raises(TypeError):
+        table.years[2025] = table.years[2024]
+    with pytest.raises(TypeError):
+        table.years[2024]['single'] = rates
+    with pytest.raises(AttributeError):
+        table.has_income_tax = False
+
+
+def test_year_and_filing_status_fallbacks_are_resolved():
+    table = STATE_TABLES['NY']
+    assert table.rates_for(2031, 'joint') is table.rates_for(2024, 'joint')
+    assert table.rates_for(2024, 'head_of_household') is table.rates_for(2024, 'single')
+    assert table.rates_for(2031, 'joint').tax_year == 2024
+
+    assert not STATE_TABLES['TX'].has_income_tax
+    assert STATE_TABLES['TX'].notes == 'Texas has no state income tax.'
+
+
+def test_unknown_state_has_no_income_tax():
+    calc = StateTaxRegistry.get_calculator('ZZ')
+    result = calc.calculate({'wages': 50000.0, 'federal_agi': 50000.0})
+    assert result['total_state_tax'] == 0.0
+    assert calc.get_standard_deduction('single', 2024) == 0.0
+
+
+def test_reload_states_recompiles_and_drops_cached_results(tmp_path):
+    tax_input = {'w2_wages': 90000.0, 'state': 'NY'}
+    before = cached_calculate_taxes(tax_input)
+
+    states_data = json.loads(open(STATES_FILE).read())
+    states_data['NY']['2024']['std_deduction']['single'] = 90000.0
+    edited = tmp_path / 'states.json'
+    edited.write_text(json.dumps(states_data))
+
+    try:
+        reload_states(str(edited))
+        after = cached_calculate_taxes(tax_input)
+        assert after['california']['standard_deduction'] == 90000.0
+        assert after['california']['total_state_tax'] == 0.0
+    finally:
+        reload_states()
+
+    assert cached_calculate_taxes(tax_input) == before
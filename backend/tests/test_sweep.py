@@ -0,0 +1,101 @@
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tax_engine.calculator import calculate_taxes
+from tax_engine import sweep as sweep_module
+from tax_engine.sweep import sweep
+
+BASE_INPUT = {
+    'w2_federal_withheld': 18000.0,
+    'qualified_dividends': 2000.0,
+    'ordinary_dividends': 3000.0,
+    'state': 'NY',
+}
+
+
+def test_grid_matches_scalar_engine():
+    axes = {
+        'w2_wages': [30000, 90000, 250000],
+        'long_term_gains': [0, 15000, 400000, -8000],
+        'filing_status': ['single', 'joint'],
+    }
+    grid = sweep(BASE_INPUT, axes, ['amount_owed', 'federal.marginal_rate'])
+
+    assert grid['shape'] == (3, 4, 2)
+    for i, wages in enumerate(axes['w2_wages']):
+        for j, gains in enumerate(axes['long_term_gains']):
+            for k, status in enumerate(axes['filing_status']):
+                expected = calculate_taxes({
+                    **BASE_INPUT,
+                    'w2_wages': wages,
+                    'long_term_gains': gains,
+                    'filing_status': status,
+                })
+                assert grid['results']['amount_owed'][i, j, k] == expected['amount_owed']
+                assert grid['results']['federal.marginal_rate'][i, j, k] == \
+                    expected['federal']['marginal_rate']
+
+
+def test_rejects_unknown_fields_and_oversized_grids(monkeypatch):
+    with pytest.raises(ValueError, match='axis'):
+        sweep(BASE_INPUT, {'salary': [1, 2]})
+    with pytest.raises(ValueError, match='output'):
+        sweep(BASE_INPUT, {'w2_wages': [1]}, ['federal.nope'])
+
+    with pytest.raises(ValueError, match='Unsupported tax year 2019'):
+        sweep(BASE_INPUT, {'tax_year': [2024, 2019]})
+    with pytest.raises(ValueError, match='Unsupported tax year 2019'):
+        sweep({**BASE_INPUT, 'tax_year': 2019}, {'w2_wages': [1]})
+
+    with pytest.raises(ValueError, match="Unsupported filing status 'hoh'"):
+        sweep(BASE_INPUT, {'filing_status': ['single', 'hoh']})
+    with pytest.raises(ValueError, match="Unsupported filing status 'hoh'"):
+        sweep({**BASE_INPUT, 'filing_status': 'hoh'}, {'w2_wages': [1]})
+
+    monkeypatch.setattr(sweep_module, 'MAX_SWEEP_POINTS', 10)
+    with pytest.raises(ValueError, match='limit'):
+        sweep(BASE_INPUT, {'w2_wages': range(4), 'interest_income': range(3)})
+
+
+def test_sweep_endpoint():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    response = client.post('/api/sweep', json={
+        'base': {'w2_wages': 100000},
+        'axes': {'long_term_gains': [0, 50000], 'filing_status': ['single', 'joint']},
+        'outputs': ['total_tax_liability'],
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body['shape'] == [2, 2]
+    assert body['results']['total_tax_liability'][1][1] == calculate_taxes({
+        'w2_wages': 100000, 'long_term_gains': 50000, 'filing_status': 'joint',
+    })['total_tax_liability']
+
+    response = client.post('/api/sweep', json={'axes': {'salary': [1]}})
+    assert response.status_code == 400
+
+    response = client.post('/api/sweep', json={
+        'base': {'tax_year': 2019},
+        'axes': {'w2_wages': [50000]},
+    })
+    assert response.status_code == 400
+    assert 'Unsupported tax year 2019' in response.json()['detail']
+
+    response = client.post('/api/sweep', json={'axes': {'tax_year': [2024, 2025]}})
+    assert response.status_code == 200
+
+    response = client.post('/api/sweep', json={
+        'base': {'w2_wages': 1000},
+        'axes': {'filing_status': ['single', 'hoh']},
+    })
+    assert response.status_code == 400
+    assert "Unsupported filing status 'hoh'" in response.json()['detail']
@@ -0,0 +1,132 @@
+import sys
+import os
+import io
+import json
+import zipfile
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conftest import build_pdf
+from parsers.dispatch import summarize_uploads
+
+W2_PAGE = [
+    'Form W-2 Wage and Tax Statement 2024',
+    'Wages, tips, other compensation 85000.00',
+]
+
+INT_PAGE = [
+    'Form 1099-INT Interest Income',
+    '1 Interest income 1,234.56',
+    '4 Federal income tax withheld 100.00',
+]
+
+NEC_PAGE = [
+    'Form 1099-NEC Nonemployee Compensation',
+    '1 Nonemployee compensation 5,000.00',
+]
+
+
+def test_withholding_is_attributed_to_each_form():
+    summary = summarize_uploads([
+        {'form_type': 'W-2', 'parse_confidence': 'high',
+         'wages': 85000.0, 'federal_tax_withheld': 9000.0},
+        {'form_type': '1099-INT+1099-DIV', 'parse_confidence': 'high',
+         'federal_tax_withheld': 150.0,
+         'forms': [
+             {'form_type': '1099-INT', 'interest_income': 40.0, 'federal_tax_withheld': 50.0},
+             {'form_type': '1099-DIV', 'total_ordinary_dividends': 500.0,
+              'federal_tax_withheld': 100.0},
+         ]},
+        {'form_type': 'W-2', 'parse_confidence': 'failed', 'wages': 1.0},
+    ])
+
+    assert summary['w2_wages'] == 85000.0
+    assert summary['w2_federal_withheld'] == 9000.0
+    assert summary['interest_federal_withheld'] == 50.0
+    assert summary['dividend_federal_withheld'] == 100.0
+    assert summary['ordinary_dividends'] == 500.0
+
+
+def test_batch_upload_streams_documents_and_summary():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from main import app
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as z:
+        z.writestr('bank/interest.pdf', build_pdf([INT_PAGE]))
+        z.writestr('__MACOSX/bank/._interest.pdf', b'resource fork')
+        z.writestr('notes.txt', b'not a pdf')
+
+    client = TestClient(app)
+    response = client.post('/api/upload/batch', files=[
+        ('files', ('contractor.pdf', build_pdf([NEC_PAGE]), 'application/pdf')),
+        ('files', ('statements.zip', archive.getvalue(), 'application/zip')),
+        ('files', ('photo.png', b'png', 'image/png')),
+    ])
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    documents = sorted(lines[:-1], key=lambda line: line['index'])
+    assert [d['filename'] for d in documents] == ['contractor.pdf', 'interest.pdf', 'photo.png']
+    assert documents[0]['form_type'] == '1099-NEC'
+    assert documents[1]['form_type'] == '1099-INT'
+    assert 'error' in documents[2]
+
+    summary = lines[-1]['summary']
+    assert summary['self_employment_income'] == 5000.0
+    assert summary['interest_income'] == 1234.56
+    assert summary['interest_federal_withheld'] == 100.0
+    assert summary['w2_federal_withheld'] == 0.0
+    assert summary['filing_status'] == 'single'
+
+
+def test_batch_upload_rejects_requests_without_pdfs():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from main import app
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as z:
+        z.writestr('notes.txt', b'not a pdf')
+
+    client = TestClient(app)
+    response = client.post('/api/upload/batch', files=[
+        ('files', ('empty.zip', archive.getvalue(), 'application/zip')),
+    ])
+    assert response.status_code == 400
+
+
+def test_unreadable_zip_members_are_reported_per_document():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from main import app
+
+    good = build_pdf([INT_PAGE])
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as z:
+        z.writestr('interest.pdf', good)
+        z.writestr('corrupt.pdf', b'%PDF-1.4 stored member')
+        z.writestr('locked.pdf', b'%PDF-1.4 encrypted member')
+    # Damage the stored member's data so that its CRC no longer matches
+    content = bytearray(archive.getvalue().replace(b'stored member', b'STORED MEMBER'))
+    # Flag the last member as encrypted in the central directory
+    content[content.rfind(b'PK\x01\x02') + 8] |= 0x1
+    content = bytes(content)
+
+    client = TestClient(app)
+    response = client.post('/api/upload/batch', files=[
+        ('files', ('statements.zip', content, 'application/zip')),
+    ])
+    assert response.status_code == 200
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    documents = {line['filename']: line for line in lines[:-1]}
+    assert documents['interest.pdf']['form_type'] == '1099-INT'
+    assert documents['corrupt.pdf']['error'] == "File could not be read from the ZIP archive"
+    assert documents['locked.pdf']['error'] == "File is encrypted"
+    assert lines[-1]['summary']['interest_income'] == 1234.56
@@ -0,0 +1,92 @@
+import sys
+import os
+import io
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from parsers import ParsedDocument, parse_1099_int
+from parsers.classifier import classify
+from conftest import build_pdf
+
+INT_PAGE = [
+    'Form 1099-INT Interest Income',
+    '1 Interest income 1,234.56',
+    '4 Federal income tax withheld 100.00',
+]
+
+
+def test_parsers_read_bytes_and_file_objects(make_pdf):
+    content = build_pdf([INT_PAGE])
+    from_path = parse_1099_int(make_pdf([INT_PAGE]))
+
+    assert parse_1099_int(content) == from_path
+    stream = io.BytesIO(content)
+    assert parse_1099_int(stream) == from_path
+    # The caller's file object is left open
+    assert not stream.closed
+
+
+def test_quick_text_of_a_stream_leaves_its_position():
+    stream = io.BytesIO(build_pdf([INT_PAGE]))
+    with ParsedDocument.open(stream) as document:
+        assert document.path is None
+        assert classify(document)[0].form_type == '1099-INT'
+        assert '1099-INT' in document.page_text(0)
+
+
+@pytest.fixture
+def client():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from main import app
+    return TestClient(app)
+
+
+def upload(client, content):
+    return client.post(
+        '/api/upload', files={'file': ('interest.pdf', content, 'application/pdf')})
+
+
+def test_small_uploads_are_parsed_in_memory(client, monkeypatch, tmp_path):
+    import main
+
+    monkeypatch.chdir(tmp_path)
+
+    def no_spooling(content):
+        raise AssertionError("upload was written to disk")
+
+    monkeypatch.setattr(main, '_spool_upload', no_spooling)
+    response = upload(client, build_pdf([INT_PAGE]))
+
+    assert response.status_code == 200
+    assert response.json()['data']['interest_income'] == 1234.56
+    # No debug copy unless asked for
+    assert os.listdir(tmp_path) == []
+
+
+def test_large_uploads_are_spooled_and_cleaned_up(client, monkeypatch):
+    import main
+
+    spooled = []
+    spool = main._spool_upload
+    monkeypatch.setattr(main, 'UPLOAD_SPOOL_BYTES', 10)
+    monkeypatch.setattr(main, '_spool_upload', lambda content: spooled.append(spool(content)) or spooled[-1])
+    response = upload(client, build_pdf([INT_PAGE]))
+
+    assert response.status_code == 200
+    assert response.json()['data']['interest_income'] == 1234.56
+    assert len(spooled) == 1
+    assert not os.path.exists(spooled[0])
+
+
+def test_debug_copy_is_opt_in(client, monkeypatch, tmp_path):
+    import main
+
+    path = tmp_path / 'last_upload.pdf'
+    monkeypatch.setattr(main, 'DEBUG_UPLOAD_PATH', str(path))
+    content = build_pdf([INT_PAGE])
+    assert upload(client, content).status_code == 200
+    assert path.read_bytes() == content
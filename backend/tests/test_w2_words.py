@@ -0,0 +1,118 @@
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import ParsedDocument, parse_w2
+from parsers import w2
+from parsers.w2 import parse_w2_words
+
+
+def w2_copy(x=50, y=700, wages='85,000.00', column=270, size=10,
+            employer='Example Payroll Corp', state_tax='4,100.00'):
+    """One copy of a W-2's boxes, in two columns from (x, y) down; None leaves a box empty."""
+    right = x + column
+    rows = [
+        ('1 Wages, tips, other compensation', wages,
+         '2 Federal income tax withheld', '12,000.00'),
+        ('3 Social security wages', '85,000.00',
+         '4 Social security tax withheld', '5,270.00'),
+        ('5 Medicare wages and tips', '85,000.00',
+         '6 Medicare tax withheld', '1,232.50'),
+        ("c Employer's name, address, and ZIP code", employer,
+         '14 Other CA SDI', '1,105.00'),
+        ('16 State wages, tips, etc.', '85,000.00',
+         '17 State income tax', state_tax),
+    ]
+    lines = []
+    for row, (left_label, left_value, right_label, right_value) in enumerate(rows):
+        top = y - 40 * row
+        lines += [
+            (x, top, left_label), (x + 10, top - 14, left_value),
+            (right, top, right_label), (right + 10, top - 14, right_value),
+        ]
+    lines = [line for line in lines if line[2] is not None]
+    lines.append((x + 10, y - 40 * 3 - 28, '100 Main St, Springfield, IL 62701'))
+    return [line + (size,) for line in lines]
+
+
+def test_boxes_are_read_from_word_positions(make_pdf, capsys):
+    path = make_pdf([[(50, 750, 'Form W-2 Wage and Tax Statement 2024')] + w2_copy()])
+    with ParsedDocument.open(path) as document:
+        assert parse_w2_words(document) == {
+            'wages': 85000.0,
+            'federal_tax_withheld': 12000.0,
+            'social_security_wages': 85000.0,
+            'social_security_tax_withheld': 5270.0,
+            'medicare_wages': 85000.0,
+            'medicare_tax_withheld': 1232.5,
+            'employer_name': 'Example Payroll Corp',
+            'casdi': 1105.0,
+            'state_wages': 85000.0,
+            'state_tax_withheld': 4100.0,
+            'copy_count': 1,
+            'copies_consistent': True,
+        }
+
+        result = parse_w2(document)
+        # Table extraction is not needed
+        assert not document._tables
+
+    assert result['parse_confidence'] == 'high'
+    assert capsys.readouterr().out == ''
+
+
+def test_falls_back_to_tables_without_box_labels(make_pdf):
+    path = make_pdf([['Form W-2 Wage and Tax Statement', 'Nothing to read']])
+    with ParsedDocument.open(path) as document:
+        result = parse_w2(document)
+        assert 0 in document._tables
+    assert result['wages'] == 0.0
+
+
+def four_up(bottom_right_wages='85,000.00'):
+    """Copies B, C, 2 and 2 in the quadrants of one page."""
+    lines = [(10, 780, 'Form W-2 Wage and Tax Statement 2024', 6)]
+    for x, y in [(10, 750), (316, 750), (10, 370)]:
+        lines += w2_copy(x, y, column=150, size=6)
+    lines += w2_copy(316, 370, wages=bottom_right_wages, column=150, size=6)
+    return lines
+
+
+def test_instructions_quadrant_is_not_a_copy(make_pdf):
+    lines = [(10, 780, 'Form W-2 Wage and Tax Statement 2024', 6)]
+    for x, y in [(10, 750), (316, 750), (10, 370)]:
+        lines += w2_copy(x, y, column=150, size=6)
+    lines += [
+        (316, 370, 'Notice to Employee', 6),
+        (316, 356, 'You may be able to take the earned income credit', 6),
+        (316, 342, 'for 2024, worth up to 7,830.00, if your income is low.', 6),
+    ]
+    result = parse_w2(make_pdf([lines]))
+
+    assert result['copy_count'] == 3
+    assert result['copies_consistent'] is True
+
+
+def test_only_the_first_of_several_copies_is_parsed(make_pdf, monkeypatch):
+    located = []
+    locate = w2.locate_w2_boxes
+    monkeypatch.setattr(w2, 'locate_w2_boxes', lambda words: located.append(words) or locate(words))
+
+    result = parse_w2(make_pdf([four_up()]))
+
+    assert len(located) == 1
+    assert result['wages'] == 85000.0
+    assert result['employer_name'] == 'Example Payroll Corp'
+    assert result['copy_count'] == 4
+    assert result['copies_consistent'] is True
+
+
+def test_mismatched_copies_are_reported(make_pdf):
+    result = parse_w2(make_pdf([four_up(bottom_right_wages='84,000.00')]))
+
+    # The first copy's values are kept
+    assert result['wages'] == 85000.0
+    assert result['copy_count'] == 4
+    assert result['copies_consistent'] is False